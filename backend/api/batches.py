@@ -1,5 +1,6 @@
 """Batch job management API for bulk uploads."""
 
+import asyncio
 import io
 import zipfile
 from datetime import datetime
@@ -8,12 +9,14 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from services.database import get_session
-from models.database import Job, JobBatch, Transcript
+from services.dispatch import dispatch_jobs
+from services.uploads import SavedUpload, save_upload
+from models.database import Job, JobBatch, Transcript, generate_uuid
 from schemas.job import JobStatus
 from config import settings
 
@@ -50,40 +53,86 @@ async def create_batch(
     session.add(batch)
     await session.flush()  # Get batch ID
     
-    # Create jobs for each file
-    jobs = []
-    for file in files:
-        # Save file
-        file_path = settings.upload_dir / f"{batch.id}_{file.filename}"
-        content = await file.read()
-        file_path.write_bytes(content)
-        
-        job = Job(
-            batch_id=batch.id,
-            filename=file.filename,
-            original_path=str(file_path),
-            file_size=len(content),
-            language=language,
-            enable_diarization=enable_diarization,
-            enable_tts=enable_tts,
-            status=JobStatus.QUEUED,
+    # Stream every part to disk concurrently, bounded by batch_upload_concurrency
+    semaphore = asyncio.Semaphore(max(1, settings.batch_upload_concurrency))
+    
+    async def ingest(index: int, file: UploadFile) -> SavedUpload:
+        async with semaphore:
+            # Index prefix keeps same-named files from colliding
+            name = Path(file.filename or "file").name
+            file_path = settings.upload_dir / f"{batch.id}_{index}_{name}"
+            return await save_upload(file, file_path)
+    
+    results = await asyncio.gather(
+        *(ingest(i, file) for i, file in enumerate(files)),
+        return_exceptions=True,
+    )
+    
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        # Roll back: remove whatever made it to disk
+        for r in results:
+            if isinstance(r, SavedUpload):
+                r.path.unlink(missing_ok=True)
+        raise errors[0]
+    
+    # Queue positions continue after the current backlog
+    result = await session.execute(
+        select(func.count(Job.id)).where(
+            Job.status.in_([JobStatus.PENDING, JobStatus.QUEUED, JobStatus.PROCESSING])
         )
-        session.add(job)
-        jobs.append(job)
+    )
+    queue_start = (result.scalar() or 0) + 1
     
+    # Bulk-insert all job rows in one statement
+    job_rows = [
+        {
+            "id": generate_uuid(),
+            "batch_id": batch.id,
+            "filename": file.filename or "unknown",
+            "original_path": str(saved.path),
+            "file_size": saved.size,
+            "file_hash": saved.file_hash,
+            "language": language,
+            "enable_diarization": enable_diarization,
+            "enable_tts": enable_tts,
+            "queue_position": queue_start + i,
+            # Not claimable until the reuse check below has run
+            "status": JobStatus.PENDING,
+        }
+        for i, (file, saved) in enumerate(zip(files, results))
+    ]
+    await session.execute(insert(Job), job_rows)
     await session.commit()
     
-    # Start processing jobs
-    from services.background_tasks import start_job_background
-    for job in jobs:
-        start_job_background(job.id)
+    # Identical media with identical options: reuse earlier transcripts
+    from services.dedup import try_reuse_transcript
+    
+    result = await session.execute(
+        select(Job).where(Job.id.in_([row["id"] for row in job_rows]))
+    )
+    reused = set()
+    for job in result.scalars().all():
+        if await try_reuse_transcript(session, job):
+            reused.add(job.id)
+    queued = [row["id"] for row in job_rows if row["id"] not in reused]
+    if queued:
+        await session.execute(
+            update(Job).where(Job.id.in_(queued)).values(status=JobStatus.QUEUED)
+        )
+        await session.commit()
+    if reused:
+        await update_batch_progress(session, batch.id)
+    
+    # Hand the rest to the scheduler (Celery when available)
+    dispatch_jobs(queued)
     
     return {
         "id": batch.id,
         "name": batch.name,
         "total_files": batch.total_files,
         "status": batch.status.value,
-        "jobs": [{"id": j.id, "filename": j.filename} for j in jobs],
+        "jobs": [{"id": row["id"], "filename": row["filename"]} for row in job_rows],
     }
 
 
@@ -7,6 +7,7 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from services.database import get_session
+from services.speaker_index import learn_speaker_names
 from models.database import Job, Model, Transcript, TranscriptSegment
 from schemas.job import (
     JobCreate,
@@ -18,14 +19,6 @@ from schemas.job import (
     OutputFormat,
 )
 
-# Celery import is optional - jobs can be created without workers
-try:
-    from workers.tasks import process_job
-    CELERY_AVAILABLE = True
-except ImportError:
-    CELERY_AVAILABLE = False
-    process_job = None
-
 router = APIRouter()
 
 # Initialize audit logger
@@ -38,6 +31,46 @@ except ImportError:
     audit_logger = None
 
 
+# Accepted upload media types
+ALLOWED_CONTENT_TYPES = {
+    "audio/mpeg", "audio/wav", "audio/x-wav", "audio/mp3",
+    "audio/ogg", "audio/flac", "audio/m4a", "audio/aac",
+    "video/mp4", "video/webm", "video/mpeg", "video/quicktime",
+    "video/x-msvideo", "video/x-matroska",
+}
+ALLOWED_EXTENSIONS = {
+    ".mp3", ".wav", ".ogg", ".oga", ".flac", ".m4a", ".aac",
+    ".mp4", ".webm", ".mpeg", ".mov", ".avi", ".mkv",
+}
+
+
+def validate_media_type(filename: Optional[str], content_type: Optional[str]):
+    """Raise 400 unless the upload looks like supported audio or video."""
+    import os
+    
+    if (content_type or "") in ALLOWED_CONTENT_TYPES:
+        return
+    
+    # Try to infer from extension
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Allowed: audio (mp3, wav, ogg, flac, m4a) and video (mp4, webm, mkv, mov)",
+        )
+
+
+def new_upload_path(filename: Optional[str]):
+    """Generate a unique path under the upload directory, keeping the extension."""
+    from config import settings
+    import os
+    import uuid
+    
+    file_id = str(uuid.uuid4())
+    ext = os.path.splitext(filename or "file")[1] or ".mp3"
+    return settings.upload_dir / f"{file_id}{ext}"
+
+
 @router.post("", response_model=JobResponse, status_code=201)
 async def create_job(
     request: Request,
@@ -59,31 +92,82 @@ async def create_job(
     
     Upload an audio or video file and configure processing options.
     """
-    from config import settings
-    import aiofiles
-    import os
-    import uuid
-    import hashlib
-    
-    # Validate file type
-    allowed_types = {
-        "audio/mpeg", "audio/wav", "audio/x-wav", "audio/mp3",
-        "audio/ogg", "audio/flac", "audio/m4a", "audio/aac",
-        "video/mp4", "video/webm", "video/mpeg", "video/quicktime",
-        "video/x-msvideo", "video/x-matroska",
-    }
+    from services.uploads import save_upload
     
-    content_type = file.content_type or ""
-    if content_type not in allowed_types:
-        # Try to infer from extension
-        ext = os.path.splitext(file.filename or "")[1].lower()
-        valid_extensions = {".mp3", ".wav", ".ogg", ".oga", ".flac", ".m4a", ".aac",
-                           ".mp4", ".webm", ".mpeg", ".mov", ".avi", ".mkv"}
-        if ext not in valid_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file type. Allowed: audio (mp3, wav, ogg, flac, m4a) and video (mp4, webm, mkv, mov)",
-            )
+    validate_media_type(file.filename, file.content_type)
+    
+    # Stream uploaded file to disk, hashing as we go
+    upload_path = new_upload_path(file.filename)
+    saved = await save_upload(file, upload_path)
+    
+    return await submit_uploaded_job(
+        session,
+        request,
+        filename=file.filename or "unknown",
+        upload_path=upload_path,
+        file_size=saved.size,
+        file_hash=saved.file_hash,
+        language=language,
+        translate_to=translate_to,
+        model_id=model_id,
+        diarization_model_id=diarization_model_id,
+        tts_model_id=tts_model_id,
+        enable_diarization=enable_diarization,
+        enable_tts=enable_tts,
+        sync_tts_timing=sync_tts_timing,
+        output_formats=output_formats,
+        priority=priority,
+    )
+
+
+async def submit_uploaded_job(
+    session: AsyncSession,
+    request: Request,
+    **options,
+) -> JobResponse:
+    """
+    Create the Job record for a file already stored on disk and queue it.
+    
+    Used by direct multipart uploads; takes the keyword arguments of
+    create_job_record.
+    """
+    job = await create_job_record(session, request, **options)
+    return await queue_job(session, job)
+
+
+async def create_job_record(
+    session: AsyncSession,
+    request: Request,
+    *,
+    filename: str,
+    upload_path,
+    file_size: int,
+    file_hash: str,
+    language: str = "auto",
+    translate_to: Optional[str] = None,
+    model_id: Optional[str] = None,
+    diarization_model_id: Optional[str] = None,
+    tts_model_id: Optional[str] = None,
+    enable_diarization: bool = False,
+    enable_tts: bool = False,
+    sync_tts_timing: bool = True,
+    output_formats: str = "json,srt",
+    priority: int = 5,
+) -> Job:
+    """
+    Validate the processing options and commit a PENDING Job for upload_path.
+    
+    The job is not claimable until queue_job runs, so the file may still be
+    moved into place in between (finalized resumable uploads).
+    """
+    # Parse output formats
+    try:
+        formats = [OutputFormat(f.strip()) for f in output_formats.split(",") if f.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid output_formats. Allowed: {', '.join(f.value for f in OutputFormat)}",
+        )
     
     # Get default model if not specified
     if not model_id:
@@ -96,24 +180,6 @@ async def create_job(
         default_model = result.scalar_one_or_none()
         model_id = default_model.id if default_model else None
     
-    # Generate unique file path
-    file_id = str(uuid.uuid4())
-    ext = os.path.splitext(file.filename or "file")[1] or ".mp3"
-    upload_path = settings.upload_dir / f"{file_id}{ext}"
-    
-    # Save uploaded file and compute hash
-    content = await file.read()
-    try:
-        import xxhash
-        file_hash = xxhash.xxh3_64(content).hexdigest()
-    except ImportError:
-        file_hash = hashlib.sha256(content).hexdigest()
-    async with aiofiles.open(upload_path, "wb") as f:
-        await f.write(content)
-    
-    # Parse output formats
-    formats = [OutputFormat(f.strip()) for f in output_formats.split(",") if f.strip()]
-    
     # Calculate queue position
     result = await session.execute(
         select(func.count(Job.id)).where(
@@ -124,9 +190,10 @@ async def create_job(
     
     # Create job record
     job = Job(
-        filename=file.filename or "unknown",
+        filename=filename,
         original_path=str(upload_path),
-        file_size=len(content),
+        file_size=file_size,
+        file_hash=file_hash,
         language=language,
         translate_to=translate_to,
         model_id=model_id,
@@ -138,7 +205,8 @@ async def create_job(
         output_formats=[f.value for f in formats],
         priority=priority,
         queue_position=queue_position,
-        status=JobStatus.QUEUED,
+        # Not claimable until queue_job has run the reuse check
+        status=JobStatus.PENDING,
     )
     
     session.add(job)
@@ -154,8 +222,8 @@ async def create_job(
                 request=request,
                 job_id=job.id,
                 file_hash=file_hash,
-                file_name=file.filename,
-                file_size_bytes=len(content),
+                file_name=filename,
+                file_size_bytes=file_size,
                 status="queued",
                 metadata={
                     "language": language,
@@ -166,14 +234,26 @@ async def create_job(
         except Exception:
             pass  # Don't fail job creation if audit fails
     
+    return job
+
+
+async def queue_job(session: AsyncSession, job: Job) -> JobResponse:
+    """Reuse an identical earlier transcript, or queue a PENDING job for processing."""
+    queue_position = job.queue_position
+    
+    # Identical media with identical options: reuse the earlier transcript
+    from services.dedup import try_reuse_transcript
+    reused = await try_reuse_transcript(session, job)
+    
     # Queue the job for processing
-    if CELERY_AVAILABLE and process_job:
-        # Production: Use Celery
-        process_job.delay(job.id)
+    if reused:
+        queue_position = None
     else:
-        # Development: Use simple background tasks
-        from services.background_tasks import start_job_background
-        start_job_background(job.id)
+        job.status = JobStatus.QUEUED
+        await session.commit()
+        
+        from services.dispatch import dispatch_job
+        dispatch_job(job.id)
     
     return JobResponse(
         id=job.id,
@@ -185,10 +265,14 @@ async def create_job(
         enable_diarization=job.enable_diarization,
         enable_tts=job.enable_tts,
         sync_tts_timing=job.sync_tts_timing,
-        output_formats=formats,
+        output_formats=[OutputFormat(f) for f in job.output_formats],
         priority=job.priority,
         queue_position=queue_position,
         created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        duration=job.duration,
+        transcript_url=f"/api/jobs/{job.id}/transcript" if job.transcript_path else None,
     )
 
 
@@ -300,6 +384,21 @@ async def delete_job(
     if job.tts_audio_path and os.path.exists(job.tts_audio_path):
         os.remove(job.tts_audio_path)
     
+    # Drop the shared decoded audio once no other job uses the same media
+    if job.file_hash:
+        from services.audio import remove_cached_audio
+        result = await session.execute(
+            select(func.count(Job.id)).where(
+                Job.file_hash == job.file_hash,
+                Job.id != job.id,
+            )
+        )
+        if not result.scalar():
+            remove_cached_audio(job.original_path, job.file_hash)
+    
+    # A running job's pipeline is not stopped here; its next step finds the
+    # job gone, and that step's finalize_job or error callback issues the
+    # next scheduling slot, so the cap is not exceeded meanwhile
     await session.delete(job)
     await session.commit()
 
@@ -396,6 +495,9 @@ async def update_speakers(
     
     Accepts a mapping of old speaker names to new names.
     Example: {"SPEAKER_00": "Alice", "SPEAKER_01": "Bob"}
+    
+    The renamed speakers' voice embeddings are added to the named speaker
+    profiles, which diarization matches in later jobs.
     """
     # Get the job
     result = await session.execute(select(Job).where(Job.id == job_id))
@@ -432,6 +534,9 @@ async def update_speakers(
             segment.speaker = update.speaker_map[segment.speaker]
             updated_count += 1
     
+    # Remember the named voices so later recordings are labelled automatically
+    await learn_speaker_names(session, transcript.id, update.speaker_map)
+    
     await session.commit()
     
     return {
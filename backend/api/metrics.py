@@ -57,12 +57,15 @@ async def get_metrics_data():
         )
         downloaded_models = result.scalar() or 0
         
+        from api.queue import manager
+        
         return {
             "status_counts": status_counts,
             "total_duration": total_duration,
             "avg_processing_time": avg_processing_time,
             "jobs_last_hour": jobs_last_hour,
             "downloaded_models": downloaded_models,
+            "websocket": manager.stats(),
         }
 
 
@@ -100,6 +103,26 @@ async def get_metrics():
         "# HELP stt_models_downloaded Number of downloaded models",
         "# TYPE stt_models_downloaded gauge",
         f"stt_models_downloaded {data['downloaded_models']}",
+        "",
+        "# HELP stt_websocket_connections Connected WebSocket clients",
+        "# TYPE stt_websocket_connections gauge",
+        f"stt_websocket_connections {data['websocket']['connections']}",
+        "",
+        "# HELP stt_websocket_queue_depth Messages waiting in WebSocket send queues",
+        "# TYPE stt_websocket_queue_depth gauge",
+        f"stt_websocket_queue_depth {data['websocket']['queue_depth']}",
+        "",
+        "# HELP stt_websocket_queue_depth_max Deepest single WebSocket send queue",
+        "# TYPE stt_websocket_queue_depth_max gauge",
+        f"stt_websocket_queue_depth_max {data['websocket']['queue_depth_max']}",
+        "",
+        "# HELP stt_websocket_messages_dropped_total Messages dropped for slow clients",
+        "# TYPE stt_websocket_messages_dropped_total counter",
+        f"stt_websocket_messages_dropped_total {data['websocket']['dropped']}",
+        "",
+        "# HELP stt_websocket_messages_coalesced_total Progress messages replaced by newer ones",
+        "# TYPE stt_websocket_messages_coalesced_total counter",
+        f"stt_websocket_messages_coalesced_total {data['websocket']['coalesced']}",
     ])
     
     return "\n".join(lines)
@@ -1,44 +1,154 @@
 """Queue management API routes with WebSocket support."""
 
-from typing import List
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from typing import Dict, List, Optional, Set
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 import json
 import asyncio
+from collections import OrderedDict
 
+from config import settings
 from services.database import get_session, async_session_maker
+from services.events import publish_event
+from services.scheduler import QUEUE_DISPLAY_ORDER
 from models.database import Job
 from schemas.job import JobStatus, JobResponse, OutputFormat
 
 router = APIRouter()
 
+# Event types where only the latest queued message per job matters
+PROGRESS_EVENTS = {"job_progress", "progress"}
+
+
+class ClientConnection:
+    """
+    One WebSocket client with its own bounded send queue and writer task.
+    
+    Broadcasting only enqueues, so a slow client never delays the others.
+    Progress events for the same job replace each other while queued
+    (latest wins); when the queue is full the oldest message is dropped.
+    """
+    
+    def __init__(self, websocket: WebSocket, job_ids: Optional[Set[str]], max_queue: int):
+        self.websocket = websocket
+        # Jobs watched (None = all jobs)
+        self.job_ids = job_ids
+        self.max_queue = max_queue
+        self.queue: "OrderedDict[object, str]" = OrderedDict()
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.coalesced = 0
+        self.writer: Optional[asyncio.Task] = None
+    
+    def wants(self, job_id: Optional[str]) -> bool:
+        return job_id is None or self.job_ids is None or job_id in self.job_ids
+    
+    def enqueue(self, payload: str, coalesce_key: Optional[str] = None):
+        key = coalesce_key or object()
+        if key in self.queue:
+            # Replace in place: keeps its turn, carries the newest state
+            self.queue[key] = payload
+            self.coalesced += 1
+        else:
+            if len(self.queue) >= self.max_queue:
+                self.queue.popitem(last=False)
+                self.dropped += 1
+            self.queue[key] = payload
+        self.ready.set()
+    
+    async def run_writer(self, on_error):
+        """Send queued payloads in order until the socket fails."""
+        try:
+            while True:
+                await self.ready.wait()
+                while self.queue:
+                    _, payload = self.queue.popitem(last=False)
+                    await self.websocket.send_text(payload)
+                self.ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            on_error(self.websocket)
+
 
 class ConnectionManager:
-    """Manage WebSocket connections for real-time queue updates."""
+    """
+    Manage WebSocket connections for real-time queue updates.
+    
+    Each connection may watch a subset of jobs; events about other jobs are
+    not sent to it. Queue-wide events go to everyone. Messages are
+    serialized once per broadcast and written by a per-connection task.
+    """
     
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, max_queue: Optional[int] = None):
+        self.max_queue = max_queue or settings.ws_send_queue_size
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        # Totals from connections that have since closed
+        self.closed_dropped = 0
+        self.closed_coalesced = 0
     
-    async def connect(self, websocket: WebSocket):
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+    
+    async def connect(self, websocket: WebSocket, job_ids: Optional[Set[str]] = None):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = ClientConnection(websocket, job_ids, self.max_queue)
+        client.writer = asyncio.create_task(client.run_writer(self.disconnect))
+        self.connections[websocket] = client
     
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        client = self.connections.pop(websocket, None)
+        if client is None:
+            return
+        self.closed_dropped += client.dropped
+        self.closed_coalesced += client.coalesced
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+    
+    def subscribe(self, websocket: WebSocket, job_ids: Optional[Set[str]]):
+        """Limit a connection to events about job_ids (None = all jobs)."""
+        client = self.connections.get(websocket)
+        if client:
+            client.job_ids = job_ids
+    
+    def watched(self, websocket: WebSocket) -> Optional[Set[str]]:
+        client = self.connections.get(websocket)
+        return client.job_ids if client else None
+    
+    def send(self, websocket: WebSocket, message: dict):
+        """Queue a message for one client."""
+        client = self.connections.get(websocket)
+        if client:
+            client.enqueue(json.dumps(message, default=str))
     
     async def broadcast(self, message: dict):
-        """Send message to all connected clients."""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
+        """Queue message for all connected clients watching its job."""
+        from services.events import event_job_id
+        
+        if not self.connections:
+            return
+        
+        job_id = event_job_id(message)
+        payload = json.dumps(message, default=str)
+        coalesce_key = f"progress:{job_id}" if job_id and message.get("type") in PROGRESS_EVENTS else None
         
-        for conn in disconnected:
-            self.disconnect(conn)
+        for client in list(self.connections.values()):
+            if client.wants(job_id):
+                client.enqueue(payload, coalesce_key)
+    
+    def stats(self) -> dict:
+        """Send queue statistics for the metrics endpoint."""
+        clients = list(self.connections.values())
+        depths = [len(c.queue) for c in clients]
+        return {
+            "connections": len(clients),
+            "queue_depth": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "dropped": self.closed_dropped + sum(c.dropped for c in clients),
+            "coalesced": self.closed_coalesced + sum(c.coalesced for c in clients),
+        }
 
 
 manager = ConnectionManager()
@@ -59,11 +169,11 @@ async def get_queue_status(
         )
         status_counts[status.value] = result.scalar() or 0
     
-    # Get queued jobs ordered by priority and creation time
+    # Get jobs in the order the scheduler will run them
     result = await session.execute(
         select(Job)
         .where(Job.status.in_([JobStatus.QUEUED, JobStatus.PROCESSING, JobStatus.TRANSCRIBING]))
-        .order_by(Job.priority.asc(), Job.created_at.asc())
+        .order_by(*QUEUE_DISPLAY_ORDER)
         .limit(50)
     )
     queued_jobs = result.scalars().all()
@@ -126,7 +236,7 @@ async def update_job_priority(
     await session.commit()
     
     # Notify all clients about the change
-    await manager.broadcast({
+    await publish_event({
         "type": "priority_changed",
         "job_id": job_id,
         "priority": priority,
@@ -161,7 +271,7 @@ async def move_job_in_queue(
     job.queue_position = new_position
     await session.commit()
     
-    await manager.broadcast({
+    await publish_event({
         "type": "queue_reordered",
         "job_id": job_id,
         "position": new_position,
@@ -222,7 +332,7 @@ async def batch_reorder_queue(
     await session.commit()
     
     # Notify all clients about the reorder
-    await manager.broadcast({
+    await publish_event({
         "type": "queue_batch_reordered",
         "job_ids": request.job_ids,
     })
@@ -233,8 +343,19 @@ async def batch_reorder_queue(
     }
 
 
+def parse_job_ids(value) -> Optional[Set[str]]:
+    """Job filter from a comma-separated string or list (empty = all jobs)."""
+    if isinstance(value, str):
+        value = value.split(",")
+    job_ids = {str(job_id).strip() for job_id in value or [] if str(job_id).strip()}
+    return job_ids or None
+
+
 @router.websocket("/ws")
-async def queue_websocket(websocket: WebSocket):
+async def queue_websocket(
+    websocket: WebSocket,
+    job_ids: Optional[str] = Query(default=None),
+):
     """
     WebSocket endpoint for real-time queue updates.
     
@@ -243,8 +364,12 @@ async def queue_websocket(websocket: WebSocket):
     - A job status changes
     - A job completes or fails
     - Queue priority/order changes
+    
+    To watch only some jobs, connect with ``?job_ids=a,b`` or send
+    ``{"type": "subscribe", "job_ids": [...]}``; an empty list restores
+    all jobs.
     """
-    await manager.connect(websocket)
+    await manager.connect(websocket, parse_job_ids(job_ids))
     
     try:
         # Send initial queue state
@@ -256,11 +381,15 @@ async def queue_websocket(websocket: WebSocket):
                     JobStatus.TRANSCRIBING, JobStatus.DIARIZING,
                     JobStatus.SYNTHESIZING,
                 ]))
-                .order_by(Job.priority.asc(), Job.created_at.asc())
+                .order_by(*QUEUE_DISPLAY_ORDER)
             )
             jobs = result.scalars().all()
             
-            await websocket.send_json({
+            watched = manager.watched(websocket)
+            if watched:
+                jobs = [job for job in jobs if job.id in watched]
+            
+            manager.send(websocket, {
                 "type": "initial_state",
                 "queue": [
                     {
@@ -285,11 +414,18 @@ async def queue_websocket(websocket: WebSocket):
                 # Handle ping/pong for keepalive
                 message = json.loads(data)
                 if message.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    manager.send(websocket, {"type": "pong"})
+                elif message.get("type") == "subscribe":
+                    watched = parse_job_ids(message.get("job_ids"))
+                    manager.subscribe(websocket, watched)
+                    manager.send(websocket, {
+                        "type": "subscribed",
+                        "job_ids": sorted(watched) if watched else None,
+                    })
                     
             except asyncio.TimeoutError:
                 # Send keepalive ping
-                await websocket.send_json({"type": "ping"})
+                manager.send(websocket, {"type": "ping"})
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -303,7 +439,7 @@ async def notify_job_update(job: Job, update_type: str = "status_changed"):
     
     Called by workers when job state changes.
     """
-    await manager.broadcast({
+    await publish_event({
         "type": update_type,
         "job": {
             "id": job.id,
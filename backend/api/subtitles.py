@@ -1,7 +1,5 @@
 """Subtitle burn-in API for video files."""
 
-import asyncio
-import subprocess
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
@@ -10,6 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from services.database import get_session
+from services.media import run_ffmpeg
 from models.database import Job, Transcript
 from schemas.job import JobStatus
 from config import settings
@@ -70,8 +69,8 @@ async def burn_subtitles_task(job_id: str, options: BurnSubtitlesRequest):
         }
         style += f",{position_map.get(options.position, position_map['bottom'])}"
         
-        cmd = [
-            "ffmpeg", "-y",
+        args = [
+            "-y",
             "-i", str(input_path),
             "-vf", f"subtitles={str(srt_path)}:force_style='{style}'",
             "-c:a", "copy",
@@ -79,17 +78,12 @@ async def burn_subtitles_task(job_id: str, options: BurnSubtitlesRequest):
         ]
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            await process.communicate()
+            # Runs through the shared media toolkit (concurrency limit + timeout)
+            await run_ffmpeg(args)
             
-            if process.returncode == 0:
-                # Update job with subtitled video path
-                job.tts_audio_path = str(output_path)  # Reusing field for subtitled video
-                await session.commit()
+            # Update job with subtitled video path
+            job.tts_audio_path = str(output_path)  # Reusing field for subtitled video
+            await session.commit()
         except Exception as e:
             print(f"Subtitle burn-in failed: {e}")
         finally:
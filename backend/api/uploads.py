@@ -0,0 +1,329 @@
+"""
+Resumable chunked upload API (tus-style).
+
+Large recordings are uploaded in pieces:
+
+1. ``POST /api/uploads`` declares the file and returns an upload ID.
+2. ``PATCH /api/uploads/{id}`` appends a chunk at ``Upload-Offset``.
+3. ``HEAD /api/uploads/{id}`` reports the current offset after a failure,
+   so the client resumes instead of restarting from zero.
+4. ``POST /api/uploads/{id}/finalize`` creates the job exactly like
+   ``POST /api/jobs`` does.
+
+Uploads untouched for RESUMABLE_UPLOAD_EXPIRY_HOURS are abandoned: their
+staging files are swept at startup and whenever a new upload starts.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+import aiofiles
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from services.database import get_session
+from schemas.job import JobResponse, JobStatus
+
+router = APIRouter()
+
+# Serialize PATCH requests per upload within this process
+_upload_locks: Dict[str, asyncio.Lock] = {}
+
+
+class UploadCreate(BaseModel):
+    """Request body for starting a resumable upload."""
+    filename: str
+    size: int = Field(..., gt=0, description="Total file size in bytes")
+    content_type: Optional[str] = None
+
+
+def staging_dir() -> Path:
+    """Directory holding in-progress uploads."""
+    path = settings.upload_dir / "staging"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _part_path(upload_id: str) -> Path:
+    return staging_dir() / f"{upload_id}.part"
+
+
+def _meta_path(upload_id: str) -> Path:
+    return staging_dir() / f"{upload_id}.json"
+
+
+def _last_activity(upload_id: str, meta: Optional[dict] = None) -> float:
+    """Time of the upload's creation or last appended chunk."""
+    times = [meta.get("created_at", 0)] if meta else []
+    for path in (_part_path(upload_id), _meta_path(upload_id)):
+        try:
+            times.append(path.stat().st_mtime)
+        except FileNotFoundError:
+            pass
+    return max(times, default=0)
+
+
+def _is_expired(upload_id: str, meta: Optional[dict] = None) -> bool:
+    age = time.time() - _last_activity(upload_id, meta)
+    return age > settings.resumable_upload_expiry_hours * 3600
+
+
+def _discard(upload_id: str):
+    """Remove an upload's staging files and lock."""
+    _part_path(upload_id).unlink(missing_ok=True)
+    _meta_path(upload_id).unlink(missing_ok=True)
+    _upload_locks.pop(upload_id, None)
+
+
+def sweep_expired_uploads() -> int:
+    """Discard abandoned uploads; returns how many were removed."""
+    upload_ids = {path.stem for path in staging_dir().iterdir() if path.suffix in (".part", ".json")}
+    expired = 0
+    for upload_id in upload_ids:
+        lock = _upload_locks.get(upload_id)
+        if lock is not None and lock.locked():
+            continue
+        try:
+            meta = json.loads(_meta_path(upload_id).read_text())
+        except (OSError, ValueError):
+            meta = None
+        if _is_expired(upload_id, meta):
+            _discard(upload_id)
+            expired += 1
+    return expired
+
+
+def _load_meta(upload_id: str) -> dict:
+    """Load upload metadata, raising 404 for unknown or expired IDs."""
+    try:
+        uuid.UUID(upload_id)
+    except ValueError:
+        raise HTTPException(404, "Upload not found")
+
+    meta_path = _meta_path(upload_id)
+    if not meta_path.exists():
+        raise HTTPException(404, "Upload not found")
+    meta = json.loads(meta_path.read_text())
+
+    lock = _upload_locks.get(upload_id)
+    if (lock is None or not lock.locked()) and _is_expired(upload_id, meta):
+        _discard(upload_id)
+        raise HTTPException(404, "Upload not found")
+    return meta
+
+
+def _current_offset(upload_id: str) -> int:
+    part_path = _part_path(upload_id)
+    return part_path.stat().st_size if part_path.exists() else 0
+
+
+def _offset_headers(upload_id: str, meta: dict) -> dict:
+    return {
+        "Upload-Offset": str(_current_offset(upload_id)),
+        "Upload-Length": str(meta["size"]),
+        "Cache-Control": "no-store",
+    }
+
+
+@router.post("", status_code=201)
+async def create_upload(upload: UploadCreate):
+    """Start a resumable upload and reserve a staging file."""
+    from api.jobs import validate_media_type
+
+    validate_media_type(upload.filename, upload.content_type)
+
+    if upload.size > settings.max_resumable_upload_size_mb * 1024 * 1024:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {settings.max_resumable_upload_size_mb} MB",
+        )
+
+    sweep_expired_uploads()
+
+    upload_id = str(uuid.uuid4())
+    _part_path(upload_id).touch()
+    _meta_path(upload_id).write_text(json.dumps({
+        "filename": upload.filename,
+        "size": upload.size,
+        "content_type": upload.content_type,
+        "created_at": time.time(),
+    }))
+
+    return {"id": upload_id, "offset": 0, "size": upload.size}
+
+
+@router.head("/{upload_id}")
+async def get_upload_offset(upload_id: str):
+    """Report how many bytes have been received so the client can resume."""
+    meta = _load_meta(upload_id)
+    return Response(status_code=200, headers=_offset_headers(upload_id, meta))
+
+
+@router.get("/{upload_id}")
+async def get_upload(upload_id: str):
+    """Get upload status."""
+    meta = _load_meta(upload_id)
+    offset = _current_offset(upload_id)
+
+    return {
+        "id": upload_id,
+        "filename": meta["filename"],
+        "offset": offset,
+        "size": meta["size"],
+        "complete": offset == meta["size"],
+    }
+
+
+@router.patch("/{upload_id}", status_code=204)
+async def append_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+):
+    """
+    Append a chunk to the staging file.
+
+    The request body is streamed straight to disk. The chunk must start at
+    the current offset; on mismatch a 409 is returned with the offset the
+    server actually has.
+    """
+    meta = _load_meta(upload_id)
+    lock = _upload_locks.setdefault(upload_id, asyncio.Lock())
+
+    async with lock:
+        offset = _current_offset(upload_id)
+        if upload_offset != offset:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload offset mismatch: server has {offset} bytes",
+                headers=_offset_headers(upload_id, meta),
+            )
+
+        written = 0
+        try:
+            async with aiofiles.open(_part_path(upload_id), "ab") as f:
+                async for chunk in request.stream():
+                    if offset + written + len(chunk) > meta["size"]:
+                        raise HTTPException(413, "Chunk exceeds declared upload size")
+                    await f.write(chunk)
+                    written += len(chunk)
+        except HTTPException:
+            # Roll back the rejected chunk so the client can retry it
+            os.truncate(_part_path(upload_id), offset)
+            raise
+        # On disconnect the bytes received so far are kept; HEAD reports them
+
+    return Response(status_code=204, headers=_offset_headers(upload_id, meta))
+
+
+@router.delete("/{upload_id}", status_code=204)
+async def abort_upload(upload_id: str):
+    """Abort an upload and discard its staging file."""
+    _load_meta(upload_id)
+    _discard(upload_id)
+
+
+@router.post("/{upload_id}/finalize", response_model=JobResponse, status_code=201)
+async def finalize_upload(
+    upload_id: str,
+    request: Request,
+    language: str = Form(default="auto"),
+    translate_to: Optional[str] = Form(default=None),
+    model_id: Optional[str] = Form(default=None),
+    diarization_model_id: Optional[str] = Form(default=None),
+    tts_model_id: Optional[str] = Form(default=None),
+    enable_diarization: bool = Form(default=False),
+    enable_tts: bool = Form(default=False),
+    sync_tts_timing: bool = Form(default=True),
+    output_formats: str = Form(default="json,srt"),
+    priority: int = Form(default=5, ge=1, le=10),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Complete an upload and create its transcription job.
+
+    Accepts the same processing options as ``POST /api/jobs``.
+    """
+    from api.jobs import create_job_record, new_upload_path, queue_job
+    from services.uploads import hash_file
+
+    meta = _load_meta(upload_id)
+    lock = _upload_locks.setdefault(upload_id, asyncio.Lock())
+
+    async with lock:
+        offset = _current_offset(upload_id)
+        if offset != meta["size"]:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete: {offset} of {meta['size']} bytes received",
+            )
+
+        file_hash = await hash_file(_part_path(upload_id))
+
+        # Validate the options and commit the (not yet claimable) job before
+        # touching the staged file, so a rejected request leaves the upload
+        # resumable and finalize can simply be retried
+        upload_path = new_upload_path(meta["filename"])
+        job = await create_job_record(
+            session,
+            request,
+            filename=meta["filename"],
+            upload_path=upload_path,
+            file_size=offset,
+            file_hash=file_hash,
+            language=language,
+            translate_to=translate_to,
+            model_id=model_id,
+            diarization_model_id=diarization_model_id,
+            tts_model_id=tts_model_id,
+            enable_diarization=enable_diarization,
+            enable_tts=enable_tts,
+            sync_tts_timing=sync_tts_timing,
+            output_formats=output_formats,
+            priority=priority,
+        )
+
+        try:
+            os.replace(_part_path(upload_id), upload_path)
+            response = await queue_job(session, job)
+        except BaseException:
+            await _restore_staging(session, job, upload_id, upload_path)
+            raise
+
+        # The job owns the file now: drop the staging metadata
+        _meta_path(upload_id).unlink(missing_ok=True)
+
+    _upload_locks.pop(upload_id, None)
+    return response
+
+
+async def _restore_staging(session: AsyncSession, job, upload_id: str, upload_path: Path):
+    """
+    Undo a finalize that failed before its job was queued.
+
+    Moves the file back to staging and deletes the PENDING job. A job that
+    did get queued (or reused a transcript) keeps the file.
+    """
+    try:
+        await session.rollback()
+        await session.refresh(job)
+        if job.status != JobStatus.PENDING:
+            return
+    except Exception:
+        pass  # Database unreachable: the queue step cannot have committed
+
+    if upload_path.exists():
+        os.replace(upload_path, _part_path(upload_id))
+
+    try:
+        await session.delete(job)
+        await session.commit()
+    except Exception:
+        pass  # A stray PENDING job is never claimed
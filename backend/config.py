@@ -52,6 +52,18 @@ class Settings(BaseSettings):
         default=500,
         description="Maximum upload file size in MB",
     )
+    max_resumable_upload_size_mb: int = Field(
+        default=10240,
+        description="Maximum file size in MB for resumable chunked uploads",
+    )
+    resumable_upload_expiry_hours: float = Field(
+        default=24,
+        description="Hours without a new chunk after which a resumable upload is discarded",
+    )
+    batch_upload_concurrency: int = Field(
+        default=4,
+        description="Files of a batch upload written to disk concurrently",
+    )
 
     # CORS - stored as comma-separated string
     cors_origins_str: str = Field(
@@ -95,6 +107,130 @@ class Settings(BaseSettings):
         default=2,
         description="Maximum concurrent transcription jobs",
     )
+    max_running_jobs: int = Field(
+        default=0,
+        description="Job pipelines running at once across all Celery workers (0 = no limit)",
+    )
+    stale_job_hours: float = Field(
+        default=12,
+        description="With max_running_jobs set, running jobs older than this are failed as stale (0 = never)",
+    )
+    stt_batch_size: int = Field(
+        default=0,
+        description="Batched faster-whisper inference batch size (0 = derive from VRAM, 1 = disable batching)",
+    )
+    stt_chunk_threshold: float = Field(
+        default=1800,
+        description="Recordings at least this many seconds long are transcribed in parallel chunks (0 = never)",
+    )
+    stt_chunk_length: float = Field(
+        default=600,
+        description="Target length in seconds of each parallel transcription chunk",
+    )
+    stt_chunk_overlap: float = Field(
+        default=5,
+        description="Seconds of audio shared between neighbouring chunks",
+    )
+    model_vram_budget_gb: float = Field(
+        default=0,
+        description="GPU memory models may occupy per worker (0 = 90% of the largest GPU)",
+    )
+    model_ram_budget_gb: float = Field(
+        default=0,
+        description="System memory models may occupy per worker (0 = 60% of RAM)",
+    )
+    model_default_size_gb: float = Field(
+        default=2.0,
+        description="Assumed size of models missing from the evaluation tables",
+    )
+    pinned_models: str = Field(
+        default="",
+        description="Comma-separated model IDs never evicted from the model cache",
+    )
+    diarization_word_speakers: bool = Field(
+        default=True,
+        description="Assign speakers per word in segments that span a speaker change",
+    )
+    speechbrain_window: float = Field(
+        default=1.5,
+        description="Seconds of speech per embedding window in SpeechBrain diarization",
+    )
+    speechbrain_hop: float = Field(
+        default=0.75,
+        description="Seconds between embedding windows in SpeechBrain diarization",
+    )
+    speechbrain_batch_size: int = Field(
+        default=64,
+        description="Windows embedded per batch in SpeechBrain diarization",
+    )
+    speechbrain_clustering: str = Field(
+        default="spectral",
+        description="SpeechBrain diarization clustering: spectral or agglomerative",
+    )
+    speechbrain_max_speakers: int = Field(
+        default=8,
+        description="Most speakers SpeechBrain diarization will find",
+    )
+    speaker_match_threshold: float = Field(
+        default=0.7,
+        description="Cosine similarity at which a diarized speaker is labelled with a known speaker's name",
+    )
+    speaker_index_backend: str = Field(
+        default="numpy",
+        description="Speaker search backend: numpy (brute force) or faiss",
+    )
+    warmup_model_types: str = Field(
+        default="",
+        description="Comma-separated model types whose default model a worker warms up at startup",
+    )
+    warmup_models: str = Field(
+        default="",
+        description="Comma-separated model IDs a worker warms up at startup",
+    )
+    worker_state_ttl: int = Field(
+        default=60,
+        description="Seconds a worker's registry record lives without being refreshed",
+    )
+    worker_heartbeat_interval: int = Field(
+        default=15,
+        description="Seconds between worker registry heartbeats",
+    )
+    model_server_socket: str = Field(
+        default="",
+        description="Unix socket of the per-host model server; empty loads models in every worker process",
+    )
+    model_server_authkey: str = Field(
+        default="",
+        description="Shared key the model server and its clients authenticate with (empty = derived from DATABASE_URL)",
+    )
+    inference_threads: int = Field(
+        default=2,
+        description="Threads per process for blocking model inference",
+    )
+    inference_processes: int = Field(
+        default=1,
+        description="Processes for pure-Python inference paths (e.g. NeMo diarization)",
+    )
+    progress_min_interval: float = Field(
+        default=1.0,
+        description="Minimum seconds between progress updates from a running stage",
+    )
+    progress_min_delta: float = Field(
+        default=1.0,
+        description="Minimum change in percent between progress updates",
+    )
+    ws_send_queue_size: int = Field(
+        default=256,
+        description="Messages buffered per WebSocket client before the oldest are dropped",
+    )
+    max_concurrent_media_processes: int = Field(
+        default=4,
+        description="Maximum concurrent ffmpeg/ffprobe processes per event loop",
+    )
+    media_command_timeout: int = Field(
+        default=3600,
+        description="Timeout in seconds for a single ffmpeg/rubberband/piper run",
+    )
 
 
 settings = Settings()
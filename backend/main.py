@@ -7,12 +7,14 @@ Main entry point for the STT server with:
 - Celery integration for background task processing
 """
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from api import jobs, models, files, queue, history, stream, metrics, batches, transcripts, subtitles
+from api import jobs, models, files, queue, history, stream, metrics, batches, transcripts, subtitles, uploads
 from api import system as system_api
 from services.database import init_db
 from config import settings
@@ -23,9 +25,26 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     await init_db()
+    
+    # Discard resumable uploads abandoned while the API was down
+    from api.uploads import sweep_expired_uploads
+    sweep_expired_uploads()
+    
+    # Relay worker events from the bus to this process's WebSocket clients
+    from services.events import run_event_relay
+    relay = asyncio.create_task(run_event_relay())
+    
     yield
+    
     # Shutdown
-    pass
+    from services.inference import shutdown_inference_executors
+    shutdown_inference_executors()
+    
+    relay.cancel()
+    try:
+        await relay
+    except asyncio.CancelledError:
+        pass
 
 
 app = FastAPI(
@@ -44,6 +63,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized job uploads before the multipart body is spooled."""
+    if request.method == "POST" and request.url.path.rstrip("/") == "/api/jobs":
+        from services.uploads import max_upload_bytes
+        
+        content_length = request.headers.get("content-length", "")
+        # Allow some slack for multipart boundaries and form fields
+        if content_length.isdigit() and int(content_length) > max_upload_bytes() + 1024 * 1024:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large. Maximum size is {settings.max_upload_size_mb} MB"},
+            )
+    return await call_next(request)
+
 # Mount API routes
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 app.include_router(models.router, prefix="/api/models", tags=["Models"])
@@ -56,6 +91,7 @@ app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
 app.include_router(batches.router, prefix="/api/batches", tags=["Batches"])
 app.include_router(transcripts.router, prefix="/api/transcripts", tags=["Transcripts"])
 app.include_router(subtitles.router, prefix="/api/jobs", tags=["Subtitles"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["Uploads"])
 
 # Include audit log routes
 import sys
@@ -14,6 +14,7 @@ from sqlalchemy import (
     Enum as SQLEnum,
     JSON,
     ForeignKey,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship, DeclarativeBase
 from sqlalchemy.dialects.postgresql import UUID
@@ -71,6 +72,7 @@ class Job(Base):
     filename = Column(String, nullable=False)
     original_path = Column(String, nullable=False)
     file_size = Column(Integer)
+    file_hash = Column(String, index=True)  # xxh3_64 (or sha256) of the upload
     duration = Column(Float)  # Media duration in seconds
     
     # Processing options
@@ -199,6 +201,47 @@ class TranscriptSegment(Base):
     transcript = relationship("Transcript", back_populates="segments")
 
 
+class SpeakerProfile(Base):
+    """Named voice learned from speaker renames, matched across jobs."""
+
+    __tablename__ = "speaker_profiles"
+    # One profile per name and embedding model: only embeddings of the same
+    # size (same model) are comparable
+    __table_args__ = (UniqueConstraint("name", "dim"),)
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    name = Column(String, nullable=False)
+    dim = Column(Integer, nullable=False)
+    
+    # Normalized mean of the embeddings assigned to this voice
+    centroid = Column(JSON, nullable=False)
+    sample_count = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SpeakerEmbedding(Base):
+    """Voice embedding centroid of one diarized speaker in a transcript."""
+
+    __tablename__ = "speaker_embeddings"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    transcript_id = Column(String, ForeignKey("transcripts.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Label from the diarizer (SPEAKER_00) and the name shown in the transcript
+    label = Column(String, nullable=False)
+    speaker = Column(String, nullable=False)
+    
+    embedding = Column(JSON, nullable=False)
+    profile_id = Column(String, ForeignKey("speaker_profiles.id", ondelete="SET NULL"))
+    match_score = Column(Float)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class TTSOutput(Base):
     """TTS synthesized audio output."""
 
@@ -0,0 +1,175 @@
+"""
+Shared decoded-audio cache.
+
+Every source file is decoded exactly once into a 16 kHz mono float32 raw
+PCM artifact. All workers (STT engines, diarization, chunking) read that
+artifact through load_audio, which memory-maps it instead of decoding the
+media again. Artifacts are keyed by the upload's content hash, so re-uploads
+of the same media share them.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from config import settings
+
+SAMPLE_RATE = 16000
+
+VIDEO_EXTENSIONS = {".mp4", ".webm", ".mkv", ".mov", ".avi", ".mpeg"}
+
+
+def audio_cache_dir() -> Path:
+    """Directory holding content-addressed decoded audio."""
+    path = settings.upload_dir / "audio"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def audio_cache_key(file_path: str, cache_key: Optional[str] = None) -> str:
+    """
+    Cache key for a source file.
+
+    Uses the job's file hash when available; legacy jobs without one fall
+    back to a key derived from the path, size and modification time.
+    """
+    if cache_key:
+        return cache_key
+    stat = os.stat(file_path)
+    raw = f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def normalized_audio_path(file_path: str, cache_key: Optional[str] = None) -> Path:
+    """Location of the decoded float32 artifact for a source file."""
+    return audio_cache_dir() / f"{audio_cache_key(file_path, cache_key)}.f32"
+
+
+def partial_path(audio_path: Path) -> Path:
+    """Per-process temp path so concurrent writers never expose a partial file."""
+    return audio_path.with_name(f".{audio_path.stem}.{os.getpid()}{audio_path.suffix}")
+
+
+@asynccontextmanager
+async def _artifact_lock(audio_path: Path):
+    """Exclusive lock so only one process decodes a given source."""
+    lock_path = audio_path.with_suffix(".lock")
+    with open(lock_path, "w") as lock_file:
+        # Wait for the lock off the event loop
+        await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def decode_to_artifact(
+    source: Path,
+    audio_path: Path,
+    progress_callback: Optional[Callable[[float], None]] = None,
+):
+    """
+    Decode any audio/video file to 16 kHz mono float32 raw PCM.
+
+    progress_callback, if given, receives the decode's 0-100 percentage.
+    """
+    from services.media import extract_audio, probe_duration
+
+    duration = await probe_duration(source) if progress_callback else None
+    tmp_path = partial_path(audio_path)
+    try:
+        await extract_audio(
+            source,
+            tmp_path,
+            sample_rate=SAMPLE_RATE,
+            raw_float=True,
+            duration=duration,
+            progress_callback=progress_callback,
+        )
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    tmp_path.replace(audio_path)
+
+
+async def prepare_audio(
+    file_path: str,
+    cache_key: Optional[str] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+) -> str:
+    """
+    Audio-normalization stage.
+
+    Returns the path of the decoded artifact, decoding the source only if
+    no other job or stage has done so already. progress_callback receives
+    the decode's progress when this call does the decoding.
+    """
+    audio_path = normalized_audio_path(file_path, cache_key)
+
+    if not audio_path.exists():
+        async with _artifact_lock(audio_path):
+            # Another process may have finished while we waited
+            if not audio_path.exists():
+                await decode_to_artifact(Path(file_path), audio_path, progress_callback)
+
+    return str(audio_path)
+
+
+def load_audio(
+    audio_path: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Memory-map a decoded artifact as a read-only float32 array.
+
+    start/end (in seconds) select a slice without reading the rest.
+    """
+    if os.path.getsize(audio_path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    audio = np.memmap(audio_path, dtype=np.float32, mode="r")
+    if start is None and end is None:
+        return audio
+    lo = int((start or 0) * SAMPLE_RATE)
+    hi = None if end is None else int(end * SAMPLE_RATE)
+    return audio[lo:hi]
+
+
+def audio_duration(audio_path: str) -> float:
+    """Duration in seconds of a decoded artifact, without reading it."""
+    return os.path.getsize(audio_path) / 4 / SAMPLE_RATE
+
+
+def wav_for_artifact(audio_path: str) -> str:
+    """
+    PCM16 WAV copy of a decoded artifact, for engines that only take files.
+
+    Written from the already-decoded samples, so the source media is not
+    decoded again.
+    """
+    import soundfile as sf
+
+    wav_path = Path(audio_path).with_suffix(".wav")
+    if not wav_path.exists():
+        tmp_path = partial_path(wav_path)
+        audio = load_audio(audio_path)
+        block = SAMPLE_RATE * 60
+        # Write in one-minute blocks to keep memory flat on long files
+        with sf.SoundFile(str(tmp_path), "w", SAMPLE_RATE, 1, subtype="PCM_16") as out:
+            for start in range(0, len(audio), block):
+                out.write(audio[start:start + block])
+        tmp_path.replace(wav_path)
+    return str(wav_path)
+
+
+def remove_cached_audio(file_path: str, cache_key: Optional[str] = None):
+    """Delete the decoded artifacts for a source file."""
+    audio_path = normalized_audio_path(file_path, cache_key)
+    for path in (audio_path, audio_path.with_suffix(".wav"), audio_path.with_suffix(".lock")):
+        path.unlink(missing_ok=True)
@@ -10,6 +10,7 @@ from config import settings
 from services.database import async_session_maker
 from models.database import Job, Model, Transcript, TranscriptSegment
 from schemas.job import JobStatus
+from services.progress import ProgressReporter
 
 
 # Thread pool for running CPU-bound tasks
@@ -100,29 +101,17 @@ async def process_job_async(job_id: str):
 
 async def broadcast_progress(job_id: str, progress: float, stage: str, message: str):
     """Broadcast job progress to WebSocket clients."""
-    try:
-        from api.queue import manager
-        # Format matches frontend useWebSocket.ts expectations
-        await manager.broadcast({
-            "type": "job_progress",
-            "data": {
-                "jobId": job_id,
-                "stage": stage,
-                "progress": progress,
-                "message": message,
-            }
-        })
-    except Exception:
-        pass  # WebSocket might not be initialized
+    from services.events import publish_job_progress
+    await publish_job_progress(job_id, progress, stage, message)
 
 
 async def run_transcription(session, job):
     """Run transcription using faster-whisper."""
     from workers.stt_worker import (
         transcribe_faster_whisper,
-        extract_audio_if_needed,
         generate_output_files,
     )
+    from services.audio import prepare_audio
     from pathlib import Path
     
     # Get model
@@ -148,12 +137,17 @@ async def run_transcription(session, job):
     if not model.is_downloaded:
         raise ValueError(f"Model '{model.name}' is not downloaded. Please download it first.")
     
-    # Extract audio if needed
-    audio_path = await extract_audio_if_needed(job.original_path)
+    # Decode the source once into the shared 16 kHz float32 artifact
+    decoding = ProgressReporter(
+        job.id, "transcribing", start=5, span=5, message="Decoding audio: {percent}%",
+    )
+    audio_path = await prepare_audio(job.original_path, job.file_hash, decoding)
+    await decoding.flush()
     
-    # Progress callback
-    async def progress_cb(p):
-        await broadcast_progress(job.id, 10 + p * 0.5, "transcribing", f"Transcribing: {int(p)}%")
+    # Throttled progress: the decode thread reports per segment
+    reporter = ProgressReporter(
+        job.id, "transcribing", start=10, span=50, message="Transcribing: {percent}%",
+    )
     
     # Determine task: "translate" if translating to English, otherwise "transcribe"
     task = "translate" if job.translate_to == "en" else "transcribe"
@@ -166,8 +160,10 @@ async def run_transcription(session, job):
         compute_type=model.compute_type or settings.compute_type,
         device=model.device or settings.device,
         task=task,
-        progress_callback=lambda p: asyncio.create_task(progress_cb(p)),
+        progress_callback=reporter,
+        pin_model=bool(model.is_default),
     )
+    await reporter.flush()
     
     # Save transcript
     transcript = Transcript(
@@ -213,12 +209,9 @@ async def run_transcription(session, job):
 
 async def run_diarization(session, job):
     """Run speaker diarization using pyannote or configured engine."""
-    from workers.diarization_worker import (
-        diarize_pyannote,
-        find_speaker_for_segment,
-        get_audio_path,
-    )
-    from models.database import Model, Transcript, TranscriptSegment
+    from workers.diarization_worker import apply_diarization, diarize_pyannote
+    from services.audio import prepare_audio
+    from models.database import Model
     
     # Get diarization model
     model = None
@@ -247,16 +240,17 @@ async def run_diarization(session, job):
     
     await broadcast_progress(job.id, 62, "diarizing", "Running pyannote diarization...")
     
-    # Get audio path
-    audio_path = await get_audio_path(job.original_path)
+    # Reuses the artifact decoded for transcription
+    audio_path = await prepare_audio(job.original_path, job.file_hash)
     
     # Run diarization (pyannote is default)
     try:
-        diarization = await diarize_pyannote(
+        diarization, embeddings = await diarize_pyannote(
             audio_path=audio_path,
             model_id=model.model_id,
             device=model.device or settings.device,
             hf_token=settings.hf_token,
+            return_embeddings=True,
         )
     except Exception as e:
         await broadcast_progress(job.id, 75, "diarizing", f"Diarization failed: {str(e)[:50]}")
@@ -264,36 +258,9 @@ async def run_diarization(session, job):
     
     await broadcast_progress(job.id, 70, "diarizing", "Assigning speakers to segments...")
     
-    # Get transcript segments
-    result = await session.execute(
-        select(Transcript).where(Transcript.job_id == job.id)
-    )
-    transcript = result.scalar_one_or_none()
-    
-    if transcript:
-        result = await session.execute(
-            select(TranscriptSegment)
-            .where(TranscriptSegment.transcript_id == transcript.id)
-            .order_by(TranscriptSegment.segment_index)
-        )
-        segments = result.scalars().all()
-        
-        # Assign speakers to segments
-        speakers = set()
-        for segment in segments:
-            speaker = find_speaker_for_segment(
-                diarization,
-                segment.start_time,
-                segment.end_time,
-            )
-            segment.speaker = speaker
-            if speaker:
-                speakers.add(speaker)
-        
-        transcript.speaker_count = len(speakers)
-        await session.commit()
+    speakers = await apply_diarization(session, job.id, diarization, embeddings)
     
-    await broadcast_progress(job.id, 75, "diarizing", f"Identified {len(speakers)} speakers")
+    await broadcast_progress(job.id, 75, "diarizing", f"Identified {speakers} speakers")
 
 
 async def run_tts(session, job):
@@ -401,13 +368,32 @@ async def run_tts(session, job):
     await broadcast_progress(job.id, 95, "generating_tts", "TTS complete")
 
 
+async def process_next_job_async():
+    """Claim the highest-priority queued job and process it."""
+    from services.scheduler import claim_next_job
+    
+    async with async_session_maker() as session:
+        job = await claim_next_job(session)
+    
+    if not job:
+        return {"status": "idle"}
+    
+    return await process_job_async(job.id)
+
+
 def start_job_background(job_id: str):
-    """Start job processing in a background thread."""
+    """
+    Start job processing in a background thread.
+    
+    Each submission is a slot in the thread pool; when the slot frees up it
+    runs whichever queued job is first in priority order, not necessarily
+    job_id.
+    """
     def run():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            loop.run_until_complete(process_job_async(job_id))
+            loop.run_until_complete(process_next_job_async())
         finally:
             loop.close()
     
@@ -0,0 +1,165 @@
+"""
+Split/merge planning for chunk-parallel transcription.
+
+Long recordings are cut into overlapping chunks that STT workers transcribe
+independently. Cut points are moved to the quietest spot near each nominal
+boundary so words are rarely split, and every chunk owns the span between
+its two cut points. When merging, a word (or segment, for engines without
+word timestamps) is kept only by the chunk that owns its midpoint, which
+de-duplicates the overlap.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config import settings
+from services.audio import SAMPLE_RATE
+
+# Frame size used to find quiet cut points (30 ms)
+FRAME_SECONDS = 0.03
+
+
+@dataclass
+class AudioChunk:
+    """A slice of the decoded audio transcribed by one subtask."""
+
+    index: int
+    start: float       # Audio sent to the engine, including overlap
+    end: float
+    keep_start: float  # Span this chunk owns in the merged transcript
+    keep_end: float
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def should_chunk(duration: float) -> bool:
+    """Whether a recording is long enough to split across workers."""
+    return (
+        settings.stt_chunk_threshold > 0
+        and duration >= settings.stt_chunk_threshold
+        and duration > settings.stt_chunk_length * 1.5
+    )
+
+
+def find_quiet_point(audio: np.ndarray, target: float, search: float) -> float:
+    """Time of the lowest-energy frame within search seconds of target."""
+    lo = max(int((target - search) * SAMPLE_RATE), 0)
+    hi = min(int((target + search) * SAMPLE_RATE), len(audio))
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    n_frames = (hi - lo) // frame
+    if n_frames < 2:
+        return target
+
+    window = np.asarray(audio[lo:lo + n_frames * frame], dtype=np.float32)
+    energy = np.square(window).reshape(n_frames, frame).mean(axis=1)
+    return (lo + int(np.argmin(energy)) * frame + frame // 2) / SAMPLE_RATE
+
+
+def plan_chunks(
+    audio: np.ndarray,
+    chunk_length: Optional[float] = None,
+    overlap: Optional[float] = None,
+) -> List[AudioChunk]:
+    """
+    Plan overlapping chunks over a decoded recording.
+
+    Only the samples around each nominal boundary are read, so planning a
+    memory-mapped multi-hour recording stays cheap.
+    """
+    chunk_length = chunk_length or settings.stt_chunk_length
+    overlap = settings.stt_chunk_overlap if overlap is None else overlap
+    duration = len(audio) / SAMPLE_RATE
+
+    cuts = [0.0]
+    search = min(chunk_length / 10, 15.0)
+    while duration - cuts[-1] > chunk_length * 1.5:
+        cuts.append(find_quiet_point(audio, cuts[-1] + chunk_length, search))
+    cuts.append(duration)
+
+    return [
+        AudioChunk(
+            index=i,
+            start=max(keep_start - overlap, 0.0),
+            end=min(keep_end + overlap, duration),
+            keep_start=keep_start,
+            keep_end=keep_end,
+        )
+        for i, (keep_start, keep_end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+
+
+def _owns(chunk: AudioChunk, start: float, end: float) -> bool:
+    midpoint = (start + end) / 2
+    return chunk.keep_start <= midpoint < chunk.keep_end
+
+
+def _shift_segment(seg: Dict, offset: float) -> Dict:
+    shifted = dict(seg)
+    shifted["start"] = seg["start"] + offset
+    shifted["end"] = seg["end"] + offset
+    shifted["words"] = [
+        {**w, "start": w["start"] + offset, "end": w["end"] + offset}
+        if w.get("start") is not None and w.get("end") is not None else w
+        for w in (seg.get("words") or [])
+    ]
+    return shifted
+
+
+def join_words(words: List[Dict]) -> str:
+    """
+    Text of a run of word dicts.
+
+    faster-whisper words carry their own leading spaces and are joined as
+    they are; engines whose words have no spacing (WhisperX alignment) are
+    joined with single spaces.
+    """
+    tokens = [w["word"] for w in words]
+    if any(t[:1].isspace() for t in tokens):
+        return "".join(tokens).strip()
+    return " ".join(t.strip() for t in tokens if t.strip())
+
+
+def _trim_segment(chunk: AudioChunk, seg: Dict) -> Optional[Dict]:
+    """Restrict an absolute-time segment to the span its chunk owns."""
+    words = seg.get("words") or []
+    timed = [w for w in words if w.get("start") is not None and w.get("end") is not None]
+
+    # Without usable word timings, the whole segment goes to one chunk
+    if not timed or len(timed) != len(words):
+        return seg if _owns(chunk, seg["start"], seg["end"]) else None
+
+    kept = [w for w in timed if _owns(chunk, w["start"], w["end"])]
+    if not kept:
+        return None
+    if len(kept) == len(timed):
+        return seg
+
+    # Rebuild the segment from the words this chunk owns
+    trimmed = dict(seg)
+    trimmed["words"] = kept
+    trimmed["start"] = kept[0]["start"]
+    trimmed["end"] = kept[-1]["end"]
+    trimmed["text"] = join_words(kept)
+    return trimmed
+
+
+def merge_chunk_segments(chunk_results: Iterable[Dict]) -> List[Dict]:
+    """
+    Stitch per-chunk transcription results into one segment list.
+
+    Each result holds the chunk (as a dict) and segments with times
+    relative to the chunk start.
+    """
+    merged = []
+    for result in sorted(chunk_results, key=lambda r: r["chunk"]["index"]):
+        chunk = AudioChunk(**result["chunk"])
+        for seg in result["segments"]:
+            seg = _trim_segment(chunk, _shift_segment(seg, chunk.start))
+            if seg and seg["text"]:
+                merged.append(seg)
+
+    merged.sort(key=lambda s: s["start"])
+    return merged
@@ -1,6 +1,7 @@
 """Database connection and session management."""
 
 from typing import AsyncGenerator
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from config import settings
@@ -24,10 +25,40 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def add_missing_columns(connection):
+    """
+    Add model columns that existing tables lack.
+
+    create_all only creates missing tables, so a nullable column added to a
+    model later (e.g. jobs.file_hash) is added here, with its indexes.
+    Idempotent; changes beyond that need a real migration.
+    """
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+            ))
+            for index in table.indexes:
+                if column in index.columns:
+                    index.create(connection)
+
+
 async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
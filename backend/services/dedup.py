@@ -0,0 +1,135 @@
+"""
+Content-addressed upload deduplication.
+
+Jobs store the hash of their uploaded media. When the same media is
+submitted again with the same transcription options, the transcript of the
+earlier job is cloned instead of running the STT engine again.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.database import Job, Transcript, TranscriptSegment
+from schemas.job import JobStatus
+
+
+async def find_reusable_job(session: AsyncSession, job: Job) -> Optional[Job]:
+    """
+    Find a completed job with identical media and transcription options.
+
+    TTS jobs are never short-circuited since their audio outputs are not
+    part of the cloned transcript.
+    """
+    if not job.file_hash or job.enable_tts:
+        return None
+
+    result = await session.execute(
+        select(Job)
+        .join(Transcript, Transcript.job_id == Job.id)
+        .where(
+            Job.file_hash == job.file_hash,
+            Job.id != job.id,
+            Job.status == JobStatus.COMPLETED,
+            Job.model_id.is_not_distinct_from(job.model_id),
+            Job.language == job.language,
+            Job.translate_to.is_not_distinct_from(job.translate_to),
+            Job.enable_diarization == job.enable_diarization,
+            Job.diarization_model_id.is_not_distinct_from(job.diarization_model_id),
+        )
+        .order_by(Job.completed_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def clone_transcript(session: AsyncSession, source: Job, target: Job) -> Transcript:
+    """Copy the transcript and segments of source onto target and complete it."""
+    from workers.stt_worker import generate_output_files
+
+    result = await session.execute(
+        select(Transcript).where(Transcript.job_id == source.id)
+    )
+    source_transcript = result.scalar_one()
+
+    result = await session.execute(
+        select(TranscriptSegment)
+        .where(TranscriptSegment.transcript_id == source_transcript.id)
+        .order_by(TranscriptSegment.segment_index)
+    )
+    source_segments = result.scalars().all()
+
+    transcript = Transcript(
+        job_id=target.id,
+        language=source_transcript.language,
+        duration=source_transcript.duration,
+        word_count=source_transcript.word_count,
+        speaker_count=source_transcript.speaker_count,
+        full_text=source_transcript.full_text,
+    )
+    session.add(transcript)
+    await session.flush()
+
+    # Bulk insert the copied segments in one statement
+    if source_segments:
+        await session.execute(
+            insert(TranscriptSegment),
+            [
+                {
+                    "transcript_id": transcript.id,
+                    "segment_index": seg.segment_index,
+                    "start_time": seg.start_time,
+                    "end_time": seg.end_time,
+                    "text": seg.text,
+                    "speaker": seg.speaker,
+                    "speaker_confidence": seg.speaker_confidence,
+                    "words": seg.words,
+                    "confidence": seg.confidence,
+                }
+                for seg in source_segments
+            ],
+        )
+
+    # Regenerate output files in the formats this job asked for
+    output_dir = settings.output_dir / target.id
+    output_dir.mkdir(parents=True, exist_ok=True)
+    await generate_output_files(
+        [
+            {
+                "start": seg.start_time,
+                "end": seg.end_time,
+                "text": seg.text,
+                "confidence": seg.confidence,
+                "words": seg.words,
+            }
+            for seg in source_segments
+        ],
+        output_dir,
+        target.output_formats,
+    )
+
+    now = datetime.utcnow()
+    target.detected_language = source.detected_language
+    target.duration = source.duration
+    target.transcript_path = str(output_dir / "transcript.json")
+    target.status = JobStatus.COMPLETED
+    target.current_stage = f"reused transcript from job {source.id}"
+    target.progress = 100.0
+    target.started_at = now
+    target.completed_at = now
+
+    await session.commit()
+    return transcript
+
+
+async def try_reuse_transcript(session: AsyncSession, job: Job) -> bool:
+    """Complete job from an identical earlier job if one exists."""
+    source = await find_reusable_job(session, job)
+    if not source:
+        return False
+
+    await clone_transcript(session, source, job)
+    return True
@@ -0,0 +1,34 @@
+"""
+Job dispatch.
+
+Single entry point for handing queued jobs to the processing backend:
+Celery when the workers package is importable, otherwise the in-process
+background runner used in development.
+"""
+
+from typing import Iterable
+
+# Celery import is optional - jobs can be created without workers
+try:
+    from workers.tasks import process_job
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+    process_job = None
+
+
+def dispatch_job(job_id: str):
+    """Queue a single job for processing."""
+    if CELERY_AVAILABLE and process_job:
+        # Production: Use Celery
+        process_job.delay(job_id)
+    else:
+        # Development: Use simple background tasks
+        from services.background_tasks import start_job_background
+        start_job_background(job_id)
+
+
+def dispatch_jobs(job_ids: Iterable[str]):
+    """Queue several jobs for processing."""
+    for job_id in job_ids:
+        dispatch_job(job_id)
@@ -0,0 +1,130 @@
+"""
+Cross-process job event bus.
+
+Workers run in separate processes (Celery) from the API that holds the
+WebSocket connections, so events are published to Redis pub/sub and the API
+process relays them to its clients:
+
+- ``stt:events:job:{job_id}`` carries events about a single job
+- ``stt:events:queue`` carries queue-wide events (reorders, etc.)
+
+The API subscribes once to ``stt:events:*`` (run_event_relay) and hands each
+event to the queue ConnectionManager, which filters it per client. When
+Redis is unreachable, events are broadcast to this process's clients
+directly, which covers single-process development setups.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from typing import Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "stt:events"
+QUEUE_CHANNEL = f"{CHANNEL_PREFIX}:queue"
+
+# Seconds between reconnect attempts of the API-side relay
+RELAY_RETRY_DELAY = 5
+
+# Redis clients are bound to the loop they were created on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def job_channel(job_id: str) -> str:
+    """Pub/sub channel for events about one job."""
+    return f"{CHANNEL_PREFIX}:job:{job_id}"
+
+
+def event_job_id(event: dict) -> Optional[str]:
+    """Job an event refers to, if any."""
+    if event.get("job_id"):
+        return event["job_id"]
+    for key in ("job", "data"):
+        value = event.get(key)
+        if isinstance(value, dict):
+            job_id = value.get("id") or value.get("jobId")
+            if job_id:
+                return job_id
+    return None
+
+
+def _get_client():
+    import redis.asyncio as redis
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = redis.from_url(settings.redis_url)
+        _clients[loop] = client
+    return client
+
+
+async def publish_event(event: dict):
+    """Publish an event to every API process's WebSocket clients."""
+    job_id = event_job_id(event)
+    channel = job_channel(job_id) if job_id else QUEUE_CHANNEL
+    payload = json.dumps(event, default=str)
+
+    try:
+        await _get_client().publish(channel, payload)
+        return
+    except Exception as e:
+        logger.debug(f"Event bus unavailable, broadcasting locally: {e}")
+
+    try:
+        from api.queue import manager
+        await manager.broadcast(event)
+    except Exception:
+        pass  # WebSocket notification is optional
+
+
+async def publish_job_progress(job_id: str, progress: float, stage: str, message: str = ""):
+    """Publish a progress update in the format the frontend consumes."""
+    await publish_event({
+        "type": "job_progress",
+        "data": {
+            "jobId": job_id,
+            "stage": stage,
+            "progress": progress,
+            "message": message,
+        },
+    })
+
+
+async def run_event_relay():
+    """
+    Relay bus events to this process's WebSocket clients.
+
+    Runs for the lifetime of the API process, reconnecting when Redis goes
+    away.
+    """
+    import redis.asyncio as redis
+
+    from api.queue import manager
+
+    while True:
+        client = redis.from_url(settings.redis_url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.psubscribe(f"{CHANNEL_PREFIX}:*")
+            logger.info("Event relay subscribed to job events")
+            async for message in pubsub.listen():
+                try:
+                    event = json.loads(message["data"])
+                except (TypeError, ValueError):
+                    continue
+                await manager.broadcast(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Event relay disconnected: {e}; retrying in {RELAY_RETRY_DELAY}s")
+            await asyncio.sleep(RELAY_RETRY_DELAY)
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
@@ -338,6 +338,27 @@ def calculate_batch_size(vram_gb: float) -> int:
         return 1
 
 
+_stt_batch_sizes: dict = {}
+
+
+def recommended_stt_batch_size(device: str) -> int:
+    """
+    Batch size for batched Whisper inference on the given device.
+    
+    Derived from the largest GPU's VRAM via calculate_batch_size; CPU
+    inference stays unbatched.
+    """
+    if device not in ("cuda", "auto"):
+        return 1
+    
+    if device not in _stt_batch_sizes:
+        gpus = detect_cuda_gpus()
+        _stt_batch_sizes[device] = (
+            calculate_batch_size(max(gpu.memory_gb for gpu in gpus)) if gpus else 1
+        )
+    return _stt_batch_sizes[device]
+
+
 def get_torch_device(preferred: str = "auto") -> str:
     """
     Get the appropriate torch device string.
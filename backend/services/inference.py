@@ -0,0 +1,154 @@
+"""
+Inference executors.
+
+Engine adapters are async, but the work they wrap (CTranslate2, torch,
+NeMo) is blocking. They dispatch it here so the event loop keeps serving
+DB heartbeats, progress updates and WebSocket traffic meanwhile:
+
+- run_inference: thread pool, for libraries that release the GIL while
+  computing (CTranslate2, torch kernels)
+- run_in_process: process pool, for work that holds the GIL in pure
+  Python; the function and its arguments must be picklable
+- iterate_inference: drives a blocking iterator (e.g. faster-whisper's
+  lazy segment generator) in the thread pool and streams its items back
+
+Thread-pool calls run in a copy of the caller's context, so a
+model_lease() block around them covers the models they fetch.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Marks the end of a streamed iterator
+_DONE = object()
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Shared thread pool for GIL-releasing inference."""
+    global _thread_pool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=max(1, settings.inference_threads),
+                thread_name_prefix="inference",
+            )
+        return _thread_pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for pure-Python inference paths."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            # spawn, not fork: CUDA and torch state must not be inherited
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.inference_processes),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+async def run_inference(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call in the inference thread pool."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_thread_pool(), functools.partial(context.run, fn, *args, **kwargs)
+    )
+
+
+async def run_in_process(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a picklable blocking call in the inference process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), functools.partial(fn, *args, **kwargs))
+
+
+async def iterate_inference(iterable: Iterable[T]) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterable in the thread pool, yielding items as they
+    are produced.
+
+    If the consumer stops early (or is cancelled), the producer stops
+    after its current item and closes the source iterator, which lets
+    generators release what they hold (e.g. model leases).
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    iterator = iter(iterable)
+
+    def post(item) -> bool:
+        # A consumer that stopped early may have had its loop closed since
+        # (background runner threads close theirs when the job ends)
+        if loop.is_closed():
+            return False
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            return False
+        return True
+
+    def produce():
+        try:
+            for item in iterator:
+                if stop.is_set() or not post(item):
+                    break
+        except BaseException as e:
+            post(e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    logger.exception("Closing an inference iterator failed")
+            post(_DONE)
+
+    producer = loop.run_in_executor(get_thread_pool(), contextvars.copy_context().run, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+        await producer
+    finally:
+        stop.set()
+        if not producer.done():
+            # Don't wait for the producer: it may be mid-item for a while
+            producer.add_done_callback(_log_producer_failure)
+
+
+def _log_producer_failure(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Inference producer failed", exc_info=future.exception())
+
+
+def shutdown_inference_executors():
+    """Stop the executors (process shutdown)."""
+    global _thread_pool, _process_pool
+    with _pool_lock:
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=False, cancel_futures=True)
+            _thread_pool = None
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
@@ -0,0 +1,200 @@
+"""
+Async media toolkit.
+
+Non-blocking wrappers around ffmpeg, ffprobe and other media CLIs built on
+asyncio.create_subprocess_exec, with:
+
+- a per-event-loop concurrency limit (max_concurrent_media_processes)
+- timeouts (media_command_timeout)
+- progress parsing from ffmpeg's ``-progress`` output
+- cancellation: the child process is killed when the awaiting task is
+  cancelled or times out
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# One semaphore per event loop (workers may run several loops over their life)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class MediaCommandError(RuntimeError):
+    """A media command exited with a non-zero status or timed out."""
+
+    def __init__(self, cmd: Sequence[str], returncode: Optional[int], stderr: str):
+        self.cmd = list(cmd)
+        self.returncode = returncode
+        self.stderr = stderr
+        tail = stderr.strip().splitlines()[-1:] if stderr else []
+        detail = tail[0] if tail else "no output"
+        status = "timed out" if returncode is None else f"exited with {returncode}"
+        super().__init__(f"{cmd[0]} {status}: {detail}")
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, settings.max_concurrent_media_processes))
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def _kill(process: asyncio.subprocess.Process):
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+async def run_command(
+    cmd: Sequence[str],
+    *,
+    input_data: Optional[bytes] = None,
+    timeout: Optional[float] = None,
+    stdout_line_callback: Optional[Callable[[str], None]] = None,
+    check: bool = True,
+) -> Tuple[int, bytes, bytes]:
+    """
+    Run an external command without blocking the event loop.
+
+    Returns (returncode, stdout, stderr). With stdout_line_callback, stdout
+    is consumed line by line and not returned.
+    """
+    if timeout is None:
+        timeout = settings.media_command_timeout
+
+    async with _get_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE if input_data is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+        async def read_stdout() -> bytes:
+            if stdout_line_callback is None:
+                return await process.stdout.read()
+            async for raw_line in process.stdout:
+                stdout_line_callback(raw_line.decode(errors="replace").strip())
+            return b""
+
+        async def communicate() -> Tuple[bytes, bytes]:
+            if input_data is not None:
+                process.stdin.write(input_data)
+                await process.stdin.drain()
+                process.stdin.close()
+            # Drain both pipes concurrently so neither can fill up and stall
+            stdout, stderr = await asyncio.gather(read_stdout(), process.stderr.read())
+            await process.wait()
+            return stdout, stderr
+
+        try:
+            stdout, stderr = await asyncio.wait_for(communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await _kill(process)
+            raise MediaCommandError(cmd, None, f"timed out after {timeout}s")
+        except BaseException:
+            # Cancelled (or failed) while running: don't leave the child behind
+            await _kill(process)
+            raise
+
+    if check and process.returncode != 0:
+        raise MediaCommandError(cmd, process.returncode, stderr.decode(errors="replace"))
+
+    return process.returncode, stdout, stderr
+
+
+def _progress_parser(duration: float, progress_callback: Callable[[float], None]) -> Callable[[str], None]:
+    """Line callback turning ffmpeg ``-progress`` output into percentages."""
+    def parse(line: str):
+        key, _, value = line.partition("=")
+        if key in ("out_time_us", "out_time_ms") and value.isdigit():
+            # Both keys are reported in microseconds by ffmpeg
+            progress_callback(min(int(value) / 1_000_000 / duration * 100, 100.0))
+        elif key == "progress" and value == "end":
+            progress_callback(100.0)
+
+    return parse
+
+
+async def run_ffmpeg(
+    args: List[str],
+    *,
+    duration: Optional[float] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    timeout: Optional[float] = None,
+) -> None:
+    """
+    Run ffmpeg with the given arguments (without the leading "ffmpeg").
+
+    When progress_callback and the input duration are given, ffmpeg's
+    ``-progress`` output is parsed and reported as a 0-100 percentage.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin"]
+    report = bool(progress_callback and duration)
+    if report:
+        cmd += ["-progress", "pipe:1", "-nostats"]
+
+    await run_command(
+        cmd + list(args),
+        timeout=timeout,
+        stdout_line_callback=_progress_parser(duration, progress_callback) if report else None,
+    )
+
+
+async def probe(path: Path) -> dict:
+    """Return ffprobe's JSON format/stream description of a media file."""
+    _, stdout, _ = await run_command([
+        "ffprobe",
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        str(path),
+    ], timeout=60)
+    return json.loads(stdout or b"{}")
+
+
+async def probe_duration(path: Path) -> float:
+    """Duration of a media file in seconds (0 if it can't be determined)."""
+    try:
+        data = await probe(path)
+    except MediaCommandError:
+        return 0
+    return float(data.get("format", {}).get("duration", 0) or 0)
+
+
+async def extract_audio(
+    source: Path,
+    output_path: Path,
+    *,
+    sample_rate: int = 16000,
+    raw_float: bool = False,
+    duration: Optional[float] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+) -> None:
+    """Decode a media file to mono PCM (16-bit WAV, or raw float32 with raw_float)."""
+    codec_args = ["-f", "f32le", "-acodec", "pcm_f32le"] if raw_float else ["-acodec", "pcm_s16le"]
+    await run_ffmpeg(
+        [
+            "-i", str(source),
+            "-vn", *codec_args,
+            "-ar", str(sample_rate), "-ac", "1",
+            str(output_path), "-y",
+        ],
+        duration=duration,
+        progress_callback=progress_callback,
+    )
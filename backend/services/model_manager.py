@@ -1,7 +1,14 @@
 """
 Model Manager with Idle Timeout Unloading for Transcribe
 
-Manages Whisper and other models with automatic unloading after idle period.
+Manages Whisper and other models with automatic unloading after idle period
+and LRU eviction within a RAM/VRAM budget.
+
+Code that runs inference wraps it in ``with model_lease():``. Every model
+fetched inside the block (in this thread, or in executor threads started
+through services.inference) is leased until the block exits, and leased
+models are neither evicted nor unloaded as idle, so a load for one job
+can't free the weights another thread is decoding with.
 """
 
 import os
@@ -9,26 +16,116 @@ import time
 import threading
 import logging
 import gc
-from typing import Optional, Any, Dict
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Any, Dict, List
+
+from config import settings
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_IDLE_TIMEOUT = int(os.getenv("MODEL_IDLE_TIMEOUT", "600"))
 
+# (manager, key) pairs leased by the enclosing model_lease() block, if any
+_active_lease: ContextVar[Optional[List[tuple]]] = ContextVar("model_lease", default=None)
+
+
+def estimate_model_size(kind: str, model_id: str) -> float:
+    """
+    Estimated memory footprint in GB of a model, from the evaluation tables.
+    
+    kind is "whisper", "diarization" or "tts"; model_id may be a full repo
+    name such as "Systran/faster-whisper-large-v3".
+    """
+    from services.evaluation import DIARIZATION_VRAM, MODEL_VRAM_REQUIREMENTS, TTS_VRAM
+    
+    table = {
+        "whisper": MODEL_VRAM_REQUIREMENTS,
+        "diarization": DIARIZATION_VRAM,
+        "tts": TTS_VRAM,
+    }.get(kind, {})
+    
+    if model_id in table:
+        return table[model_id]
+    
+    # Match the longest table name contained in the ID ("large-v3-turbo" before "large-v3")
+    name = model_id.lower()
+    for candidate in sorted(table, key=len, reverse=True):
+        if candidate in name:
+            return table[candidate]
+    
+    return settings.model_default_size_gb
+
+
+def memory_pool(device: str) -> str:
+    """Budget a model counts against: "vram" for GPU devices, else "ram"."""
+    return "vram" if device in ("cuda", "auto") or device.startswith("cuda:") else "ram"
+
+
+def _detect_budgets() -> Dict[str, float]:
+    """Memory budgets in GB per pool (0 = unlimited)."""
+    vram = settings.model_vram_budget_gb
+    if vram <= 0:
+        from services.hardware import detect_cuda_gpus
+        gpus = detect_cuda_gpus()
+        vram = max(g.memory_gb for g in gpus) * 0.9 if gpus else 0
+    
+    ram = settings.model_ram_budget_gb
+    if ram <= 0:
+        try:
+            import psutil
+            ram = psutil.virtual_memory().total / (1024 ** 3) * 0.6
+        except ImportError:
+            ram = 0
+    
+    return {"vram": vram, "ram": ram}
+
+
+def _allocated_vram_gb() -> Optional[float]:
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return torch.cuda.memory_allocated() / (1024 ** 3)
+    except ImportError:
+        pass
+    return None
+
 
 class ModelManager:
-    """Thread-safe model manager with idle timeout unloading."""
+    """
+    Thread-safe model cache with a memory budget.
+    
+    Models are kept in least-recently-used order. Each one is charged its
+    measured size (GPU allocation growth during load) or, when that can't
+    be measured, an estimate, against the VRAM or RAM budget of its device.
+    Loading a model that would exceed the budget first evicts the least
+    recently used unpinned models of that pool. Models also unload after
+    the idle timeout unless pinned. Leased models (see model_lease) are
+    exempt from both while the lease is held.
+    """
     
-    def __init__(self, idle_timeout: int = DEFAULT_IDLE_TIMEOUT):
-        self._models: Dict[str, Any] = {}
+    def __init__(self, idle_timeout: int = DEFAULT_IDLE_TIMEOUT, budgets: Optional[Dict[str, float]] = None):
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
         self._last_used: Dict[str, float] = {}
+        self._sizes: Dict[str, float] = {}
+        self._pools: Dict[str, str] = {}
+        self._pinned = set()
+        # Entries that wrap another entry's weights (e.g. batched pipelines)
+        self._parents: Dict[str, str] = {}
+        # Lease count per key
+        self._leases: Dict[str, int] = {}
+        self._budgets = budgets if budgets is not None else _detect_budgets()
         self._timeout = idle_timeout
         self._lock = threading.RLock()
         self._running = True
         
         # Start background cleanup thread
         self._start_cleanup_thread()
-        logger.info(f"ModelManager initialized with {idle_timeout}s idle timeout")
+        logger.info(
+            f"ModelManager initialized with {idle_timeout}s idle timeout, "
+            f"budgets: {', '.join(f'{k}={v:.1f}GB' if v else f'{k}=unlimited' for k, v in self._budgets.items())}"
+        )
     
     def _start_cleanup_thread(self):
         def cleanup_loop():
@@ -45,6 +142,8 @@ class ModelManager:
             keys_to_remove = []
             
             for key, last_used in self._last_used.items():
+                if key in self._pinned or self._in_use(key):
+                    continue
                 if now - last_used > self._timeout:
                     keys_to_remove.append(key)
             
@@ -56,6 +155,14 @@ class ModelManager:
         if key in self._models:
             del self._models[key]
             del self._last_used[key]
+            self._sizes.pop(key, None)
+            self._pools.pop(key, None)
+            self._parents.pop(key, None)
+            
+            # Wrappers would otherwise keep the weights alive
+            for child in [k for k, parent in self._parents.items() if parent == key]:
+                self._unload_model(child)
+            
             gc.collect()
             
             try:
@@ -65,22 +172,133 @@ class ModelManager:
             except ImportError:
                 pass
     
-    def get_model(self, key: str, loader_fn):
-        """Get model by key, loading with loader_fn if not cached."""
+    def _in_use(self, key: str) -> bool:
+        """Whether key, or an entry wrapping its weights, is leased."""
+        if self._leases.get(key):
+            return True
+        return any(self._leases.get(child) for child, parent in self._parents.items() if parent == key)
+    
+    def release(self, key: str):
+        """Drop one lease on key (see model_lease)."""
+        with self._lock:
+            count = self._leases.get(key, 0) - 1
+            if count > 0:
+                self._leases[key] = count
+            else:
+                self._leases.pop(key, None)
+            # The idle timeout counts from the end of use
+            if key in self._last_used:
+                self._last_used[key] = time.time()
+    
+    def used(self, pool: str) -> float:
+        """GB currently charged against a pool."""
+        return sum(size for key, size in self._sizes.items() if self._pools.get(key) == pool)
+    
+    def _make_room(self, pool: str, needed: float):
+        """Evict least recently used unpinned, unleased models until needed GB fits."""
+        budget = self._budgets.get(pool) or 0
+        if budget <= 0:
+            return
+        
+        for key in list(self._models):
+            if self.used(pool) + needed <= budget:
+                return
+            if key in self._pinned or self._pools.get(key) != pool or self._in_use(key):
+                continue
+            logger.info(
+                f"Evicting model {key} ({self._sizes.get(key, 0):.1f}GB) "
+                f"to fit {needed:.1f}GB in {pool} budget of {budget:.1f}GB"
+            )
+            self._unload_model(key)
+        
+        if self.used(pool) + needed > budget:
+            logger.warning(
+                f"Loading {needed:.1f}GB exceeds the {pool} budget of {budget:.1f}GB "
+                f"even after eviction (pinned or in use: {self.used(pool):.1f}GB)"
+            )
+    
+    def get_model(
+        self,
+        key: str,
+        loader_fn,
+        *,
+        size_gb: Optional[float] = None,
+        device: str = "cpu",
+        pinned: bool = False,
+        parent: Optional[str] = None,
+    ):
+        """
+        Get model by key, loading with loader_fn if not cached.
+        
+        size_gb is the expected footprint (used before loading to make room);
+        device selects the budget it counts against. parent names an entry
+        whose weights this one wraps; it is unloaded along with it.
+        Inside a model_lease() block the entry is leased before it is
+        looked up, so making room for it can't evict it.
+        """
         with self._lock:
             self._last_used[key] = time.time()
+            if pinned:
+                self._pinned.add(key)
+            
+            lease = _active_lease.get()
+            if lease is not None:
+                self._leases[key] = self._leases.get(key, 0) + 1
+                lease.append((self, key))
+            
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+            
+            pool = memory_pool(device)
+            estimate = settings.model_default_size_gb if size_gb is None else size_gb
+            self._make_room(pool, estimate)
+            
+            logger.info(f"Loading model: {key}")
+            start = time.time()
+            vram_before = _allocated_vram_gb() if pool == "vram" else None
+            self._models[key] = loader_fn()
             
-            if key not in self._models:
-                logger.info(f"Loading model: {key}")
-                start = time.time()
-                self._models[key] = loader_fn()
-                logger.info(f"Model {key} loaded in {time.time() - start:.1f}s")
+            # Prefer the measured GPU allocation growth over the estimate
+            size = estimate
+            if vram_before is not None:
+                measured = (_allocated_vram_gb() or 0) - vram_before
+                if measured > 0.05:
+                    size = measured
+            self._sizes[key] = size
+            self._pools[key] = pool
+            if parent:
+                self._parents[key] = parent
             
+            logger.info(f"Model {key} loaded in {time.time() - start:.1f}s ({size:.1f}GB {pool})")
             return self._models[key]
     
+    def pin(self, key: str):
+        """Exempt a model from eviction and idle unloading."""
+        with self._lock:
+            self._pinned.add(key)
+    
+    def unpin(self, key: str):
+        with self._lock:
+            self._pinned.discard(key)
+    
     def is_loaded(self, key: str) -> bool:
         return key in self._models
     
+    def loaded_models(self) -> List[Dict[str, Any]]:
+        """Loaded models, least recently used first."""
+        with self._lock:
+            return [
+                {
+                    "key": key,
+                    "size_gb": round(self._sizes.get(key, 0), 2),
+                    "pool": self._pools.get(key),
+                    "pinned": key in self._pinned,
+                    "last_used": self._last_used.get(key),
+                }
+                for key in self._models
+            ]
+    
     def unload_all(self):
         with self._lock:
             keys = list(self._models.keys())
@@ -103,11 +321,219 @@ def get_model_manager() -> ModelManager:
     return _manager
 
 
-def get_whisper_model(model_id: str, device: str, compute_type: str):
+@contextmanager
+def model_lease():
+    """
+    Lease every model fetched inside the block until it exits.
+    
+    Blocks nest; each releases only the models fetched directly in it.
+    """
+    leased: List[tuple] = []
+    token = _active_lease.set(leased)
+    try:
+        yield
+    finally:
+        for manager, key in leased:
+            manager.release(key)
+        _active_lease.reset(token)
+
+
+def is_pinned_model(model_id: str) -> bool:
+    """Whether a model ID is listed in PINNED_MODELS."""
+    return model_id in {m.strip() for m in settings.pinned_models.split(",") if m.strip()}
+
+
+def get_whisper_model(model_id: str, device: str, compute_type: str, pinned: bool = False):
     """Get cached Whisper model with idle timeout."""
     def loader():
         from faster_whisper import WhisperModel
         return WhisperModel(model_id, device=device, compute_type=compute_type, num_workers=4)
     
     key = f"whisper:{model_id}:{device}:{compute_type}"
-    return get_model_manager().get_model(key, loader)
+    return get_model_manager().get_model(
+        key,
+        loader,
+        size_gb=estimate_model_size("whisper", model_id),
+        device=device,
+        pinned=pinned or is_pinned_model(model_id),
+    )
+
+
+def get_batched_whisper_pipeline(model_id: str, device: str, compute_type: str, pinned: bool = False):
+    """
+    Get a cached faster-whisper BatchedInferencePipeline.
+    
+    Wraps the same cached WhisperModel, so batched and sequential
+    transcription share one copy of the weights.
+    """
+    # Touch the underlying model so it is loaded, charged and kept recent
+    model = get_whisper_model(model_id, device, compute_type, pinned=pinned)
+    
+    def loader():
+        from faster_whisper import BatchedInferencePipeline
+        return BatchedInferencePipeline(model=model)
+    
+    key = f"whisper_batched:{model_id}:{device}:{compute_type}"
+    # The weights are charged to the WhisperModel entry
+    return get_model_manager().get_model(
+        key,
+        loader,
+        size_gb=0,
+        device=device,
+        pinned=pinned,
+        parent=f"whisper:{model_id}:{device}:{compute_type}",
+    )
+
+
+def _on_gpu(device: str) -> bool:
+    """Whether models for device should be moved to CUDA."""
+    if device not in ("cuda", "auto"):
+        return False
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def get_whisperx_model(model_id: str, device: str):
+    """Get cached WhisperX model."""
+    def loader():
+        import whisperx
+        return whisperx.load_model(model_id, device=device)
+    
+    return get_model_manager().get_model(
+        f"whisperx:{model_id}:{device}",
+        loader,
+        size_gb=estimate_model_size("whisper", model_id),
+        device=device,
+        pinned=is_pinned_model(model_id),
+    )
+
+
+def get_whisperx_align_model(language_code: str, device: str):
+    """Get cached WhisperX alignment model and metadata for a language."""
+    def loader():
+        import whisperx
+        return whisperx.load_align_model(language_code=language_code, device=device)
+    
+    return get_model_manager().get_model(
+        f"whisperx_align:{language_code}:{device}",
+        loader,
+        size_gb=1.0,
+        device=device,
+    )
+
+
+def get_openai_whisper_model(model_id: str):
+    """Get cached OpenAI Whisper model (placed on CUDA when available)."""
+    device = "cuda" if _on_gpu("auto") else "cpu"
+    
+    def loader():
+        import whisper
+        return whisper.load_model(model_id, device=device)
+    
+    return get_model_manager().get_model(
+        f"openai_whisper:{model_id}:{device}",
+        loader,
+        size_gb=estimate_model_size("whisper", model_id),
+        device=device,
+        pinned=is_pinned_model(model_id),
+    )
+
+
+def get_hf_asr_pipeline(model_id: str):
+    """Get cached HuggingFace Transformers ASR pipeline."""
+    def loader():
+        from transformers import pipeline
+        return pipeline(
+            "automatic-speech-recognition",
+            model=model_id,
+            return_timestamps="word",
+        )
+    
+    return get_model_manager().get_model(
+        f"hf_whisper:{model_id}",
+        loader,
+        size_gb=estimate_model_size("whisper", model_id),
+        device="cpu",
+        pinned=is_pinned_model(model_id),
+    )
+
+
+def get_pyannote_pipeline(model_id: str, device: str, hf_token: Optional[str] = None):
+    """Get cached pyannote diarization pipeline."""
+    def loader():
+        from pyannote.audio import Pipeline
+        
+        pipeline = Pipeline.from_pretrained(model_id, use_auth_token=hf_token)
+        if _on_gpu(device):
+            import torch
+            pipeline = pipeline.to(torch.device("cuda"))
+        return pipeline
+    
+    return get_model_manager().get_model(
+        f"pyannote:{model_id}:{device}",
+        loader,
+        size_gb=estimate_model_size("diarization", model_id),
+        device=device,
+        pinned=is_pinned_model(model_id),
+    )
+
+
+def get_speechbrain_encoder(source: str = "speechbrain/spkrec-ecapa-voxceleb", device: str = "cpu"):
+    """Get cached SpeechBrain speaker embedding model (ECAPA-TDNN)."""
+    def loader():
+        try:
+            from speechbrain.inference.speaker import EncoderClassifier
+        except ImportError:
+            # speechbrain < 1.0
+            from speechbrain.pretrained import EncoderClassifier
+        encoder = EncoderClassifier.from_hparams(
+            source=source,
+            run_opts={"device": "cuda" if _on_gpu(device) else "cpu"},
+        )
+        encoder.eval()
+        return encoder
+    
+    return get_model_manager().get_model(
+        f"speechbrain_encoder:{source}:{device}",
+        loader,
+        size_gb=0.1,
+        device=device if _on_gpu(device) else "cpu",
+        pinned=is_pinned_model(source),
+    )
+
+
+def get_coqui_tts(model_id: str, device: str, engine: str = "coqui-xtts"):
+    """Get cached Coqui TTS model (XTTS or VITS; engine picks the size estimate)."""
+    def loader():
+        from TTS.api import TTS
+        
+        tts = TTS(model_id)
+        if _on_gpu(device):
+            tts = tts.to("cuda")
+        return tts
+    
+    return get_model_manager().get_model(
+        f"coqui:{model_id}:{device}",
+        loader,
+        size_gb=estimate_model_size("tts", engine),
+        device=device,
+        pinned=is_pinned_model(model_id),
+    )
+
+
+def get_tortoise_tts():
+    """Get cached Tortoise TTS model."""
+    def loader():
+        from tortoise.api import TextToSpeech
+        return TextToSpeech()
+    
+    device = "cuda" if _on_gpu("auto") else "cpu"
+    return get_model_manager().get_model(
+        "tortoise",
+        loader,
+        size_gb=estimate_model_size("tts", "tortoise"),
+        device=device,
+    )
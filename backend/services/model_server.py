@@ -0,0 +1,189 @@
+"""
+Per-host model server.
+
+With MODEL_SERVER_SOCKET set, the main Celery worker process starts one
+model server process, which holds the models (through its own
+ModelManager), and the prefork children send their inference to it over a
+Unix socket instead of each loading a copy. Audio is not sent over the
+socket: requests carry the path of the decoded artifact, which the server
+memory-maps itself.
+
+Each connection is served by its own thread, so N children decode
+concurrently on one copy of the weights (faster-whisper's num_workers
+bounds how many run at once).
+
+Only the operations in OPERATIONS can be called. They are generator
+functions whose items are streamed back as they are produced, which keeps
+progress reporting working for remote inference. Besides inference, the
+server warms models on request and reports the models it holds, so the
+workers that use it can advertise them in the worker registry.
+
+The socket is created owner-only, and both ends authenticate with
+MODEL_SERVER_AUTHKEY (by default a key derived from DATABASE_URL, which
+every worker of a deployment shares).
+
+Run standalone with ``python -m services.model_server``.
+"""
+
+import hashlib
+import importlib
+import logging
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Name -> "module:function" of a blocking generator function
+OPERATIONS: Dict[str, str] = {
+    "faster_whisper": "workers.stt_worker:stream_faster_whisper",
+    "warm_faster_whisper": "workers.warmup:stream_warm_faster_whisper",
+    "loaded_models": "services.model_server:stream_loaded_models",
+}
+
+_resolved: Dict[str, Callable[..., Iterator[Any]]] = {}
+
+
+def _authkey() -> bytes:
+    secret = settings.model_server_authkey or settings.database_url
+    return hashlib.sha256(f"model-server:{secret}".encode()).digest()
+
+
+def _resolve(name: str) -> Callable[..., Iterator[Any]]:
+    if name not in _resolved:
+        module, attr = OPERATIONS[name].split(":")
+        _resolved[name] = getattr(importlib.import_module(module), attr)
+    return _resolved[name]
+
+
+def _serve_connection(conn: Connection):
+    """Handle requests on one client connection until it closes."""
+    from services.model_manager import model_lease
+
+    try:
+        while True:
+            try:
+                name, args, kwargs = conn.recv()
+            except EOFError:
+                return
+
+            try:
+                if name not in OPERATIONS:
+                    raise ValueError(f"Unknown model server operation: {name}")
+                # Keep the operation's models loaded until it has finished
+                with model_lease():
+                    for item in _resolve(name)(*args, **kwargs):
+                        conn.send(("item", item))
+                conn.send(("end", None))
+            except (BrokenPipeError, ConnectionResetError):
+                # Client went away mid-stream
+                return
+            except Exception as e:
+                logger.exception(f"Model server operation {name} failed")
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def serve(address: Optional[str] = None):
+    """Accept connections on the Unix socket forever."""
+    address = address or settings.model_server_socket
+    if os.path.exists(address):
+        os.unlink(address)
+
+    # Owner-only from the moment it is bound
+    umask = os.umask(0o177)
+    try:
+        listener = Listener(address, family="AF_UNIX", authkey=_authkey())
+    finally:
+        os.umask(umask)
+
+    with listener:
+        logger.info(f"Model server listening on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                logger.warning(f"Model server rejected a connection: {e}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn,), daemon=True).start()
+
+
+def _connect(address: Optional[str] = None) -> Connection:
+    return Client(address or settings.model_server_socket, family="AF_UNIX", authkey=_authkey())
+
+
+def is_serving(address: Optional[str] = None) -> bool:
+    """Whether a model server accepts connections on address."""
+    address = address or settings.model_server_socket
+    if not address or not os.path.exists(address):
+        return False
+    try:
+        _connect(address).close()
+        return True
+    except AuthenticationError:
+        # Someone serves there, but with another key: don't replace it
+        logger.warning(f"Model server on {address} rejected MODEL_SERVER_AUTHKEY")
+        return True
+    except OSError:
+        return False
+
+
+def wait_until_serving(address: Optional[str] = None, timeout: float = 30.0) -> bool:
+    """Poll until the server accepts connections or timeout passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_serving(address):
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def remote_stream(name: str, *args, **kwargs) -> Iterator[Any]:
+    """
+    Run an operation on the model server, yielding its items.
+
+    Blocking: consume it in a thread (e.g. through iterate_inference).
+    """
+    conn = _connect()
+    try:
+        conn.send((name, args, kwargs))
+        while True:
+            kind, value = conn.recv()
+            if kind == "item":
+                yield value
+            elif kind == "end":
+                return
+            else:
+                raise RuntimeError(f"Model server: {value}")
+    finally:
+        conn.close()
+
+
+def stream_loaded_models() -> Iterator[str]:
+    """Operation: ModelManager keys held by the server process."""
+    from services.model_manager import get_model_manager
+
+    for m in get_model_manager().loaded_models():
+        yield m["key"]
+
+
+def server_models() -> List[str]:
+    """Keys of the models the host's model server holds ([] if unreachable)."""
+    if not settings.model_server_socket:
+        return []
+    try:
+        return list(remote_stream("loaded_models"))
+    except Exception as e:
+        logger.warning(f"Could not list model server models: {e}")
+        return []
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve()
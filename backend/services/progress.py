@@ -0,0 +1,109 @@
+"""
+Throttled job progress reporting.
+
+Engines call their progress callback for every decoded segment, from
+whichever thread runs the decode. ProgressReporter turns that stream into
+occasional updates: a report only goes out once both the minimum interval
+and the minimum percentage change have passed, reports that arrive while a
+write is in flight are coalesced into the latest value, and the database
+write and event publish run on the event loop, never on the decode thread.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import update
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressReporter:
+    """
+    Callable progress sink for one job stage.
+
+    Called with the stage's own 0-100 percentage, which is mapped onto the
+    job's overall progress as start + percent * span / 100. Safe to call
+    from any thread; must be created on the event loop that will do the
+    writes.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        stage: str,
+        *,
+        start: float = 0.0,
+        span: float = 100.0,
+        message: str = "",
+        min_interval: Optional[float] = None,
+        min_delta: Optional[float] = None,
+    ):
+        self.job_id = job_id
+        self.stage = stage
+        self.start = start
+        self.span = span
+        self.message = message
+        self.min_interval = settings.progress_min_interval if min_interval is None else min_interval
+        self.min_delta = settings.progress_min_delta if min_delta is None else min_delta
+
+        self._loop = asyncio.get_running_loop()
+        self._lock = threading.Lock()
+        self._last_time = 0.0
+        self._last_value: Optional[float] = None
+        self._pending: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __call__(self, percent: float):
+        value = self.start + min(max(percent, 0.0), 100.0) * self.span / 100
+
+        with self._lock:
+            now = time.monotonic()
+            if self._last_value is not None and percent < 100 and (
+                now - self._last_time < self.min_interval
+                or value - self._last_value < self.min_delta
+            ):
+                return
+            self._last_time = now
+            self._last_value = value
+
+        self._loop.call_soon_threadsafe(self._submit, value)
+
+    def _submit(self, value: float):
+        # Runs on the loop: keep only the newest value while a write is in flight
+        self._pending = value
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._drain())
+
+    async def _drain(self):
+        while self._pending is not None:
+            value, self._pending = self._pending, None
+            try:
+                await self._write(value)
+            except Exception as e:
+                logger.warning(f"Progress update for job {self.job_id} failed: {e}")
+
+    async def _write(self, value: float):
+        from models.database import Job
+        from services.database import async_session_maker
+        from services.events import publish_job_progress
+
+        async with async_session_maker() as session:
+            await session.execute(
+                update(Job).where(Job.id == self.job_id).values(progress=value)
+            )
+            await session.commit()
+
+        message = self.message.format(percent=int((value - self.start) * 100 / (self.span or 1)))
+        await publish_job_progress(self.job_id, value, self.stage, message)
+
+    async def flush(self):
+        """Wait for any queued update to be written."""
+        # Let callbacks scheduled from other threads reach the loop first
+        await asyncio.sleep(0)
+        if self._task is not None:
+            await self._task
@@ -0,0 +1,157 @@
+"""
+Priority-aware job scheduler.
+
+Dispatch messages (Celery process_job tasks, background-runner submissions)
+do not name the job they will run. Each one is a slot token: when it
+starts, it claims whichever queued job is first in execution order, so
+priority changes and queue reordering made after submission still decide
+what runs next.
+
+Claims use ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent workers never
+block on or double-claim the same row, plus a conditional UPDATE so
+databases without row locks (SQLite) stay race-free.
+
+A claim can be capped by the number of jobs already running. The cap is
+checked inside the claiming UPDATE, and on PostgreSQL capped claims also
+take turns on an advisory lock, so concurrent slots cannot all see the
+old count. A slot that finds the cap reached claims nothing; the next slot
+is issued when a running job finishes, so queued jobs wait in the database
+(where priority and reordering still apply) rather than as broker
+messages. Running jobs whose worker died would hold their place in the cap
+forever, so fail_stale_jobs fails the ones running for too long.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from models.database import Job
+from schemas.job import JobStatus
+
+# Execution order: priority (1 = highest), then manual queue position,
+# then submission time
+EXECUTION_ORDER = (
+    Job.priority.asc(),
+    Job.queue_position.asc().nulls_last(),
+    Job.created_at.asc(),
+)
+
+# Queue views: jobs already running first, then the queued ones in the
+# order they will be claimed
+QUEUE_DISPLAY_ORDER = (
+    case((Job.status == JobStatus.QUEUED, 1), else_=0),
+    *EXECUTION_ORDER,
+)
+
+# Claimed jobs whose pipeline has not finished yet
+RUNNING_STATUSES = (
+    JobStatus.PROCESSING,
+    JobStatus.TRANSCRIBING,
+    JobStatus.DIARIZING,
+    JobStatus.SYNTHESIZING,
+    JobStatus.SYNCING,
+)
+
+# Candidates re-checked per claim attempt when another worker wins a race
+CLAIM_ATTEMPTS = 5
+
+# PostgreSQL advisory lock serializing capped claims
+CLAIM_LOCK_KEY = 0x6A6F6273
+
+
+async def count_running_jobs(session: AsyncSession) -> int:
+    """Number of claimed jobs whose pipeline is still running."""
+    result = await session.execute(
+        select(func.count(Job.id)).where(Job.status.in_(RUNNING_STATUSES))
+    )
+    return result.scalar() or 0
+
+
+def _running_count():
+    running = aliased(Job)
+    return (
+        select(func.count(running.id))
+        .where(running.status.in_(RUNNING_STATUSES))
+        .scalar_subquery()
+    )
+
+
+async def _serialize_claims(session: AsyncSession):
+    """
+    Make capped claims take turns until the transaction ends.
+
+    Only PostgreSQL needs it: SQLite serializes writers itself, and the
+    claiming UPDATE counts the running jobs under its write lock.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)))
+
+
+async def claim_next_job(session: AsyncSession, max_running: int = 0) -> Optional[Job]:
+    """
+    Claim the next queued job for processing.
+
+    Marks it PROCESSING and returns it, or returns None when nothing is
+    queued (e.g. the job this slot was dispatched for was cancelled) or,
+    with max_running above 0, when that many jobs are already running.
+    """
+    for _ in range(CLAIM_ATTEMPTS):
+        if max_running > 0:
+            await _serialize_claims(session)
+
+        result = await session.execute(
+            select(Job.id)
+            .where(Job.status == JobStatus.QUEUED)
+            .order_by(*EXECUTION_ORDER)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = result.scalar_one_or_none()
+        if job_id is None:
+            await session.rollback()
+            return None
+
+        claim = update(Job).where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+        if max_running > 0:
+            claim = claim.where(_running_count() < max_running)
+        claimed = await session.execute(
+            claim.values(status=JobStatus.PROCESSING, started_at=datetime.utcnow())
+        )
+        await session.commit()
+
+        if claimed.rowcount == 1:
+            result = await session.execute(
+                select(Job).where(Job.id == job_id).execution_options(populate_existing=True)
+            )
+            return result.scalar_one()
+
+        if max_running > 0 and await count_running_jobs(session) >= max_running:
+            await session.rollback()
+            return None
+
+    return None
+
+
+async def fail_stale_jobs(session: AsyncSession, max_age: timedelta) -> List[str]:
+    """
+    Mark jobs claimed more than max_age ago and still running as failed.
+
+    Returns their IDs so the caller can do the failure bookkeeping.
+    """
+    now = datetime.utcnow()
+    result = await session.execute(
+        update(Job)
+        .where(Job.status.in_(RUNNING_STATUSES), Job.started_at < now - max_age)
+        .values(
+            status=JobStatus.FAILED,
+            error_message="Job timed out: no result from its workers",
+            completed_at=now,
+        )
+        .returning(Job.id)
+    )
+    stale = list(result.scalars().all())
+    await session.commit()
+    return stale
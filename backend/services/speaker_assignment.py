@@ -0,0 +1,270 @@
+"""
+Speaker assignment from diarization turns.
+
+Diarization gives a list of speaker turns; transcription gives segments
+(and words) with their own timestamps. For each speaker, the turns are
+merged into disjoint intervals with a running total of covered time, so
+the time that speaker talks within any span [a, b] is coverage(b) -
+coverage(a), found with a binary search. Every segment is assigned in one
+vectorized pass: O((segments + turns) log turns) per speaker instead of
+comparing every segment with every turn.
+
+Segments whose words were labelled with different speakers can then be
+split at the speaker changes (split_segments_by_speaker).
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from config import settings
+from services.chunking import join_words
+
+# Speaker runs shorter than this many words are treated as diarization
+# jitter and folded into the neighbouring run
+MIN_RUN_WORDS = 2
+
+
+class SpeakerTimeline:
+    """Diarization turns indexed for overlap queries."""
+
+    def __init__(self, diarization: List[Dict]):
+        self.speakers: List[str] = sorted({d["speaker"] for d in diarization})
+        self._index = []
+
+        for speaker in self.speakers:
+            turns = sorted(
+                (d["start"], d["end"]) for d in diarization
+                if d["speaker"] == speaker and d["end"] > d["start"]
+            )
+            # Merge overlapping turns so shared time is not counted twice
+            merged: List[List[float]] = []
+            for start, end in turns:
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+
+            bounds = np.array(merged, dtype=np.float64).reshape(-1, 2)
+            lengths = bounds[:, 1] - bounds[:, 0]
+            # covered[i]: time covered by intervals before i
+            covered = np.concatenate(([0.0], np.cumsum(lengths)))
+            self._index.append((bounds[:, 0], lengths, covered))
+
+    def __bool__(self):
+        return bool(self.speakers)
+
+    def _coverage(self, speaker: int, t: np.ndarray) -> np.ndarray:
+        """Time speaker has spoken up to each time in t."""
+        starts, lengths, covered = self._index[speaker]
+        if len(starts) == 0:
+            return np.zeros_like(t)
+        i = np.searchsorted(starts, t, side="right") - 1
+        inside = np.clip(t - starts[np.maximum(i, 0)], 0.0, lengths[np.maximum(i, 0)])
+        return np.where(i >= 0, covered[np.maximum(i, 0)] + inside, 0.0)
+
+    def overlap_matrix(self, starts: Sequence[float], ends: Sequence[float]) -> np.ndarray:
+        """Seconds each speaker (column) talks within each span (row)."""
+        a = np.asarray(starts, dtype=np.float64)
+        b = np.maximum(np.asarray(ends, dtype=np.float64), a)
+        overlaps = np.zeros((len(a), len(self.speakers)))
+        for k in range(len(self.speakers)):
+            overlaps[:, k] = self._coverage(k, b) - self._coverage(k, a)
+        return overlaps
+
+    def dominant(
+        self, starts: Sequence[float], ends: Sequence[float]
+    ) -> Tuple[List[Optional[str]], np.ndarray, np.ndarray]:
+        """
+        Speaker with the most overlap for each span (None where nobody
+        talks), the share of the span they cover, and the overlap matrix.
+        """
+        overlaps = self.overlap_matrix(starts, ends)
+        if not self.speakers or len(overlaps) == 0:
+            return [None] * len(overlaps), np.zeros(len(overlaps)), overlaps
+
+        best = overlaps.argmax(axis=1)
+        best_overlap = overlaps[np.arange(len(overlaps)), best]
+        durations = np.asarray(ends, dtype=np.float64) - np.asarray(starts, dtype=np.float64)
+        confidence = np.where(durations > 0, best_overlap / np.maximum(durations, 1e-9), 0.0)
+
+        labels = [
+            self.speakers[k] if o > 0 else None
+            for k, o in zip(best.tolist(), best_overlap.tolist())
+        ]
+        return labels, np.clip(confidence, 0.0, 1.0), overlaps
+
+
+def assign_word_speakers(
+    timeline: SpeakerTimeline,
+    words_per_segment: Iterable[List[Dict]],
+    defaults: Iterable[Optional[str]],
+) -> List[List[Dict]]:
+    """
+    Label each word with its dominant speaker in one vectorized pass.
+
+    Words without timestamps, or that no turn covers, get their segment's
+    speaker (defaults). Returns new word lists; the inputs are not modified.
+    """
+    result = [[dict(w) for w in words or []] for words in words_per_segment]
+    defaults = list(defaults)
+
+    flat = [
+        (s, w) for s, words in enumerate(result) for w in words
+        if w.get("start") is not None and w.get("end") is not None
+    ]
+    labels: List[Optional[str]] = []
+    if flat:
+        labels, _, _ = timeline.dominant(
+            [w["start"] for _, w in flat],
+            [w["end"] for _, w in flat],
+        )
+
+    for (_, w), label in zip(flat, labels):
+        w["speaker"] = label
+    for s, words in enumerate(result):
+        for w in words:
+            if w.get("speaker") is None:
+                w["speaker"] = defaults[s]
+    return result
+
+
+def assign_speakers(diarization: List[Dict], segments: Sequence) -> Set[str]:
+    """
+    Set speaker and speaker_confidence on transcript segment rows.
+
+    Segments that overlap more than one speaker also get a speaker on each
+    of their words (when DIARIZATION_WORD_SPEAKERS is on), so a later pass
+    can split them at speaker changes. Returns the speakers found.
+    """
+    if not segments:
+        return set()
+
+    timeline = SpeakerTimeline(diarization)
+    labels, confidence, overlaps = timeline.dominant(
+        [seg.start_time for seg in segments],
+        [seg.end_time for seg in segments],
+    )
+
+    for seg, label, conf in zip(segments, labels, confidence.tolist()):
+        seg.speaker = label
+        seg.speaker_confidence = conf if label else None
+
+    if settings.diarization_word_speakers and timeline:
+        mixed = np.flatnonzero((overlaps > 0).sum(axis=1) > 1).tolist()
+        mixed = [i for i in mixed if segments[i].words]
+        if mixed:
+            words = assign_word_speakers(
+                timeline,
+                (segments[i].words for i in mixed),
+                (labels[i] for i in mixed),
+            )
+            for i, segment_words in zip(mixed, words):
+                # Reassign: JSON columns don't track in-place changes
+                segments[i].words = segment_words
+
+    return {label for label in labels if label}
+
+
+def _speaker_runs(words_per_segment: List[List[Dict]]) -> List[List[List]]:
+    """
+    [start, end, speaker] word ranges of each segment's speaker runs.
+
+    Change points are found for all segments at once; short runs are then
+    folded into their neighbours.
+    """
+    seg_ids = np.array([s for s, words in enumerate(words_per_segment) for _ in words])
+    labels = np.array(
+        [w.get("speaker") or "" for words in words_per_segment for w in words],
+        dtype=object,
+    )
+    runs: List[List[List]] = [[] for _ in words_per_segment]
+    if len(labels) == 0:
+        return runs
+
+    change = np.flatnonzero((labels[1:] != labels[:-1]) | (seg_ids[1:] != seg_ids[:-1])) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [len(labels)]))
+    offsets = np.concatenate(([0], np.cumsum([len(words) for words in words_per_segment])))
+
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        s = int(seg_ids[start])
+        merged = runs[s]
+        speaker = labels[start] or None
+        start, end = start - offsets[s], end - offsets[s]
+        if merged and (end - start < MIN_RUN_WORDS or merged[-1][2] == speaker):
+            merged[-1][1] = end
+        else:
+            merged.append([start, end, speaker])
+
+    for merged in runs:
+        if len(merged) > 1 and merged[0][1] - merged[0][0] < MIN_RUN_WORDS:
+            merged[1][0] = 0
+            merged.pop(0)
+    return runs
+
+
+def split_segments_by_speaker(diarization: List[Dict], segments: Sequence) -> Tuple[List, List]:
+    """
+    Split transcript segments at the speaker changes of their words.
+
+    Expects assign_speakers to have run. The first run of a split segment
+    stays in the existing row; later runs become new rows, which the caller
+    must add to the session. All segments are then re-indexed in time order.
+    Returns (all segments in order, new segments).
+    """
+    from models.database import TranscriptSegment
+
+    mixed = [
+        seg for seg in segments
+        if seg.words and len({w.get("speaker") for w in seg.words}) > 1
+    ]
+    if not mixed:
+        return list(segments), []
+
+    timeline = SpeakerTimeline(diarization)
+    added = []
+    pieces = []  # (segment row, its speaker)
+    for seg, runs in zip(mixed, _speaker_runs([seg.words for seg in mixed])):
+        words = seg.words
+        for n, (start, end, speaker) in enumerate(runs):
+            run_words = words[start:end]
+            timed = [w for w in run_words if w.get("start") is not None and w.get("end") is not None]
+            fields = dict(
+                start_time=timed[0]["start"] if timed else seg.start_time,
+                end_time=timed[-1]["end"] if timed else seg.end_time,
+                text=join_words(run_words),
+                speaker=speaker,
+                words=run_words,
+            )
+            if n == 0:
+                for name, value in fields.items():
+                    setattr(seg, name, value)
+                target = seg
+            else:
+                target = TranscriptSegment(
+                    transcript_id=seg.transcript_id,
+                    confidence=seg.confidence,
+                    **fields,
+                )
+                added.append(target)
+            pieces.append((target, speaker))
+
+    # Confidence of each piece for its own speaker, in one pass
+    if timeline:
+        overlaps = timeline.overlap_matrix(
+            [p.start_time for p, _ in pieces],
+            [p.end_time for p, _ in pieces],
+        )
+        column = {speaker: k for k, speaker in enumerate(timeline.speakers)}
+        for row, (piece, speaker) in enumerate(pieces):
+            duration = piece.end_time - piece.start_time
+            if speaker in column and duration > 0:
+                piece.speaker_confidence = min(overlaps[row, column[speaker]] / duration, 1.0)
+            else:
+                piece.speaker_confidence = None
+
+    ordered = sorted(list(segments) + added, key=lambda seg: (seg.start_time, seg.end_time))
+    for i, seg in enumerate(ordered):
+        seg.segment_index = i
+    return ordered, added
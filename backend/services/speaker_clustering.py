@@ -0,0 +1,296 @@
+"""
+Embedding-and-clustering speaker diarization.
+
+The CPU-friendly diarizer behind the speechbrain engine:
+
+1. energy_vad: speech regions from frame energy, computed in blocks over
+   the memory-mapped audio
+2. sliding_windows: fixed-length windows over the speech regions
+3. extract_embeddings: speaker embeddings (ECAPA) for the windows, in
+   padded batches
+4. cluster_embeddings: cosine affinity, then spectral clustering (speaker
+   count from the eigengap) or agglomerative clustering. Long files are
+   clustered on an evenly spaced subset of windows and every window is
+   then assigned to the nearest cluster centroid, so the cost does not
+   grow quadratically with duration
+5. windows_to_turns: smoothed window labels become speaker turns
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+
+# Energy VAD frame length, seconds
+FRAME_SECONDS = 0.03
+# Audio processed per block by the VAD, seconds
+VAD_BLOCK_SECONDS = 60.0
+# Above this many windows, clustering runs on a subset
+MAX_CLUSTER_POINTS = 2000
+# Share of each row's neighbours kept in the spectral affinity
+AFFINITY_KEEP = 0.2
+# Cosine distance at which agglomerative clustering stops merging
+AGGLOMERATIVE_THRESHOLD = 0.7
+
+
+def energy_vad(
+    audio: np.ndarray,
+    sample_rate: int,
+    min_speech: float = 0.3,
+    min_silence: float = 0.3,
+) -> np.ndarray:
+    """
+    Speech regions as an (n, 2) array of [start, end] seconds.
+
+    A frame is speech when its energy is well above the file's noise floor
+    (its quiet percentile); gaps shorter than min_silence are closed and
+    bursts shorter than min_speech dropped.
+    """
+    hop = int(FRAME_SECONDS * sample_rate)
+    n_frames = len(audio) // hop
+    if n_frames == 0:
+        return np.zeros((0, 2))
+
+    # Block-wise, so a multi-hour memmap is never squared in one piece
+    block = int(VAD_BLOCK_SECONDS / FRAME_SECONDS)
+    energy = np.empty(n_frames, dtype=np.float32)
+    for first in range(0, n_frames, block):
+        last = min(first + block, n_frames)
+        frames = np.asarray(audio[first * hop:last * hop], dtype=np.float32).reshape(-1, hop)
+        energy[first:last] = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+    floor, peak = np.percentile(energy, [10, 95])
+    speech = energy > floor + 0.3 * (peak - floor)
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+    if len(starts) == 0:
+        return np.zeros((0, 2))
+
+    keep = (starts[1:] - ends[:-1]) >= min_silence / FRAME_SECONDS
+    starts = np.concatenate((starts[:1], starts[1:][keep]))
+    ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+
+    long_enough = (ends - starts) >= min_speech / FRAME_SECONDS
+    return np.stack((starts[long_enough], ends[long_enough]), axis=1) * FRAME_SECONDS
+
+
+def sliding_windows(regions: np.ndarray, window: float, hop: float) -> np.ndarray:
+    """
+    (n, 2) [start, end] windows covering each region; regions shorter than
+    a window get one window of their own length.
+    """
+    windows = []
+    for start, end in regions:
+        if end - start <= window:
+            windows.append(np.array([[start, end]]))
+            continue
+        starts = np.arange(start, end - window, hop)
+        # Last window ends at the region's end (unless the hop already lands there)
+        if end - window - starts[-1] > 1e-6:
+            starts = np.append(starts, end - window)
+        windows.append(np.stack((starts, starts + window), axis=1))
+    return np.concatenate(windows) if windows else np.zeros((0, 2))
+
+
+def extract_embeddings(
+    encoder,
+    audio: np.ndarray,
+    windows: np.ndarray,
+    sample_rate: int,
+    batch_size: int,
+) -> np.ndarray:
+    """Embed each window with a SpeechBrain encoder, batch_size at a time."""
+    import torch
+
+    max_len = int(np.max(windows[:, 1] - windows[:, 0]) * sample_rate)
+    embeddings = []
+    for first in range(0, len(windows), batch_size):
+        batch = windows[first:first + batch_size]
+        wavs = np.zeros((len(batch), max_len), dtype=np.float32)
+        lengths = np.empty(len(batch), dtype=np.float32)
+        for row, (start, end) in enumerate(batch):
+            samples = audio[int(start * sample_rate):int(end * sample_rate)][:max_len]
+            wavs[row, :len(samples)] = samples
+            lengths[row] = len(samples) / max_len
+
+        with torch.no_grad():
+            emb = encoder.encode_batch(torch.from_numpy(wavs), torch.from_numpy(lengths))
+        embeddings.append(emb.squeeze(1).cpu().numpy())
+    return np.concatenate(embeddings)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+
+
+def _kmeans(x: np.ndarray, k: int, iterations: int = 50, seed: int = 0) -> np.ndarray:
+    """Lloyd's k-means with k-means++ seeding; returns labels."""
+    rng = np.random.default_rng(seed)
+    centers = [x[rng.integers(len(x))]]
+    for _ in range(1, k):
+        dist = np.min(((x[:, None, :] - np.array(centers)[None]) ** 2).sum(-1), axis=1)
+        total = dist.sum()
+        centers.append(x[rng.choice(len(x), p=dist / total)] if total > 0 else x[rng.integers(len(x))])
+    centers = np.array(centers)
+
+    labels = None
+    for _ in range(iterations):
+        new_labels = ((x[:, None, :] - centers[None]) ** 2).sum(-1).argmin(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(k):
+            members = x[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+    return labels
+
+
+def spectral_cluster(
+    embeddings: np.ndarray,
+    max_speakers: int,
+    num_speakers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Spectral clustering on a pruned cosine affinity; the number of
+    speakers is the position of the largest eigengap unless given.
+    """
+    n = len(embeddings)
+    x = _normalize(embeddings)
+    affinity = x @ x.T
+
+    # Keep each row's strongest neighbours, then symmetrize
+    keep = min(n, max(2, int(n * AFFINITY_KEEP)))
+    kth = -np.partition(-affinity, keep - 1, axis=1)[:, keep - 1:keep]
+    affinity = np.where(affinity >= kth, np.maximum(affinity, 0.0), 0.0)
+    affinity = 0.5 * (affinity + affinity.T)
+    np.fill_diagonal(affinity, 0.0)
+
+    d = 1.0 / np.sqrt(np.maximum(affinity.sum(axis=1), 1e-12))
+    laplacian = np.eye(n) - d[:, None] * affinity * d[None, :]
+    eigenvalues, eigenvectors = np.linalg.eigh(laplacian)
+
+    if num_speakers is None:
+        limit = min(max_speakers, n - 1)
+        num_speakers = int(np.argmax(np.diff(eigenvalues[:limit + 1]))) + 1 if limit >= 1 else 1
+
+    return _kmeans(_normalize(eigenvectors[:, :num_speakers]), num_speakers)
+
+
+def agglomerative_cluster(
+    embeddings: np.ndarray,
+    max_speakers: int,
+    num_speakers: Optional[int] = None,
+) -> np.ndarray:
+    """Average-linkage clustering on cosine distance (scipy)."""
+    from scipy.cluster.hierarchy import fcluster, linkage
+
+    tree = linkage(_normalize(embeddings), method="average", metric="cosine")
+    if num_speakers is None:
+        labels = fcluster(tree, t=AGGLOMERATIVE_THRESHOLD, criterion="distance")
+        if labels.max() <= max_speakers:
+            return labels - 1
+        num_speakers = max_speakers
+    return fcluster(tree, t=num_speakers, criterion="maxclust") - 1
+
+
+def cluster_embeddings(
+    embeddings: np.ndarray,
+    method: str = "spectral",
+    max_speakers: int = 8,
+    num_speakers: Optional[int] = None,
+) -> np.ndarray:
+    """Speaker label (0..k-1) of each embedding."""
+    n = len(embeddings)
+    if n < 3:
+        return np.zeros(n, dtype=np.int64)
+
+    cluster = agglomerative_cluster if method == "agglomerative" else spectral_cluster
+
+    if n <= MAX_CLUSTER_POINTS:
+        return np.asarray(cluster(embeddings, max_speakers, num_speakers), dtype=np.int64)
+
+    # Cluster an evenly spread subset, assign the rest to its centroids
+    subset = np.linspace(0, n - 1, MAX_CLUSTER_POINTS).astype(np.int64)
+    subset_labels = np.asarray(cluster(embeddings[subset], max_speakers, num_speakers))
+    x = _normalize(embeddings)
+    centroids = _normalize(np.stack([
+        x[subset][subset_labels == c].mean(axis=0) for c in np.unique(subset_labels)
+    ]))
+    return (x @ centroids.T).argmax(axis=1)
+
+
+def smooth_labels(labels: np.ndarray) -> np.ndarray:
+    """Relabel single windows that disagree with both identical neighbours."""
+    labels = labels.copy()
+    if len(labels) < 3:
+        return labels
+    flip = (labels[:-2] == labels[2:]) & (labels[1:-1] != labels[:-2])
+    labels[1:-1][flip] = labels[:-2][flip]
+    return labels
+
+
+def windows_to_turns(windows: np.ndarray, labels: np.ndarray) -> List[Dict]:
+    """
+    Speaker turns from labelled, possibly overlapping windows.
+
+    Overlapping neighbours split their overlap at the midpoint of their
+    centres; consecutive touching turns of one speaker are merged.
+    """
+    if len(windows) == 0:
+        return []
+
+    starts, ends = windows[:, 0].copy(), windows[:, 1].copy()
+    centres = (starts + ends) / 2
+    overlapping = starts[1:] < ends[:-1]
+    mids = (centres[:-1] + centres[1:]) / 2
+    ends[:-1] = np.where(overlapping, mids, ends[:-1])
+    starts[1:] = np.where(overlapping, mids, starts[1:])
+
+    turns: List[Dict] = []
+    for start, end, label in zip(starts.tolist(), ends.tolist(), labels.tolist()):
+        speaker = f"SPEAKER_{label:02d}"
+        if turns and turns[-1]["speaker"] == speaker and start <= turns[-1]["end"] + 1e-6:
+            turns[-1]["end"] = end
+        else:
+            turns.append({"start": start, "end": end, "speaker": speaker})
+    return turns
+
+
+def speaker_centroids(embeddings: np.ndarray, labels: np.ndarray) -> Dict[str, List[float]]:
+    """Normalized mean embedding of each speaker."""
+    x = _normalize(embeddings)
+    return {
+        f"SPEAKER_{c:02d}": _normalize(x[labels == c].mean(axis=0, keepdims=True))[0].tolist()
+        for c in np.unique(labels).tolist()
+    }
+
+
+def diarize(
+    encoder,
+    audio: np.ndarray,
+    sample_rate: int,
+    num_speakers: Optional[int] = None,
+) -> Tuple[List[Dict], Dict[str, List[float]]]:
+    """
+    Full pipeline over decoded audio. Returns the speaker turns and each
+    speaker's embedding centroid.
+    """
+    regions = energy_vad(audio, sample_rate)
+    windows = sliding_windows(regions, settings.speechbrain_window, settings.speechbrain_hop)
+    if len(windows) == 0:
+        return [], {}
+
+    embeddings = extract_embeddings(
+        encoder, audio, windows, sample_rate, max(1, settings.speechbrain_batch_size)
+    )
+    labels = cluster_embeddings(
+        embeddings,
+        method=settings.speechbrain_clustering,
+        max_speakers=settings.speechbrain_max_speakers,
+        num_speakers=num_speakers,
+    )
+    labels = smooth_labels(labels)
+    return windows_to_turns(windows, labels), speaker_centroids(embeddings, labels)
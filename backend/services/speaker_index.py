@@ -0,0 +1,221 @@
+"""
+Cross-job speaker identification.
+
+Diarization stores one embedding centroid per speaker and transcript
+(SpeakerEmbedding). When a user renames a speaker, the embedding is folded
+into a named SpeakerProfile. New transcripts' speakers are matched against
+the profiles by cosine similarity, and labelled with the profile's name
+when the best match clears SPEAKER_MATCH_THRESHOLD.
+
+Search is brute-force cosine over L2-normalized vectors in NumPy, which is
+fast for thousands of profiles. With SPEAKER_INDEX_BACKEND=faiss and faiss
+installed, an inner-product faiss index is used instead.
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows stay zero)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SpeakerIndex:
+    """Cosine-similarity index over speaker profiles."""
+
+    def __init__(self, ids: Sequence[str], names: Sequence[str], vectors: np.ndarray):
+        self.ids = list(ids)
+        self.names = list(names)
+        self.vectors = normalize(vectors) if len(self.ids) else np.zeros((0, 0), dtype=np.float32)
+        self._faiss = None
+
+        if self.ids and settings.speaker_index_backend == "faiss":
+            try:
+                import faiss
+                self._faiss = faiss.IndexFlatIP(self.vectors.shape[1])
+                self._faiss.add(self.vectors)
+            except ImportError:
+                logger.warning("faiss is not installed; using NumPy speaker search")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The k most similar profiles for each query row.
+
+        Returns (scores, indices), both shaped (queries, k), best first.
+        """
+        queries = normalize(queries)
+        k = min(k, len(self.ids))
+        if k == 0:
+            empty = np.zeros((len(queries), 0))
+            return empty, empty.astype(np.int64)
+
+        if self._faiss is not None:
+            return self._faiss.search(queries, k)
+
+        scores = queries @ self.vectors.T
+        top = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(scores, top, axis=1), top
+
+    def match(self, embeddings: Dict[str, List[float]]) -> Dict[str, Tuple[str, str, float]]:
+        """
+        Match diarized speakers to profiles, one speaker per profile.
+
+        Returns {label: (profile_id, name, score)} for matches at or above
+        the threshold. Pairs are taken greedily in order of similarity so
+        two speakers of one recording never get the same name.
+        """
+        if not self.ids or not embeddings:
+            return {}
+
+        labels = list(embeddings)
+        # Each speaker needs at most len(labels) candidates: the others can
+        # take no more than len(labels) - 1 profiles away from it
+        scores, indices = self.search(
+            np.array([embeddings[label] for label in labels]), k=len(labels)
+        )
+        candidates = sorted(
+            (
+                (float(score), row, int(col))
+                for row in range(len(labels))
+                for score, col in zip(scores[row], indices[row])
+                if col >= 0
+            ),
+            reverse=True,
+        )
+
+        matches = {}
+        used = set()
+        for score, row, col in candidates:
+            if score < settings.speaker_match_threshold:
+                break
+            if labels[row] in matches or col in used:
+                continue
+            matches[labels[row]] = (self.ids[col], self.names[col], score)
+            used.add(col)
+        return matches
+
+
+async def load_speaker_index(session, dim: Optional[int] = None) -> SpeakerIndex:
+    """
+    Build the index from the speaker profiles.
+
+    With dim, only profiles of that embedding size are included: engines
+    embed differently, and only embeddings of one model are comparable.
+    """
+    from models.database import SpeakerProfile
+
+    query = select(SpeakerProfile)
+    if dim is not None:
+        query = query.where(SpeakerProfile.dim == dim)
+    result = await session.execute(query)
+    profiles = result.scalars().all()
+    return SpeakerIndex(
+        [p.id for p in profiles],
+        [p.name for p in profiles],
+        np.array([p.centroid for p in profiles], dtype=np.float32),
+    )
+
+
+def usable_embeddings(embeddings: Optional[Dict[str, List[float]]]) -> Dict[str, List[float]]:
+    """Drop empty or non-finite embeddings (speakers with too little speech)."""
+    return {
+        label: vector for label, vector in (embeddings or {}).items()
+        if vector and np.all(np.isfinite(vector))
+    }
+
+
+async def identify_speakers(
+    session,
+    transcript_id: str,
+    embeddings: Dict[str, List[float]],
+) -> Dict[str, str]:
+    """
+    Store a transcript's speaker embeddings and name the speakers that
+    match a known profile.
+
+    Returns {label: name} for the matched speakers.
+    """
+    from models.database import SpeakerEmbedding
+
+    embeddings = usable_embeddings(embeddings)
+    if not embeddings:
+        return {}
+
+    dim = len(next(iter(embeddings.values())))
+    matches = (await load_speaker_index(session, dim)).match(embeddings)
+
+    for label, vector in embeddings.items():
+        profile_id, name, score = matches.get(label, (None, label, None))
+        session.add(SpeakerEmbedding(
+            transcript_id=transcript_id,
+            label=label,
+            speaker=name,
+            embedding=[float(v) for v in vector],
+            profile_id=profile_id,
+            match_score=score,
+        ))
+
+    if matches:
+        logger.info(
+            f"Identified speakers in transcript {transcript_id}: "
+            + ", ".join(f"{label}={name} ({score:.2f})" for label, (_, name, score) in matches.items())
+        )
+    return {label: name for label, (_, name, _) in matches.items()}
+
+
+async def learn_speaker_names(session, transcript_id: str, speaker_map: Dict[str, str]):
+    """
+    Fold renamed speakers' embeddings into the named profiles.
+
+    Profiles are kept per name and embedding size, so one name can be
+    learned from every diarization engine. The profile centroid is the
+    normalized running mean of every embedding assigned to it. Does not
+    commit.
+    """
+    from models.database import SpeakerEmbedding, SpeakerProfile
+
+    result = await session.execute(
+        select(SpeakerEmbedding).where(
+            SpeakerEmbedding.transcript_id == transcript_id,
+            SpeakerEmbedding.speaker.in_(list(speaker_map)),
+        )
+    )
+    for row in result.scalars().all():
+        name = speaker_map[row.speaker]
+        row.speaker = name
+
+        vector = normalize(row.embedding)[0]
+        result = await session.execute(
+            select(SpeakerProfile).where(
+                SpeakerProfile.name == name,
+                SpeakerProfile.dim == len(vector),
+            )
+        )
+        profile = result.scalar_one_or_none()
+
+        if profile is None:
+            profile = SpeakerProfile(
+                name=name, dim=len(vector), centroid=vector.tolist(), sample_count=1,
+            )
+            session.add(profile)
+            await session.flush()
+        elif row.profile_id != profile.id:
+            count = profile.sample_count or 0
+            centroid = normalize(profile.centroid)[0] * count + vector
+            profile.centroid = normalize(centroid)[0].tolist()
+            profile.sample_count = count + 1
+
+        row.profile_id = profile.id
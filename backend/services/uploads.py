@@ -0,0 +1,104 @@
+"""
+Streaming upload ingestion.
+
+Copies multipart uploads to disk in fixed-size chunks while hashing them
+incrementally, so API memory stays flat regardless of file size.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from config import settings
+
+# Size of each read from the spooled upload (1 MiB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SavedUpload:
+    """Result of streaming an upload to disk."""
+
+    path: Path
+    size: int
+    file_hash: str
+
+
+def max_upload_bytes() -> int:
+    """Maximum accepted upload size in bytes."""
+    return settings.max_upload_size_mb * 1024 * 1024
+
+
+def new_hasher():
+    """Create an incremental file hasher (xxh3_64, falling back to sha256)."""
+    try:
+        import xxhash
+        return xxhash.xxh3_64()
+    except ImportError:
+        return hashlib.sha256()
+
+
+def upload_too_large() -> HTTPException:
+    """Error raised when an upload exceeds max_upload_size_mb."""
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {settings.max_upload_size_mb} MB",
+    )
+
+
+async def save_upload(
+    file: UploadFile,
+    dest: Path,
+    max_bytes: Optional[int] = None,
+) -> SavedUpload:
+    """
+    Stream an uploaded file to dest, hashing it as it is written.
+
+    The size limit is enforced per chunk, so oversized uploads are rejected
+    as soon as the limit is crossed and the partial file is removed.
+    """
+    if max_bytes is None:
+        max_bytes = max_upload_bytes()
+
+    # Reject early when the multipart parser already knows the size
+    if file.size is not None and file.size > max_bytes:
+        raise upload_too_large()
+
+    hasher = new_hasher()
+    size = 0
+
+    try:
+        async with aiofiles.open(dest, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise upload_too_large()
+
+                hasher.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        # Don't leave partial uploads behind
+        dest.unlink(missing_ok=True)
+        raise
+
+    return SavedUpload(path=dest, size=size, file_hash=hasher.hexdigest())
+
+
+async def hash_file(path: Path) -> str:
+    """Hash a file on disk in chunks."""
+    hasher = new_hasher()
+    async with aiofiles.open(path, "rb") as f:
+        while True:
+            chunk = await f.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,155 @@
+"""
+Worker registry in Redis.
+
+Every Celery worker process keeps a record in the ``stt:workers`` hash,
+under its worker_id, describing whether it has finished warming up,
+whether it is busy, which models it has loaded and the queue that reaches
+its node directly. Records not refreshed within WORKER_STATE_TTL
+(workers.heartbeat) are ignored and pruned, so crashed workers drop out on
+their own, and reading the registry is one HGETALL rather than a key scan.
+
+A node's direct queue is consumed by all of its prefork children, and a
+task sent there runs on whichever child is free. Routing therefore looks
+at nodes: a node is warm for a model when it has an idle child and every
+idle child has the model loaded.
+"""
+
+import json
+import logging
+import os
+import random
+import socket
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+WORKERS_KEY = "stt:workers"
+
+_client = None
+
+
+def worker_id() -> str:
+    """Identifier of this worker process."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.redis_url)
+    return _client
+
+
+def report_worker_state(ready: bool, models: List[str], **extra):
+    """Publish this process's state (synchronous; safe from any thread)."""
+    record = {
+        "worker_id": worker_id(),
+        "ready": ready,
+        "models": models,
+        "updated_at": time.time(),
+        **extra,
+    }
+    try:
+        client = _get_client()
+        client.hset(WORKERS_KEY, worker_id(), json.dumps(record))
+        # Drop the whole hash if every worker goes away
+        client.expire(WORKERS_KEY, settings.worker_state_ttl)
+    except Exception as e:
+        logger.warning(f"Could not report worker state: {e}")
+
+
+def clear_worker_state():
+    """Remove this process's record (clean shutdown)."""
+    try:
+        _get_client().hdel(WORKERS_KEY, worker_id())
+    except Exception:
+        pass
+
+
+def _is_live(record: Dict) -> bool:
+    return time.time() - record.get("updated_at", 0) <= settings.worker_state_ttl
+
+
+def list_workers() -> List[Dict]:
+    """All live worker records; stale ones are pruned."""
+    try:
+        client = _get_client()
+        values = client.hgetall(WORKERS_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read worker registry: {e}")
+        return []
+
+    records = [json.loads(v) for v in values.values()]
+    stale = [r["worker_id"] for r in records if not _is_live(r)]
+    if stale:
+        try:
+            client.hdel(WORKERS_KEY, *stale)
+        except Exception:
+            pass
+    return [r for r in records if _is_live(r)]
+
+
+def get_worker(worker: str) -> Optional[Dict]:
+    """Record of one worker, if it is alive."""
+    try:
+        value = _get_client().hget(WORKERS_KEY, worker)
+    except Exception:
+        return None
+    record = json.loads(value) if value else None
+    return record if record and _is_live(record) else None
+
+
+def list_nodes() -> List[Dict]:
+    """
+    Live workers grouped by direct queue (one entry per node).
+
+    idle counts the node's ready, idle children; models are the keys every
+    one of those children holds, i.e. the models a task sent to the node's
+    queue is sure to find loaded.
+    """
+    children = defaultdict(list)
+    for record in list_workers():
+        if record.get("queue"):
+            children[record["queue"]].append(record)
+
+    nodes = []
+    for queue, records in children.items():
+        idle = [r for r in records if r.get("ready") and not r.get("busy")]
+        models = set(idle[0].get("models", [])) if idle else set()
+        for record in idle[1:]:
+            models &= set(record.get("models", []))
+        nodes.append({
+            "queue": queue,
+            "workers": len(records),
+            "idle": len(idle),
+            "models": sorted(models),
+        })
+    return nodes
+
+
+def key_model_id(key: str) -> str:
+    """model_id part of a ModelManager key ("whisper:large-v3:cuda:float16")."""
+    parts = key.split(":")
+    return parts[1] if len(parts) > 1 else key
+
+
+def find_warm_queue(model_id: str) -> Optional[str]:
+    """
+    Direct queue of a node whose idle workers all have model_id loaded.
+
+    Returns None when there is no such node; the caller then uses the
+    shared queue, where any worker (loading the model if needed) picks the
+    task up.
+    """
+    candidates = [
+        node for node in list_nodes()
+        if node["idle"] and any(key_model_id(k) == model_id for k in node["models"])
+    ]
+    if not candidates:
+        return None
+    return random.choice(candidates)["queue"]
@@ -0,0 +1,88 @@
+"""Chunk planning and merging for chunk-parallel transcription."""
+
+import numpy as np
+import pytest
+
+from services.audio import SAMPLE_RATE
+from services.chunking import AudioChunk, join_words, merge_chunk_segments, plan_chunks
+
+
+def noise(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def word(text: str, start: float, end: float) -> dict:
+    return {"word": text, "start": start, "end": end, "probability": 0.9}
+
+
+def test_plan_chunks_tiles_the_recording():
+    chunks = plan_chunks(noise(100), chunk_length=30, overlap=1.0)
+
+    assert len(chunks) == 3
+    assert chunks[0].keep_start == 0.0
+    assert chunks[-1].keep_end == pytest.approx(100.0)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.keep_end == nxt.keep_start
+    for chunk in chunks:
+        assert chunk.start == pytest.approx(max(chunk.keep_start - 1.0, 0.0))
+        assert chunk.end == pytest.approx(min(chunk.keep_end + 1.0, 100.0))
+
+
+def test_plan_chunks_cuts_at_quiet_point():
+    audio = noise(100)
+    audio[int(31.0 * SAMPLE_RATE):int(31.2 * SAMPLE_RATE)] = 0.0
+
+    chunks = plan_chunks(audio, chunk_length=30, overlap=1.0)
+
+    assert 31.0 <= chunks[0].keep_end <= 31.2
+
+
+def test_merge_keeps_overlapping_words_in_the_chunk_owning_their_midpoint():
+    first = AudioChunk(index=0, start=0.0, end=11.0, keep_start=0.0, keep_end=10.0)
+    second = AudioChunk(index=1, start=9.0, end=20.0, keep_start=10.0, keep_end=20.0)
+    results = [
+        # Out of order on purpose: chord results are not sorted
+        {
+            "chunk": second.to_dict(),
+            "segments": [{
+                "start": 0.8, "end": 2.0, "text": "world again",
+                "words": [word(" world", 0.8, 1.4), word(" again", 1.6, 2.0)],
+            }],
+        },
+        {
+            "chunk": first.to_dict(),
+            "segments": [{
+                "start": 9.0, "end": 10.4, "text": "hello world",
+                "words": [word(" hello", 9.0, 9.4), word(" world", 9.8, 10.4)],
+            }],
+        },
+    ]
+
+    merged = merge_chunk_segments(results)
+
+    assert [seg["text"] for seg in merged] == ["hello", "world again"]
+    assert merged[0]["start"] == 9.0
+    assert merged[0]["end"] == 9.4
+    assert merged[1]["start"] == pytest.approx(9.8)
+    assert [w["word"] for w in merged[1]["words"]] == [" world", " again"]
+
+
+def test_merge_assigns_segments_without_words_by_midpoint():
+    first = AudioChunk(index=0, start=0.0, end=11.0, keep_start=0.0, keep_end=10.0)
+    second = AudioChunk(index=1, start=9.0, end=20.0, keep_start=10.0, keep_end=20.0)
+    results = [
+        {"chunk": first.to_dict(), "segments": [{"start": 9.5, "end": 10.9, "text": "late"}]},
+        {"chunk": second.to_dict(), "segments": [{"start": 0.5, "end": 1.9, "text": "late"}]},
+    ]
+
+    merged = merge_chunk_segments(results)
+
+    # Midpoint 10.2 belongs to the second chunk only
+    assert len(merged) == 1
+    assert merged[0]["start"] == pytest.approx(9.5)
+
+
+def test_join_words_keeps_engine_spacing():
+    assert join_words([{"word": " it"}, {"word": "'s"}, {"word": " fine."}]) == "it's fine."
+    assert join_words([{"word": "it's"}, {"word": "fine."}]) == "it's fine."
@@ -0,0 +1,83 @@
+"""Model cache eviction and leases (no real models: loaders return stubs)."""
+
+import threading
+
+import pytest
+
+from services.model_manager import ModelManager, model_lease
+
+
+@pytest.fixture
+def manager():
+    manager = ModelManager(idle_timeout=600, budgets={"vram": 0, "ram": 2.0})
+    yield manager
+    manager.shutdown()
+
+
+def load(manager, key, size_gb=1.0, **kwargs):
+    return manager.get_model(key, lambda: object(), size_gb=size_gb, device="cpu", **kwargs)
+
+
+def test_lru_model_is_evicted_to_fit_budget(manager):
+    load(manager, "a")
+    load(manager, "b")
+    load(manager, "c")
+
+    assert [m["key"] for m in manager.loaded_models()] == ["b", "c"]
+
+
+def test_leased_model_is_not_evicted(manager):
+    with model_lease():
+        load(manager, "a")
+        load(manager, "b")
+        load(manager, "c")
+
+        # Over budget rather than freeing weights still in use
+        assert {m["key"] for m in manager.loaded_models()} == {"a", "b", "c"}
+
+    load(manager, "d")
+    assert "a" not in {m["key"] for m in manager.loaded_models()}
+
+
+def test_leased_wrapper_keeps_its_parent_loaded(manager):
+    load(manager, "whisper")
+    with model_lease():
+        load(manager, "whisper_batched", size_gb=0, parent="whisper")
+        load(manager, "other")
+        load(manager, "another")
+
+        assert manager.is_loaded("whisper")
+
+
+def test_lease_held_by_another_thread_blocks_eviction(manager):
+    leased = threading.Event()
+    done = threading.Event()
+
+    def decode():
+        with model_lease():
+            load(manager, "a")
+            leased.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=decode)
+    thread.start()
+    leased.wait(5)
+
+    load(manager, "b")
+    load(manager, "c")
+    assert manager.is_loaded("a")
+
+    done.set()
+    thread.join()
+    load(manager, "d")
+    assert not manager.is_loaded("a")
+
+
+def test_idle_timeout_skips_leased_models(manager):
+    manager._timeout = -1
+    with model_lease():
+        load(manager, "a")
+        manager._check_timeouts()
+        assert manager.is_loaded("a")
+    manager._check_timeouts()
+    assert not manager.is_loaded("a")
@@ -0,0 +1,141 @@
+"""Priority-ordered job claims (SQLite through aiosqlite)."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models.database import Base, Job
+from schemas.job import JobStatus
+from services.scheduler import RUNNING_STATUSES, claim_next_job, fail_stale_jobs
+
+
+@pytest.fixture
+async def session_maker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def add_jobs(session_maker, *specs):
+    """Insert jobs from (name, status, priority, queue_position, age_seconds)."""
+    now = datetime.utcnow()
+    async with session_maker() as session:
+        for name, status, priority, position, age in specs:
+            session.add(Job(
+                id=name,
+                filename=f"{name}.wav",
+                original_path=f"/tmp/{name}.wav",
+                status=status,
+                priority=priority,
+                queue_position=position,
+                created_at=now - timedelta(seconds=age),
+            ))
+        await session.commit()
+
+
+async def claim_all(session_maker, **kwargs):
+    claimed = []
+    while True:
+        async with session_maker() as session:
+            job = await claim_next_job(session, **kwargs)
+        if job is None:
+            return claimed
+        claimed.append(job.id)
+
+
+async def test_claims_follow_priority_then_position_then_age(session_maker):
+    await add_jobs(
+        session_maker,
+        ("low", JobStatus.QUEUED, 9, None, 100),
+        ("urgent", JobStatus.QUEUED, 1, None, 0),
+        ("unplaced", JobStatus.QUEUED, 5, None, 50),
+        ("second", JobStatus.QUEUED, 5, 2, 0),
+        ("first", JobStatus.QUEUED, 5, 1, 0),
+        ("older", JobStatus.QUEUED, 5, None, 60),
+    )
+
+    assert await claim_all(session_maker) == ["urgent", "first", "second", "older", "unplaced", "low"]
+
+
+async def test_claim_marks_the_job_processing_and_skips_other_states(session_maker):
+    await add_jobs(
+        session_maker,
+        ("done", JobStatus.COMPLETED, 1, None, 0),
+        ("running", JobStatus.TRANSCRIBING, 1, None, 0),
+        ("waiting", JobStatus.QUEUED, 5, None, 0),
+    )
+
+    async with session_maker() as session:
+        job = await claim_next_job(session)
+
+    assert job.id == "waiting"
+    assert job.status == JobStatus.PROCESSING
+    assert job.started_at is not None
+    assert await claim_all(session_maker) == []
+
+
+async def test_concurrent_claims_never_share_a_job(session_maker):
+    await add_jobs(
+        session_maker,
+        *((f"job{i}", JobStatus.QUEUED, 5, None, i) for i in range(3)),
+    )
+
+    async def claim():
+        async with session_maker() as session:
+            job = await claim_next_job(session)
+            return job.id if job else None
+
+    results = await asyncio.gather(*(claim() for _ in range(5)))
+
+    claimed = [r for r in results if r]
+    assert sorted(claimed) == ["job0", "job1", "job2"]
+    assert results.count(None) == 2
+
+
+async def test_concurrent_claims_respect_max_running(session_maker):
+    await add_jobs(
+        session_maker,
+        ("running", JobStatus.DIARIZING, 5, None, 0),
+        *((f"job{i}", JobStatus.QUEUED, 5, None, i) for i in range(5)),
+    )
+
+    async def claim():
+        async with session_maker() as session:
+            job = await claim_next_job(session, max_running=3)
+            return job.id if job else None
+
+    results = await asyncio.gather(*(claim() for _ in range(5)))
+
+    assert len([r for r in results if r]) == 2
+    async with session_maker() as session:
+        running = await session.execute(
+            select(func.count(Job.id)).where(Job.status.in_(RUNNING_STATUSES))
+        )
+    assert running.scalar() == 3
+
+
+async def test_stale_running_jobs_are_failed(session_maker):
+    await add_jobs(
+        session_maker,
+        ("stuck", JobStatus.TRANSCRIBING, 5, None, 0),
+        ("fresh", JobStatus.TRANSCRIBING, 5, None, 0),
+    )
+    async with session_maker() as session:
+        await session.execute(
+            update(Job).where(Job.id == "stuck").values(started_at=datetime.utcnow() - timedelta(hours=13))
+        )
+        await session.execute(
+            update(Job).where(Job.id == "fresh").values(started_at=datetime.utcnow())
+        )
+        await session.commit()
+
+    async with session_maker() as session:
+        assert await fail_stale_jobs(session, timedelta(hours=12)) == ["stuck"]
+        job = await session.get(Job, "stuck")
+
+    assert job.status == JobStatus.FAILED
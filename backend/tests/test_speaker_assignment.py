@@ -0,0 +1,91 @@
+"""Speaker timeline queries and splitting segments at speaker changes."""
+
+import numpy as np
+import pytest
+
+from models.database import TranscriptSegment
+from services.speaker_assignment import SpeakerTimeline, _speaker_runs, split_segments_by_speaker
+
+DIARIZATION = [
+    {"start": 0.0, "end": 5.0, "speaker": "A"},
+    {"start": 4.0, "end": 8.0, "speaker": "A"},  # overlaps the turn before
+    {"start": 6.0, "end": 10.0, "speaker": "B"},
+]
+
+
+def word(text: str, start: float, end: float, speaker: str) -> dict:
+    return {"word": text, "start": start, "end": end, "speaker": speaker}
+
+
+def test_overlap_matrix_counts_each_speakers_time_once():
+    timeline = SpeakerTimeline(DIARIZATION)
+
+    overlaps = timeline.overlap_matrix([2.0, 9.0, 5.0, -3.0], [7.0, 12.0, 5.0, 0.0])
+
+    assert timeline.speakers == ["A", "B"]
+    np.testing.assert_allclose(overlaps, [[5.0, 1.0], [0.0, 1.0], [0.0, 0.0], [0.0, 0.0]])
+
+
+def test_dominant_speaker_and_confidence():
+    labels, confidence, _ = SpeakerTimeline(DIARIZATION).dominant([1.0, 8.5, 11.0], [3.0, 9.5, 12.0])
+
+    assert labels == ["A", "B", None]
+    assert confidence.tolist() == pytest.approx([1.0, 1.0, 0.0])
+
+
+def test_speaker_runs_split_at_changes():
+    words = [[{"speaker": s} for s in "AABBB"]]
+
+    assert _speaker_runs(words) == [[[0, 2, "A"], [2, 5, "B"]]]
+
+
+def test_speaker_runs_fold_single_word_jitter():
+    words = [
+        [{"speaker": s} for s in "AAABAA"],
+        [{"speaker": s} for s in "BAAA"],
+        [],
+    ]
+
+    assert _speaker_runs(words) == [[[0, 6, "A"]], [[0, 4, "A"]], []]
+
+
+def test_split_segments_by_speaker():
+    segment = TranscriptSegment(
+        transcript_id="t1",
+        segment_index=0,
+        start_time=0.0,
+        end_time=3.5,
+        text="Hello there how are you",
+        confidence=-0.2,
+        words=[
+            word(" Hello", 0.0, 0.5, "A"),
+            word(" there", 0.5, 1.0, "A"),
+            word(" how", 2.1, 2.5, "B"),
+            word(" are", 2.5, 3.0, "B"),
+            word(" you", 3.0, 3.5, "B"),
+        ],
+    )
+    single = TranscriptSegment(
+        transcript_id="t1",
+        segment_index=1,
+        start_time=4.0,
+        end_time=5.0,
+        text="Fine",
+        words=[word(" Fine", 4.0, 5.0, "A")],
+    )
+    diarization = [
+        {"start": 0.0, "end": 2.0, "speaker": "A"},
+        {"start": 2.0, "end": 4.0, "speaker": "B"},
+        {"start": 4.0, "end": 5.0, "speaker": "A"},
+    ]
+
+    ordered, added = split_segments_by_speaker(diarization, [segment, single])
+
+    assert len(added) == 1
+    assert [s.text for s in ordered] == ["Hello there", "how are you", "Fine"]
+    assert [s.speaker for s in ordered[:2]] == ["A", "B"]
+    assert [s.segment_index for s in ordered] == [0, 1, 2]
+    assert (ordered[1].start_time, ordered[1].end_time) == (2.1, 3.5)
+    assert ordered[1].confidence == -0.2
+    assert ordered[0].speaker_confidence == pytest.approx(1.0)
+    assert ordered[1].speaker_confidence == pytest.approx(1.0)
@@ -0,0 +1,101 @@
+"""Embedding-and-clustering diarization building blocks."""
+
+import numpy as np
+import pytest
+
+from services import speaker_clustering
+from services.speaker_clustering import cluster_embeddings, energy_vad, sliding_windows, windows_to_turns
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def quiet(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 1e-4, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def two_speakers(per_speaker: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = np.eye(dim)[:2]
+    return np.concatenate([
+        centre + rng.normal(0, 0.05, (per_speaker, dim)) for centre in centres
+    ])
+
+
+def test_energy_vad_finds_speech_regions():
+    audio = np.concatenate([quiet(1), tone(2), quiet(1), tone(1), quiet(1)])
+
+    regions = energy_vad(audio, SAMPLE_RATE)
+
+    np.testing.assert_allclose(regions, [[1.0, 3.0], [4.0, 5.0]], atol=0.05)
+
+
+def test_energy_vad_of_silence_is_empty():
+    assert energy_vad(np.zeros(100, dtype=np.float32), SAMPLE_RATE).shape == (0, 2)
+
+
+def test_sliding_windows_end_at_the_region_end():
+    windows = sliding_windows(np.array([[0.0, 3.5], [5.0, 6.0]]), window=1.5, hop=0.75)
+
+    np.testing.assert_allclose(windows, [
+        [0.0, 1.5], [0.75, 2.25], [1.5, 3.0], [2.0, 3.5],
+        [5.0, 6.0],
+    ])
+
+
+def test_sliding_windows_do_not_repeat_the_last_window():
+    # 1.8 - 1.5 and arange's last step land on the same float
+    windows = sliding_windows(np.array([[0.0, 1.8]]), window=1.5, hop=0.1)
+
+    assert windows[-1, 1] == pytest.approx(1.8)
+    assert np.all(np.diff(windows[:, 0]) > 1e-6)
+
+
+def test_cluster_embeddings_separates_speakers():
+    labels = cluster_embeddings(two_speakers(50))
+
+    assert len(set(labels[:50].tolist())) == 1
+    assert len(set(labels[50:].tolist())) == 1
+    assert labels[0] != labels[50]
+
+
+def test_cluster_embeddings_on_a_subset(monkeypatch):
+    # 20 of the 60 windows are clustered; each keeps its 9 nearest neighbours
+    monkeypatch.setattr(speaker_clustering, "MAX_CLUSTER_POINTS", 20)
+    monkeypatch.setattr(speaker_clustering, "AFFINITY_KEEP", 0.5)
+
+    labels = cluster_embeddings(two_speakers(30))
+
+    assert len(set(labels[:30].tolist())) == 1
+    assert len(set(labels[30:].tolist())) == 1
+    assert labels[0] != labels[30]
+
+
+def test_cluster_embeddings_agglomerative():
+    pytest.importorskip("scipy")
+
+    labels = cluster_embeddings(two_speakers(10), method="agglomerative")
+
+    assert labels.tolist() == [labels[0]] * 10 + [labels[10]] * 10
+    assert labels[0] != labels[10]
+
+
+def test_cluster_embeddings_of_too_few_windows():
+    assert cluster_embeddings(two_speakers(1)).tolist() == [0, 0]
+
+
+def test_windows_to_turns_splits_overlaps_at_the_midpoint():
+    windows = np.array([[0.0, 1.5], [0.75, 2.25], [1.5, 3.0], [2.25, 3.75], [5.0, 6.0]])
+
+    turns = windows_to_turns(windows, np.array([0, 0, 1, 1, 1]))
+
+    assert turns == [
+        {"start": 0.0, "end": pytest.approx(1.875), "speaker": "SPEAKER_00"},
+        {"start": pytest.approx(1.875), "end": 3.75, "speaker": "SPEAKER_01"},
+        {"start": 5.0, "end": 6.0, "speaker": "SPEAKER_01"},
+    ]
@@ -12,6 +12,7 @@ celery_app = Celery(
         "workers.diarization_worker",
         "workers.tts_worker",
         "workers.sync_worker",
+        "workers.tasks",
     ],
 )
 
@@ -30,6 +31,8 @@ celery_app.conf.update(
         "workers.diarization_worker.*": {"queue": "diarization"},
         "workers.tts_worker.*": {"queue": "tts"},
         "workers.sync_worker.*": {"queue": "sync"},
+        # Orchestration and bookkeeping: short tasks, never wait on others
+        "workers.tasks.*": {"queue": "pipeline"},
     },
     
     # Result settings
@@ -1,18 +1,32 @@
 """Speaker diarization worker with pluggable engine support."""
 
-import asyncio
-from typing import Dict, Any, List, Optional
+import inspect
+import json
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
 from sqlalchemy import select
 
 from .celery_app import celery_app
+from .runtime import run_async
 from config import settings
 from schemas.model import ModelEngine
+from services.audio import SAMPLE_RATE, load_audio, prepare_audio, wav_for_artifact
+from services.inference import run_in_process, run_inference
+from services.speaker_assignment import assign_speakers, split_segments_by_speaker
 
 
 @celery_app.task(bind=True, name="workers.diarization_worker.diarize_audio")
-def diarize_audio(self, job_id: str, prev_result: Any = None):
+def diarize_audio(self, job_id: str, prev_result: Any = None, defer_assignment: bool = False):
     """
-    Perform speaker diarization on transcribed audio.
+    Perform speaker diarization on a job's audio.
+    
+    The speaker turns are saved to the job's output directory. Normally they
+    are then assigned to the transcript's segments; with defer_assignment
+    the task only diarizes (it runs alongside transcription, and
+    merge_diarization assigns speakers once both are done), leaving the
+    job's status and progress to the transcription task.
     
     Supports multiple engines:
     - pyannote (default, best quality)
@@ -20,7 +34,7 @@ def diarize_audio(self, job_id: str, prev_result: Any = None):
     - speechbrain
     """
     from services.database import async_session_maker
-    from models.database import Job, Model, Transcript, TranscriptSegment
+    from models.database import Job, Model
     from schemas.job import JobStatus
     
     async def run():
@@ -55,25 +69,27 @@ def diarize_audio(self, job_id: str, prev_result: Any = None):
             if not model:
                 raise ValueError("No diarization model available. Please register a model first.")
             
-            # Update status
-            job.status = JobStatus.DIARIZING
-            job.current_stage = "diarizing"
-            await session.commit()
-            
-            await update_progress(session, job, 50, "Starting speaker diarization...")
+            if not defer_assignment:
+                job.status = JobStatus.DIARIZING
+                job.current_stage = "diarizing"
+                await session.commit()
+                
+                await update_progress(session, job, 50, "Starting speaker diarization...")
             
-            # Get audio path
-            audio_path = await get_audio_path(job.original_path)
+            # Shared decoded artifact (decoded once per source)
+            audio_path = await prepare_audio(job.original_path, job.file_hash)
             
             # Run diarization based on engine
             engine = model.engine
             
+            embeddings = None
             if engine == ModelEngine.PYANNOTE:
-                diarization = await diarize_pyannote(
+                diarization, embeddings = await diarize_pyannote(
                     audio_path=audio_path,
                     model_id=model.model_id,
                     device=model.device or settings.device,
                     hf_token=settings.hf_token,
+                    return_embeddings=True,
                 )
             elif engine == ModelEngine.NEMO:
                 diarization = await diarize_nemo(
@@ -81,54 +97,110 @@ def diarize_audio(self, job_id: str, prev_result: Any = None):
                     model_id=model.model_id,
                 )
             elif engine == ModelEngine.SPEECHBRAIN:
-                diarization = await diarize_speechbrain(
+                diarization, embeddings = await diarize_speechbrain(
                     audio_path=audio_path,
                     model_id=model.model_id,
+                    device=model.device or settings.device,
                 )
             else:
                 raise ValueError(f"Unsupported diarization engine: {engine}")
             
-            await update_progress(session, job, 70, "Assigning speakers to segments...")
+            save_diarization(job_id, diarization, embeddings)
             
-            # Get transcript segments
-            result = await session.execute(
-                select(Transcript).where(Transcript.job_id == job_id)
-            )
-            transcript = result.scalar_one_or_none()
-            
-            if transcript:
-                result = await session.execute(
-                    select(TranscriptSegment)
-                    .where(TranscriptSegment.transcript_id == transcript.id)
-                    .order_by(TranscriptSegment.segment_index)
-                )
-                segments = result.scalars().all()
-                
-                # Assign speakers to segments
-                speakers = set()
-                for segment in segments:
-                    speaker = find_speaker_for_segment(
-                        diarization,
-                        segment.start_time,
-                        segment.end_time,
-                    )
-                    segment.speaker = speaker
-                    if speaker:
-                        speakers.add(speaker)
-                
-                transcript.speaker_count = len(speakers)
-                await session.commit()
+            if defer_assignment:
+                return {"status": "diarized", "job_id": job_id, "turns": len(diarization)}
             
+            await update_progress(session, job, 70, "Assigning speakers to segments...")
+            speakers = await apply_diarization(session, job_id, diarization, embeddings)
             await update_progress(session, job, 80, "Diarization complete")
             
-            return {"status": "diarized", "job_id": job_id, "speakers": len(speakers)}
+            return {"status": "diarized", "job_id": job_id, "speakers": speakers}
+    
+    return run_async(run())
+
+
+def diarization_path(job_id: str) -> Path:
+    """Where a job's speaker turns are stored."""
+    return settings.output_dir / job_id / "diarization.json"
+
+
+def save_diarization(
+    job_id: str,
+    diarization: List[Dict],
+    embeddings: Optional[Dict[str, List[float]]] = None,
+):
+    """Store a job's speaker turns and embeddings for the speaker assignment step."""
+    path = diarization_path(job_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"turns": diarization, "embeddings": embeddings or {}}))
+
+
+def load_diarization(job_id: str) -> Tuple[List[Dict], Dict[str, List[float]]]:
+    """Speaker turns and embeddings saved by diarize_audio."""
+    data = json.loads(diarization_path(job_id).read_text())
+    return data["turns"], data["embeddings"]
+
+
+async def apply_diarization(
+    session,
+    job_id: str,
+    diarization: List[Dict],
+    embeddings: Optional[Dict[str, List[float]]] = None,
+) -> int:
+    """
+    Assign speakers to a job's transcript segments, splitting segments at
+    speaker changes. Returns the number of speakers.
+    
+    With speaker embeddings, they are stored for the transcript and
+    speakers matching a known voice are given its name.
+    """
+    from models.database import Transcript, TranscriptSegment
+    from services.speaker_index import identify_speakers
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    result = await session.execute(
+        select(Transcript).where(Transcript.job_id == job_id)
+    )
+    transcript = result.scalar_one_or_none()
+    if not transcript:
+        return 0
+    
+    result = await session.execute(
+        select(TranscriptSegment)
+        .where(TranscriptSegment.transcript_id == transcript.id)
+        .order_by(TranscriptSegment.segment_index)
+    )
+    segments = result.scalars().all()
+    
+    # Assign speakers to segments (and words, where speakers change)
+    assign_speakers(diarization, segments)
+    
+    # Split segments where the speaker changes mid-segment
+    segments, added = split_segments_by_speaker(diarization, segments)
+    session.add_all(added)
+    
+    # Name recurring speakers
+    names = await identify_speakers(session, transcript.id, embeddings) if embeddings else {}
+    if names:
+        for segment in segments:
+            if segment.speaker in names:
+                segment.speaker = names[segment.speaker]
+    
+    # Counted after splitting: some speakers only own word-level runs
+    speaker_count = len({segment.speaker for segment in segments if segment.speaker})
+    transcript.speaker_count = speaker_count
+    await session.commit()
+    return speaker_count
+
+
+def supports_embeddings(pipeline) -> bool:
+    """Whether a pyannote pipeline can return speaker embeddings (3.1+)."""
+    apply = getattr(pipeline, "apply", None)
+    if apply is None:
+        return False
     try:
-        return loop.run_until_complete(run())
-    finally:
-        loop.close()
+        return "return_embeddings" in inspect.signature(apply).parameters
+    except (TypeError, ValueError):
+        return False
 
 
 async def diarize_pyannote(
@@ -136,20 +208,31 @@ async def diarize_pyannote(
     model_id: str,
     device: str,
     hf_token: str,
-) -> List[Dict]:
-    """Perform diarization using pyannote-audio."""
-    from pyannote.audio import Pipeline
-    import torch
+    return_embeddings: bool = False,
+):
+    """
+    Perform diarization using pyannote-audio.
     
-    pipeline = Pipeline.from_pretrained(
-        model_id,
-        use_auth_token=hf_token,
-    )
+    With return_embeddings, returns (segments, {speaker: centroid}); the
+    centroids come from pipelines that support return_embeddings (pyannote
+    3.1+) and are empty otherwise.
+    """
+    import torch
     
-    if device == "cuda" and torch.cuda.is_available():
-        pipeline = pipeline.to(torch.device("cuda"))
+    from services.model_manager import get_pyannote_pipeline, model_lease
     
-    diarization = pipeline(audio_path)
+    with model_lease():
+        pipeline = await run_inference(get_pyannote_pipeline, model_id, device, hf_token)
+        
+        # Feed the decoded samples directly so pyannote doesn't decode the file again
+        waveform = torch.from_numpy(np.array(load_audio(audio_path))).unsqueeze(0)
+        audio = {"waveform": waveform, "sample_rate": SAMPLE_RATE}
+        
+        centroids = None
+        if return_embeddings and supports_embeddings(pipeline):
+            diarization, centroids = await run_inference(pipeline, audio, return_embeddings=True)
+        else:
+            diarization = await run_inference(pipeline, audio)
     
     # Convert to list of segments
     segments = []
@@ -160,7 +243,18 @@ async def diarize_pyannote(
             "speaker": speaker,
         })
     
-    return segments
+    if not return_embeddings:
+        return segments
+    
+    # Centroid rows follow the order of diarization.labels()
+    embeddings = {}
+    if centroids is not None:
+        embeddings = {
+            label: np.asarray(centroids[i], dtype=np.float32).tolist()
+            for i, label in enumerate(diarization.labels())
+            if i < len(centroids)
+        }
+    return segments, embeddings
 
 
 async def diarize_nemo(
@@ -168,6 +262,15 @@ async def diarize_nemo(
     model_id: str,
 ) -> List[Dict]:
     """Perform diarization using NVIDIA NeMo."""
+    # NeMo only reads files; write a WAV from the decoded artifact
+    wav_path = await run_inference(wav_for_artifact, audio_path)
+    
+    # NeMo's clustering runs largely in Python; keep it out of this process
+    return await run_in_process(run_nemo_diarizer, wav_path, audio_path)
+
+
+def run_nemo_diarizer(wav_path: str, audio_path: str) -> List[Dict]:
+    """Run NeMo's ClusteringDiarizer on a WAV file (process-pool entry point)."""
     from nemo.collections.asr.models import ClusteringDiarizer
     
     # NeMo requires a manifest file
@@ -177,7 +280,7 @@ async def diarize_nemo(
     
     with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
         json.dump({
-            "audio_filepath": audio_path,
+            "audio_filepath": wav_path,
             "offset": 0,
             "duration": None,
             "label": "infer",
@@ -194,7 +297,7 @@ async def diarize_nemo(
     diarizer.diarize()
     
     # Parse RTTM output
-    rttm_path = Path(config["out_dir"]) / "pred_rttms" / f"{Path(audio_path).stem}.rttm"
+    rttm_path = Path(config["out_dir"]) / "pred_rttms" / f"{Path(wav_path).stem}.rttm"
     segments = parse_rttm(str(rttm_path))
     
     return segments
@@ -203,28 +306,22 @@ async def diarize_nemo(
 async def diarize_speechbrain(
     audio_path: str,
     model_id: str,
-) -> List[Dict]:
-    """Perform diarization using SpeechBrain."""
-    from speechbrain.inference.speaker import SpeakerRecognition
-    from speechbrain.inference.VAD import VAD
-    
-    # This is a simplified implementation
-    # Full SpeechBrain diarization requires more setup
-    vad = VAD.from_hparams(source="speechbrain/vad-crdnn-libriparty")
-    
-    boundaries = vad.get_speech_segments(audio_path)
+    device: str = "cpu",
+) -> Tuple[List[Dict], Dict[str, List[float]]]:
+    """
+    Perform diarization with SpeechBrain embeddings and clustering.
     
-    # For now, treat all speech as single speaker
-    # Full implementation would cluster embeddings
-    segments = []
-    for start, end in boundaries:
-        segments.append({
-            "start": float(start),
-            "end": float(end),
-            "speaker": "SPEAKER_00",
-        })
+    Energy VAD, batched ECAPA embeddings over sliding windows and spectral
+    (or agglomerative) clustering; see services.speaker_clustering. Meant
+    as the CPU diarizer for nodes without a GPU. Returns the speaker turns
+    and each speaker's embedding centroid.
+    """
+    from services.model_manager import get_speechbrain_encoder, model_lease
+    from services.speaker_clustering import diarize
     
-    return segments
+    with model_lease():
+        encoder = await run_inference(get_speechbrain_encoder, model_id, device)
+        return await run_inference(diarize, encoder, load_audio(audio_path), SAMPLE_RATE)
 
 
 def parse_rttm(rttm_path: str) -> List[Dict]:
@@ -245,56 +342,6 @@ def parse_rttm(rttm_path: str) -> List[Dict]:
     return segments
 
 
-def find_speaker_for_segment(
-    diarization: List[Dict],
-    start: float,
-    end: float,
-) -> Optional[str]:
-    """Find the dominant speaker for a transcript segment."""
-    if not diarization:
-        return None
-    
-    # Calculate overlap with each diarization segment
-    speaker_times = {}
-    
-    for d_seg in diarization:
-        overlap_start = max(start, d_seg["start"])
-        overlap_end = min(end, d_seg["end"])
-        overlap = max(0, overlap_end - overlap_start)
-        
-        if overlap > 0:
-            speaker = d_seg["speaker"]
-            speaker_times[speaker] = speaker_times.get(speaker, 0) + overlap
-    
-    if not speaker_times:
-        return None
-    
-    # Return speaker with most overlap
-    return max(speaker_times, key=speaker_times.get)
-
-
-async def get_audio_path(file_path: str) -> str:
-    """Get audio path, extracting from video if needed."""
-    from pathlib import Path
-    import subprocess
-    
-    path = Path(file_path)
-    video_extensions = {".mp4", ".webm", ".mkv", ".mov", ".avi"}
-    
-    if path.suffix.lower() in video_extensions:
-        audio_path = path.with_suffix(".wav")
-        if not audio_path.exists():
-            subprocess.run([
-                "ffmpeg", "-i", str(path),
-                "-vn", "-acodec", "pcm_s16le",
-                "-ar", "16000", "-ac", "1",
-                str(audio_path), "-y",
-            ], check=True, capture_output=True)
-        return str(audio_path)
-    
-    return file_path
-
-
 async def update_progress(session, job, progress: float, message: str = ""):
     """Update job progress."""
     job.progress = progress
@@ -302,10 +349,5 @@ async def update_progress(session, job, progress: float, message: str = ""):
         job.current_stage = message
     await session.commit()
     
-    from api.queue import manager
-    await manager.broadcast({
-        "type": "progress",
-        "job_id": job.id,
-        "progress": progress,
-        "message": message,
-    })
+    from services.events import publish_job_progress
+    await publish_job_progress(job.id, progress, "diarizing", message)
@@ -0,0 +1,91 @@
+"""
+Worker heartbeats.
+
+Every worker process refreshes its registry record on a timer, and whenever
+it starts or finishes a task, with:
+
+- ready: whether model warm-up has finished
+- busy: whether a task is running
+- models: the keys ModelManager currently holds, plus those of the host's
+  model server when inference is delegated to one
+- queue: the direct queue of this worker's node, shared by its children
+
+The dispatcher aggregates these records per node to send a job to a node
+whose idle workers already have the job's model loaded (see
+services.worker_registry).
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+from celery.signals import task_postrun, task_prerun
+
+from config import settings
+from services.worker_registry import report_worker_state
+
+logger = logging.getLogger(__name__)
+
+# Set in the main worker process and inherited by its children
+DIRECT_QUEUE_ENV = "STT_WORKER_QUEUE"
+
+_busy = False
+_stop: Optional[threading.Event] = None
+
+
+def direct_queue() -> Optional[str]:
+    """Queue consumed only by this worker's node, if it has one."""
+    return os.environ.get(DIRECT_QUEUE_ENV)
+
+
+def publish_state():
+    """Write this process's current state to the registry."""
+    from services.model_manager import get_model_manager
+    from services.model_server import server_models
+
+    from .warmup import is_ready
+
+    keys = [m["key"] for m in get_model_manager().loaded_models()]
+    keys += [k for k in server_models() if k not in keys]
+    report_worker_state(is_ready(), keys, busy=_busy, queue=direct_queue())
+
+
+def _beat(stop: threading.Event):
+    while not stop.wait(settings.worker_heartbeat_interval):
+        try:
+            publish_state()
+        except Exception as e:
+            logger.warning(f"Heartbeat failed: {e}")
+
+
+def start_heartbeat():
+    """Start the heartbeat thread for this process."""
+    global _stop
+    if _stop is not None:
+        return
+    _stop = threading.Event()
+    threading.Thread(target=_beat, args=(_stop,), name="worker-heartbeat", daemon=True).start()
+
+
+def stop_heartbeat():
+    """Stop the heartbeat thread."""
+    global _stop
+    if _stop is not None:
+        _stop.set()
+        _stop = None
+
+
+@task_prerun.connect
+def mark_busy(**kwargs):
+    global _busy
+    _busy = True
+    publish_state()
+
+
+@task_postrun.connect
+def mark_idle(**kwargs):
+    global _busy
+    _busy = False
+    # Models loaded by the task are advertised right away
+    publish_state()
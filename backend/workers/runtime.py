@@ -0,0 +1,151 @@
+"""
+Per-process async runtime for Celery workers.
+
+Each worker process owns one long-lived event loop, and the database
+engine's connection pool lives on that loop. Tasks run their async bodies
+through run_async instead of creating and closing a loop per task, so
+pooled asyncpg connections stay valid and are reused between tasks.
+
+Assumes the prefork pool (the default), where each child process runs one
+task at a time.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Coroutine, Optional
+
+from celery.signals import (
+    celeryd_after_setup,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's event loop, creating it on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine) -> Any:
+    """Run a coroutine to completion on the worker's persistent loop."""
+    return get_worker_loop().run_until_complete(coro)
+
+
+@celeryd_after_setup.connect
+def setup_direct_queue(sender, instance, **kwargs):
+    """
+    Give each STT worker node a queue of its own.
+
+    Jobs are routed there when the node's idle children already hold the
+    job's model; the queue name reaches the child processes through the
+    environment.
+    """
+    from .heartbeat import DIRECT_QUEUE_ENV
+
+    queues = instance.app.amqp.queues
+    if "stt" not in queues.consume_from:
+        return
+
+    name = f"stt.{sender}"
+    queues.select_add(name)
+    os.environ[DIRECT_QUEUE_ENV] = name
+    logger.info(f"Consuming from direct queue {name}")
+
+
+_model_server = None
+
+
+@worker_init.connect
+def start_model_server(**kwargs):
+    """
+    Start this host's model server, when one is configured and not already
+    running, before the pool's children are forked.
+    """
+    global _model_server
+    from config import settings
+    from services.model_server import is_serving, serve, wait_until_serving
+
+    from .celery_app import celery_app
+
+    if not settings.model_server_socket or is_serving():
+        return
+    # Only faster-whisper is served, so only STT workers need it
+    if "stt" not in celery_app.amqp.queues.consume_from:
+        return
+
+    import multiprocessing
+
+    # spawn: the server must not inherit the worker's state
+    _model_server = multiprocessing.get_context("spawn").Process(
+        target=serve, name="model-server", daemon=True,
+    )
+    _model_server.start()
+    if not wait_until_serving():
+        logger.warning(f"Model server did not start on {settings.model_server_socket}")
+
+
+@worker_shutdown.connect
+def stop_model_server(**kwargs):
+    """Stop the model server this worker started."""
+    global _model_server
+    if _model_server is not None and _model_server.is_alive():
+        _model_server.terminate()
+        _model_server.join(timeout=10)
+    _model_server = None
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """
+    Set up a freshly forked worker process.
+
+    Connections inherited from the parent are dropped without closing them
+    (the parent still owns the sockets), so this process opens its own pool
+    on its own loop. Model warm-up and heartbeats then start in the
+    background.
+    """
+    from services.database import engine
+
+    from .heartbeat import start_heartbeat
+    from .warmup import start_warmup
+
+    engine.sync_engine.dispose(close=False)
+    get_worker_loop()
+    logger.info("Worker process runtime initialized")
+
+    start_warmup()
+    start_heartbeat()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Stop executors, close pooled connections and the loop on process exit."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    from services.database import engine
+    from services.inference import shutdown_inference_executors
+    from services.worker_registry import clear_worker_state
+
+    from .heartbeat import stop_heartbeat
+
+    stop_heartbeat()
+    clear_worker_state()
+    shutdown_inference_executors()
+    try:
+        _loop.run_until_complete(engine.dispose())
+    finally:
+        _loop.close()
+        _loop = None
@@ -1,67 +1,172 @@
 """Speech-to-Text worker with pluggable engine support - OPTIMIZED VERSION."""
 
-import asyncio
 import logging
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import select, update
 
 from .celery_app import celery_app
+from .runtime import run_async
 from config import settings
 from schemas.model import ModelEngine
+from services.audio import SAMPLE_RATE, load_audio, prepare_audio
+from services.inference import iterate_inference, run_inference
+from services.model_server import remote_stream
+from services.progress import ProgressReporter
 
 logger = logging.getLogger(__name__)
 
 # Use model manager with idle timeout
 from services.model_manager import get_whisper_model as get_cached_faster_whisper
+from services.model_manager import get_batched_whisper_pipeline
+from services.model_manager import get_hf_asr_pipeline as get_cached_hf_pipeline
+from services.model_manager import get_openai_whisper_model as get_cached_openai_whisper
+from services.model_manager import get_whisperx_align_model, get_whisperx_model as get_cached_whisperx
+from services.model_manager import model_lease
+from services.hardware import recommended_stt_batch_size
+
+
+async def get_stt_model(session, job):
+    """Resolve the job's STT model, falling back to the default whisper model."""
+    from models.database import Model
+    
+    model = None
+    if job.model_id:
+        result = await session.execute(
+            select(Model).where(Model.id == job.model_id)
+        )
+        model = result.scalar_one_or_none()
+    
+    # Use default model if none specified
+    if not model:
+        result = await session.execute(
+            select(Model).where(
+                Model.model_type == "whisper",
+                Model.is_default == True,
+            )
+        )
+        model = result.scalar_one_or_none()
+    
+    if not model:
+        raise ValueError("No STT model available. Please register a model first.")
+    
+    return model
 
 
-def get_cached_whisperx(model_id: str, device: str):
-    """Get or create cached whisperx model."""
-    cache_key = f"whisperx:{model_id}:{device}"
-    
-    if cache_key not in _model_cache:
-        import whisperx
-        
-        logger.info(f"Loading WhisperX model: {model_id} (device={device})")
-        _model_cache[cache_key] = whisperx.load_model(model_id, device=device)
-        logger.info(f"WhisperX model {model_id} loaded and cached")
+async def run_stt_engine(
+    model,
+    job,
+    audio_path: str,
+    progress_callback=None,
+    clip: Optional[Tuple[float, float]] = None,
+) -> tuple[List[Dict], Dict]:
+    """
+    Run the model's STT engine over the decoded artifact.
     
-    return _model_cache[cache_key]
+    With clip=(start, end), only that slice of the audio is transcribed and
+    timestamps are relative to its start.
+    """
+    engine = model.engine
+    language = job.language if job.language != "auto" else None
+    
+    if engine == ModelEngine.FASTER_WHISPER:
+        return await transcribe_faster_whisper(
+            audio_path=audio_path,
+            model_id=model.model_id,
+            language=language,
+            compute_type=model.compute_type or settings.compute_type,
+            device=model.device or settings.device,
+            progress_callback=progress_callback,
+            clip=clip,
+            pin_model=bool(model.is_default),
+        )
+    elif engine == ModelEngine.WHISPERX:
+        return await transcribe_whisperx(
+            audio_path=audio_path,
+            model_id=model.model_id,
+            language=language,
+            device=model.device or settings.device,
+            progress_callback=progress_callback,
+            clip=clip,
+        )
+    elif engine == ModelEngine.OPENAI_WHISPER:
+        return await transcribe_openai_whisper(
+            audio_path=audio_path,
+            model_id=model.model_id,
+            language=language,
+            clip=clip,
+        )
+    elif engine == ModelEngine.HUGGINGFACE_WHISPER:
+        return await transcribe_hf_whisper(
+            audio_path=audio_path,
+            model_id=model.model_id,
+            language=language,
+            clip=clip,
+        )
+    else:
+        raise ValueError(f"Unsupported STT engine: {engine}")
 
 
-def get_cached_openai_whisper(model_id: str):
-    """Get or create cached OpenAI whisper model."""
-    cache_key = f"openai_whisper:{model_id}"
+async def save_transcript(session, job, segments: List[Dict], info: Dict):
+    """Store the transcript and its segments, and write the output files."""
+    from models.database import Transcript, TranscriptSegment
     
-    if cache_key not in _model_cache:
-        import whisper
-        
-        logger.info(f"Loading OpenAI Whisper model: {model_id}")
-        _model_cache[cache_key] = whisper.load_model(model_id)
-        logger.info(f"OpenAI Whisper model {model_id} loaded and cached")
+    transcript = Transcript(
+        job_id=job.id,
+        language=info.get("language", job.language),
+        duration=info.get("duration", 0),
+        word_count=sum(len(seg["text"].split()) for seg in segments),
+        full_text=" ".join(seg["text"] for seg in segments),
+    )
+    session.add(transcript)
+    await session.commit()
+    await session.refresh(transcript)
+    
+    # Save segments in batch (reduced commits)
+    for i, seg in enumerate(segments):
+        segment = TranscriptSegment(
+            transcript_id=transcript.id,
+            segment_index=i,
+            start_time=seg["start"],
+            end_time=seg["end"],
+            text=seg["text"],
+            confidence=seg.get("confidence"),
+            words=seg.get("words"),
+        )
+        session.add(segment)
+    
+    # Single commit for all segments
+    await session.commit()
+    
+    # Update job
+    job.detected_language = info.get("language")
+    job.duration = info.get("duration")
+    job.progress = 90
+    
+    # Generate output files
+    output_dir = settings.output_dir / job.id
+    output_dir.mkdir(parents=True, exist_ok=True)
     
-    return _model_cache[cache_key]
+    await generate_output_files(segments, output_dir, job.output_formats)
+    
+    job.transcript_path = str(output_dir / "transcript.json")
+    await session.commit()
+    
+    return transcript
 
 
-def get_cached_hf_pipeline(model_id: str):
-    """Get or create cached HuggingFace pipeline."""
-    cache_key = f"hf_whisper:{model_id}"
+async def load_job(session, job_id: str):
+    """Fetch a job or raise."""
+    from models.database import Job
     
-    if cache_key not in _model_cache:
-        from transformers import pipeline
-        
-        logger.info(f"Loading HuggingFace pipeline: {model_id}")
-        _model_cache[cache_key] = pipeline(
-            "automatic-speech-recognition",
-            model=model_id,
-            return_timestamps="word",
-        )
-        logger.info(f"HuggingFace pipeline {model_id} loaded and cached")
+    result = await session.execute(select(Job).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
     
-    return _model_cache[cache_key]
+    if not job:
+        raise ValueError(f"Job {job_id} not found")
+    return job
 
 
 @celery_app.task(bind=True, name="workers.stt_worker.transcribe_audio")
@@ -78,156 +183,188 @@ def transcribe_audio(self, job_id: str, prev_result: Any = None):
     - huggingface-whisper (transformers)
     """
     from services.database import async_session_maker
-    from models.database import Job, Model, Transcript, TranscriptSegment
     from schemas.job import JobStatus
     
     async def run():
         async with async_session_maker() as session:
-            # Get job and model
-            result = await session.execute(select(Job).where(Job.id == job_id))
-            job = result.scalar_one_or_none()
-            
-            if not job:
-                raise ValueError(f"Job {job_id} not found")
-            
-            # Get STT model
-            model = None
-            if job.model_id:
-                result = await session.execute(
-                    select(Model).where(Model.id == job.model_id)
-                )
-                model = result.scalar_one_or_none()
-            
-            # Use default model if none specified
-            if not model:
-                result = await session.execute(
-                    select(Model).where(
-                        Model.model_type == "whisper",
-                        Model.is_default == True,
-                    )
-                )
-                model = result.scalar_one_or_none()
-            
-            if not model:
-                raise ValueError("No STT model available. Please register a model first.")
+            job = await load_job(session, job_id)
+            model = await get_stt_model(session, job)
             
             # Update status
             job.status = JobStatus.TRANSCRIBING
             job.current_stage = "transcribing"
             await session.commit()
             
+            # Decode the source once into the shared 16 kHz float32 artifact
+            decoding = ProgressReporter(
+                job.id, "transcribing", start=5, span=5, message="Decoding audio: {percent}%",
+            )
+            audio_path = await prepare_audio(job.original_path, job.file_hash, decoding)
+            await decoding.flush()
+            
             # Notify progress
             await update_progress(session, job, 10, "Starting transcription...")
             
-            # Extract audio if video
-            audio_path = await extract_audio_if_needed(job.original_path)
-            
             # Run transcription based on engine (with cached models)
-            engine = model.engine
-            
-            if engine == ModelEngine.FASTER_WHISPER:
-                segments, info = await transcribe_faster_whisper(
-                    audio_path=audio_path,
-                    model_id=model.model_id,
-                    language=job.language if job.language != "auto" else None,
-                    compute_type=model.compute_type or settings.compute_type,
-                    device=model.device or settings.device,
-                    progress_callback=lambda p: update_progress_sync(session, job, 10 + p * 0.7),
-                )
-            elif engine == ModelEngine.WHISPERX:
-                segments, info = await transcribe_whisperx(
-                    audio_path=audio_path,
-                    model_id=model.model_id,
-                    language=job.language if job.language != "auto" else None,
-                    device=model.device or settings.device,
-                    progress_callback=lambda p: update_progress_sync(session, job, 10 + p * 0.7),
-                )
-            elif engine == ModelEngine.OPENAI_WHISPER:
-                segments, info = await transcribe_openai_whisper(
-                    audio_path=audio_path,
-                    model_id=model.model_id,
-                    language=job.language if job.language != "auto" else None,
-                )
-            elif engine == ModelEngine.HUGGINGFACE_WHISPER:
-                segments, info = await transcribe_hf_whisper(
-                    audio_path=audio_path,
-                    model_id=model.model_id,
-                    language=job.language if job.language != "auto" else None,
-                )
-            else:
-                raise ValueError(f"Unsupported STT engine: {engine}")
+            reporter = ProgressReporter(job.id, "transcribing", start=10, span=70)
+            segments, info = await run_stt_engine(
+                model,
+                job,
+                audio_path,
+                progress_callback=reporter,
+            )
+            await reporter.flush()
             
             # Save transcript to database
             await update_progress(session, job, 85, "Saving transcript...")
+            await save_transcript(session, job, segments, info)
+            await update_progress(session, job, 95, "Transcription complete")
             
-            transcript = Transcript(
-                job_id=job_id,
-                language=info.get("language", job.language),
-                duration=info.get("duration", 0),
-                word_count=sum(len(seg["text"].split()) for seg in segments),
-                full_text=" ".join(seg["text"] for seg in segments),
-            )
-            session.add(transcript)
+            return {"status": "transcribed", "job_id": job_id}
+    
+    return run_async(run())
+
+
+@celery_app.task(bind=True, name="workers.stt_worker.transcribe_chunked")
+def transcribe_chunked(self, job_id: str):
+    """
+    Decode a long recording, plan its chunks and fan them out.
+    
+    Runs on an STT worker so the orchestrator never touches the audio, then
+    replaces itself with a chord of transcribe_chunk subtasks joined by
+    merge_chunks (the pipeline continues after the merge).
+    """
+    from celery import chord, group
+    
+    from services.chunking import plan_chunks
+    from services.database import async_session_maker
+    from schemas.job import JobStatus
+    
+    async def run():
+        async with async_session_maker() as session:
+            job = await load_job(session, job_id)
+            
+            job.status = JobStatus.TRANSCRIBING
+            job.current_stage = "transcribing"
             await session.commit()
-            await session.refresh(transcript)
             
-            # Save segments in batch (reduced commits)
-            for i, seg in enumerate(segments):
-                segment = TranscriptSegment(
-                    transcript_id=transcript.id,
-                    segment_index=i,
-                    start_time=seg["start"],
-                    end_time=seg["end"],
-                    text=seg["text"],
-                    confidence=seg.get("confidence"),
-                    words=seg.get("words"),
-                )
-                session.add(segment)
+            decoding = ProgressReporter(
+                job.id, "transcribing", start=5, span=5, message="Decoding audio: {percent}%",
+            )
+            audio_path = await prepare_audio(job.original_path, job.file_hash, decoding)
+            await decoding.flush()
+            
+            chunks = plan_chunks(load_audio(audio_path))
+            await update_progress(
+                session, job, 10, f"Transcribing in {len(chunks)} parallel chunks..."
+            )
+            return chunks
+    
+    chunks = run_async(run())
+    raise self.replace(chord(
+        group(transcribe_chunk.si(job_id, c.to_dict(), len(chunks)) for c in chunks),
+        merge_chunks.s(job_id),
+    ))
+
+
+@celery_app.task(bind=True, name="workers.stt_worker.transcribe_chunk")
+def transcribe_chunk(self, job_id: str, chunk: Dict, chunk_count: int = 1):
+    """
+    Transcribe one chunk of a long recording.
+    
+    Runs as a member of the chord built by transcribe_chunked; timestamps
+    in the result are relative to the chunk start and are stitched together
+    by merge_chunks. Each finished chunk advances the job through the
+    10-80% transcription span.
+    """
+    from models.database import Job
+    from services.database import async_session_maker
+    from services.events import publish_job_progress
+    
+    async def run():
+        async with async_session_maker() as session:
+            job = await load_job(session, job_id)
+            model = await get_stt_model(session, job)
+            
+            # transcribe_chunked already decoded the artifact; this only locates it
+            audio_path = await prepare_audio(job.original_path, job.file_hash)
             
-            # Single commit for all segments
+            segments, info = await run_stt_engine(
+                model,
+                job,
+                audio_path,
+                clip=(chunk["start"], chunk["end"]),
+            )
+            
+            # Increment in SQL: chunks finish concurrently on other workers
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(progress=Job.progress + 70 / max(chunk_count, 1))
+            )
             await session.commit()
+            await session.refresh(job)
+            await publish_job_progress(
+                job.id, job.progress, "transcribing", f"Transcribed chunk {chunk['index'] + 1}/{chunk_count}"
+            )
             
-            # Update job
-            job.detected_language = info.get("language")
-            job.duration = info.get("duration")
-            job.progress = 90
+            return {"chunk": chunk, "segments": segments, "language": info.get("language")}
+    
+    return run_async(run())
+
+
+@celery_app.task(bind=True, name="workers.stt_worker.merge_chunks")
+def merge_chunks(self, chunk_results: List[Dict], job_id: str):
+    """Chord callback: de-duplicate chunk overlaps and save one transcript."""
+    from collections import Counter
+    
+    from services.audio import audio_duration
+    from services.chunking import merge_chunk_segments
+    from services.database import async_session_maker
+    
+    async def run():
+        async with async_session_maker() as session:
+            job = await load_job(session, job_id)
             
-            # Generate output files
-            output_dir = settings.output_dir / job_id
-            output_dir.mkdir(parents=True, exist_ok=True)
+            await update_progress(session, job, 85, "Merging chunks...")
             
-            await generate_output_files(segments, output_dir, job.output_formats)
+            segments = merge_chunk_segments(chunk_results)
             
-            job.transcript_path = str(output_dir / "transcript.json")
-            await session.commit()
+            # Chunks may disagree on auto-detected language; take the majority
+            languages = Counter(r["language"] for r in chunk_results if r.get("language"))
+            audio_path = await prepare_audio(job.original_path, job.file_hash)
+            info = {
+                "language": languages.most_common(1)[0][0] if languages else job.language,
+                "duration": audio_duration(audio_path),
+            }
             
+            await save_transcript(session, job, segments, info)
             await update_progress(session, job, 95, "Transcription complete")
             
-            return {"status": "transcribed", "job_id": job_id}
+            return {"status": "transcribed", "job_id": job_id, "chunks": len(chunk_results)}
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(run())
-    finally:
-        loop.close()
+    return run_async(run())
 
 
-async def transcribe_faster_whisper(
+def stream_faster_whisper(
     audio_path: str,
     model_id: str,
     language: Optional[str],
     compute_type: str,
     device: str,
     task: str = "transcribe",
-    progress_callback=None,
-) -> tuple[List[Dict], Dict]:
-    """Transcribe using faster-whisper with cached model."""
-    # Use cached model
-    model = get_cached_faster_whisper(model_id, device, compute_type)
+    batch_size: int = 1,
+    clip: Optional[Tuple[float, float]] = None,
+    pin_model: bool = False,
+) -> Iterator[Dict]:
+    """
+    Blocking faster-whisper decode: yields the info dict, then each segment
+    as a dict as it is decoded.
     
-    segments_iter, info = model.transcribe(
-        audio_path,
+    Runs in the inference thread pool, or in the model server when one is
+    configured.
+    """
+    transcribe_kwargs = dict(
         language=language,
         task=task,
         word_timestamps=True,
@@ -236,30 +373,101 @@ async def transcribe_faster_whisper(
             min_silence_duration_ms=500,  # Skip long silences
         ),
         beam_size=5,
-        best_of=5,
     )
     
+    with model_lease():
+        # Model load, VAD and language detection run here; decoding is lazy
+        if batch_size > 1:
+            pipeline = get_batched_whisper_pipeline(model_id, device, compute_type, pinned=pin_model)
+            segments_iter, info = pipeline.transcribe(
+                load_audio(audio_path, *(clip or ())),
+                batch_size=batch_size,
+                **transcribe_kwargs,
+            )
+        else:
+            # Use cached model
+            model = get_cached_faster_whisper(model_id, device, compute_type, pinned=pin_model)
+            segments_iter, info = model.transcribe(
+                load_audio(audio_path, *(clip or ())),
+                best_of=5,
+                **transcribe_kwargs,
+            )
+        
+        yield {
+            "language": info.language,
+            "duration": info.duration,
+            "language_probability": info.language_probability,
+        }
+        
+        for seg in segments_iter:
+            yield {
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text.strip(),
+                "confidence": seg.avg_logprob,
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in (seg.words or [])
+                ],
+            }
+
+
+async def transcribe_faster_whisper(
+    audio_path: str,
+    model_id: str,
+    language: Optional[str],
+    compute_type: str,
+    device: str,
+    task: str = "transcribe",
+    progress_callback=None,
+    batch_size: Optional[int] = None,
+    clip: Optional[Tuple[float, float]] = None,
+    pin_model: bool = False,
+) -> tuple[List[Dict], Dict]:
+    """
+    Transcribe using faster-whisper with cached model.
+    
+    With a batch size above 1 the VAD speech chunks of the file are decoded
+    together through BatchedInferencePipeline instead of one window at a
+    time. By default the batch size comes from stt_batch_size, or from the
+    GPU's VRAM when that is 0. pin_model keeps the model cached regardless
+    of the memory budget and idle timeout (used for the default model).
+    
+    With MODEL_SERVER_SOCKET set, decoding runs in the host's model server
+    instead of this process.
+    """
+    if batch_size is None:
+        batch_size = settings.stt_batch_size or recommended_stt_batch_size(device)
+    
+    kwargs = dict(
+        audio_path=audio_path,
+        model_id=model_id,
+        language=language,
+        compute_type=compute_type,
+        device=device,
+        task=task,
+        batch_size=batch_size,
+        clip=clip,
+        pin_model=pin_model,
+    )
+    if settings.model_server_socket:
+        stream = remote_stream("faster_whisper", **kwargs)
+    else:
+        stream = stream_faster_whisper(**kwargs)
+    
+    # Segments stream back from the inference thread as they are decoded
+    info = None
     segments = []
-    for seg in segments_iter:
-        segments.append({
-            "start": seg.start,
-            "end": seg.end,
-            "text": seg.text.strip(),
-            "confidence": seg.avg_logprob,
-            "words": [
-                {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
-                for w in (seg.words or [])
-            ],
-        })
+    async for item in iterate_inference(stream):
+        if info is None:
+            info = item
+            continue
+        segments.append(item)
         if progress_callback:
-            progress = min(seg.end / (info.duration or 1) * 100, 100)
+            progress = min(item["end"] / (info["duration"] or 1) * 100, 100)
             progress_callback(progress)
     
-    return segments, {
-        "language": info.language,
-        "duration": info.duration,
-        "language_probability": info.language_probability,
-    }
+    return segments, info
 
 
 async def transcribe_whisperx(
@@ -268,34 +476,38 @@ async def transcribe_whisperx(
     language: Optional[str],
     device: str,
     progress_callback=None,
+    clip: Optional[Tuple[float, float]] = None,
 ) -> tuple[List[Dict], Dict]:
     """Transcribe using WhisperX with word alignment and cached model."""
     import whisperx
     
     # Use cached model
-    model = get_cached_whisperx(model_id, device)
-    
-    # Load audio
-    audio = whisperx.load_audio(audio_path)
-    
-    # Transcribe
-    result = model.transcribe(audio, language=language)
-    
-    if progress_callback:
-        progress_callback(50)
-    
-    # Align (alignment model not cached as it varies by language)
-    model_a, metadata = whisperx.load_align_model(
-        language_code=result["language"],
-        device=device,
-    )
-    result = whisperx.align(
-        result["segments"],
-        model_a,
-        metadata,
-        audio,
-        device,
-    )
+    with model_lease():
+        model = await run_inference(get_cached_whisperx, model_id, device)
+        
+        # Decoded artifact (no second ffmpeg pass)
+        audio = load_audio(audio_path, *(clip or ()))
+        
+        # Transcribe
+        result = await run_inference(model.transcribe, audio, language=language)
+        
+        if progress_callback:
+            progress_callback(50)
+        
+        # Align (alignment models are cached per language)
+        model_a, metadata = await run_inference(
+            get_whisperx_align_model,
+            result["language"],
+            device,
+        )
+        result = await run_inference(
+            whisperx.align,
+            result["segments"],
+            model_a,
+            metadata,
+            audio,
+            device,
+        )
     
     if progress_callback:
         progress_callback(100)
@@ -309,7 +521,7 @@ async def transcribe_whisperx(
             "words": seg.get("words", []),
         })
     
-    duration = len(audio) / 16000
+    duration = len(audio) / SAMPLE_RATE
     
     return segments, {
         "language": result.get("language", language),
@@ -321,11 +533,14 @@ async def transcribe_openai_whisper(
     audio_path: str,
     model_id: str,
     language: Optional[str],
+    clip: Optional[Tuple[float, float]] = None,
 ) -> tuple[List[Dict], Dict]:
     """Transcribe using original OpenAI Whisper with cached model."""
     # Use cached model
-    model = get_cached_openai_whisper(model_id)
-    result = model.transcribe(audio_path, language=language, word_timestamps=True)
+    with model_lease():
+        model = await run_inference(get_cached_openai_whisper, model_id)
+        audio = np.array(load_audio(audio_path, *(clip or ())))
+        result = await run_inference(model.transcribe, audio, language=language, word_timestamps=True)
     
     segments = []
     for seg in result["segments"]:
@@ -346,15 +561,16 @@ async def transcribe_hf_whisper(
     audio_path: str,
     model_id: str,
     language: Optional[str],
+    clip: Optional[Tuple[float, float]] = None,
 ) -> tuple[List[Dict], Dict]:
     """Transcribe using HuggingFace Transformers Whisper with cached pipeline."""
-    import librosa
-    
     # Use cached pipeline
-    pipe = get_cached_hf_pipeline(model_id)
-    
-    audio, sr = librosa.load(audio_path, sr=16000)
-    result = pipe(audio)
+    with model_lease():
+        pipe = await run_inference(get_cached_hf_pipeline, model_id)
+        
+        audio = np.array(load_audio(audio_path, *(clip or ())))
+        sr = SAMPLE_RATE
+        result = await run_inference(pipe, {"raw": audio, "sampling_rate": sr})
     
     segments = [{
         "start": 0,
@@ -369,30 +585,6 @@ async def transcribe_hf_whisper(
     }
 
 
-async def extract_audio_if_needed(file_path: str) -> str:
-    """Extract audio from video if needed."""
-    import subprocess
-    from pathlib import Path
-    
-    path = Path(file_path)
-    video_extensions = {".mp4", ".webm", ".mkv", ".mov", ".avi", ".mpeg"}
-    
-    if path.suffix.lower() not in video_extensions:
-        return file_path
-    
-    audio_path = path.with_suffix(".wav")
-    
-    if not audio_path.exists():
-        subprocess.run([
-            "ffmpeg", "-i", str(path),
-            "-vn", "-acodec", "pcm_s16le",
-            "-ar", "16000", "-ac", "1",
-            str(audio_path), "-y",
-        ], check=True, capture_output=True)
-    
-    return str(audio_path)
-
-
 async def update_progress(session, job, progress: float, message: str = ""):
     """Update job progress and notify clients."""
     job.progress = progress
@@ -400,23 +592,8 @@ async def update_progress(session, job, progress: float, message: str = ""):
         job.current_stage = message
     await session.commit()
     
-    try:
-        from api.queue import manager
-        await manager.broadcast({
-            "type": "progress",
-            "job_id": job.id,
-            "progress": progress,
-            "message": message,
-        })
-    except Exception:
-        pass  # WebSocket notification is optional
-
-
-def update_progress_sync(session, job, progress: float):
-    """Sync version of progress update for callbacks."""
-    import asyncio
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(update_progress(session, job, progress))
+    from services.events import publish_job_progress
+    await publish_job_progress(job.id, progress, "transcribing", message)
 
 
 async def generate_output_files(segments: List[Dict], output_dir: Path, formats: List[str]):
@@ -1,12 +1,13 @@
 """Audio synchronization worker for timing-matched TTS output."""
 
-import asyncio
 from pathlib import Path
 from typing import Dict, Any, List
 from sqlalchemy import select
 
 from .celery_app import celery_app
+from .runtime import run_async
 from config import settings
+from services.audio import VIDEO_EXTENSIONS
 
 
 @celery_app.task(bind=True, name="workers.sync_worker.sync_audio_timing")
@@ -114,9 +115,8 @@ def sync_audio_timing(self, job_id: str, prev_result: Any = None):
             
             # If source was video, remux with new audio
             source_path = Path(job.original_path)
-            video_extensions = {".mp4", ".webm", ".mkv", ".mov", ".avi"}
             
-            if source_path.suffix.lower() in video_extensions:
+            if source_path.suffix.lower() in VIDEO_EXTENSIONS:
                 await update_progress(session, job, 97, "Creating video with new audio...")
                 
                 video_with_tts = output_dir / "video_with_tts.mp4"
@@ -135,32 +135,14 @@ def sync_audio_timing(self, job_id: str, prev_result: Any = None):
                 "synced_audio": str(synced_audio_path),
             }
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(run())
-    finally:
-        loop.close()
+    return run_async(run())
 
 
 async def get_audio_duration(audio_path: Path) -> float:
     """Get duration of audio file in seconds."""
-    import subprocess
-    import json
+    from services.media import probe_duration
     
-    result = subprocess.run([
-        "ffprobe",
-        "-v", "quiet",
-        "-print_format", "json",
-        "-show_format",
-        str(audio_path),
-    ], capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        return 0
-    
-    data = json.loads(result.stdout)
-    return float(data.get("format", {}).get("duration", 0))
+    return await probe_duration(audio_path)
 
 
 async def time_stretch_audio(
@@ -174,20 +156,20 @@ async def time_stretch_audio(
     Ratio < 1 = speed up (compress)
     Ratio > 1 = slow down (stretch)
     """
-    import subprocess
+    from services.media import run_command
     
     # Clamp ratio to reasonable bounds
     ratio = max(0.25, min(4.0, ratio))
     
     # rubberband uses time ratio (inverse of speed)
-    subprocess.run([
+    await run_command([
         "rubberband",
         "-t", str(ratio),  # Time ratio
         "-p", "0",  # No pitch shift
         "-c", "6",  # Crisp mode for speech
         str(input_path),
         str(output_path),
-    ], check=True, capture_output=True)
+    ])
 
 
 async def combine_with_timing(
@@ -198,7 +180,6 @@ async def combine_with_timing(
     """
     Combine audio segments with proper timing, inserting silence for gaps.
     """
-    import subprocess
     import wave
     import struct
     
@@ -258,10 +239,9 @@ async def remux_video_with_audio(
     """
     Replace video's audio track with new audio.
     """
-    import subprocess
+    from services.media import run_ffmpeg
     
-    subprocess.run([
-        "ffmpeg",
+    await run_ffmpeg([
         "-i", str(video_path),
         "-i", str(audio_path),
         "-c:v", "copy",  # Keep video codec
@@ -270,7 +250,7 @@ async def remux_video_with_audio(
         "-shortest",  # Match shortest stream
         str(output_path),
         "-y",
-    ], check=True, capture_output=True)
+    ])
 
 
 async def update_progress(session, job, progress: float, message: str = ""):
@@ -280,10 +260,5 @@ async def update_progress(session, job, progress: float, message: str = ""):
         job.current_stage = message
     await session.commit()
     
-    from api.queue import manager
-    await manager.broadcast({
-        "type": "progress",
-        "job_id": job.id,
-        "progress": progress,
-        "message": message,
-    })
+    from services.events import publish_job_progress
+    await publish_job_progress(job.id, progress, "syncing", message)
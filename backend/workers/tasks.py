@@ -1,12 +1,12 @@
 """Main task orchestration for job processing."""
 
-import asyncio
 from datetime import datetime
-from celery import chain
+from celery import chain, chord, group
 from sqlalchemy import select
 
 from .celery_app import celery_app
-from .stt_worker import transcribe_audio
+from .runtime import run_async
+from .stt_worker import transcribe_audio, transcribe_chunked
 from .diarization_worker import diarize_audio
 from .tts_worker import synthesize_speech
 from .sync_worker import sync_audio_timing
@@ -17,96 +17,246 @@ def process_job(self, job_id: str):
     """
     Main job processing orchestrator.
     
+    Each message is a scheduling slot: it runs the highest-priority queued
+    job at the time it starts, which is not necessarily job_id (the job
+    whose submission produced the message).
+    
     Runs the appropriate pipeline based on job configuration:
-    1. Transcription (always)
-    2. Diarization (if enabled)
-    3. TTS synthesis (if enabled)
-    4. Audio sync (if TTS + timing sync enabled)
+    1. Transcription (always), with diarization alongside it if enabled
+       and speaker assignment once both are done
+    2. TTS synthesis (if enabled)
+    3. Audio sync (if TTS + timing sync enabled)
+    
+    The pipeline is dispatched with finalize_job linked on success and
+    on_pipeline_error on failure, and this task returns immediately instead
+    of holding a worker slot until the pipeline ends. With MAX_RUNNING_JOBS
+    set, at most that many pipelines run at once: with that many in flight
+    this slot claims nothing, and finalize_job / fail_job issue a new slot
+    when a pipeline ends.
     """
+    from datetime import timedelta
+    
+    from config import settings
     from services.database import async_session_maker
-    from models.database import Job
-    from schemas.job import JobStatus
+    from services.scheduler import claim_next_job, fail_stale_jobs
     
     async def run():
         async with async_session_maker() as session:
-            result = await session.execute(select(Job).where(Job.id == job_id))
-            job = result.scalar_one_or_none()
+            # Jobs of dead workers must not hold places in the cap forever
+            if settings.max_running_jobs > 0 and settings.stale_job_hours > 0:
+                stale = await fail_stale_jobs(session, timedelta(hours=settings.stale_job_hours))
+                for stale_id in stale:
+                    await fail_job(session, stale_id, "Job timed out: no result from its workers")
+            
+            # Claim marks the job PROCESSING
+            job = await claim_next_job(session, settings.max_running_jobs)
             
             if not job:
-                return {"error": "Job not found"}
+                return {"status": "idle", "dispatched_for": job_id}
             
             try:
-                # Update status to processing
-                job.status = JobStatus.PROCESSING
-                job.started_at = datetime.utcnow()
-                await session.commit()
-                
-                # Build processing chain based on options
+                # Build processing chain based on options. Steps are immutable
+                # signatures: each task loads its job by ID rather than taking
+                # the previous step's result as its first argument.
                 tasks = []
                 
                 # Step 1: Transcription (always required)
-                tasks.append(transcribe_audio.s(job_id))
+                transcription = await transcription_step(session, job)
                 
-                # Step 2: Diarization (optional)
                 if job.enable_diarization:
-                    tasks.append(diarize_audio.s(job_id))
+                    # Diarization only needs the audio, so it runs on the
+                    # diarization workers while the STT workers transcribe;
+                    # speakers are assigned once both have finished
+                    tasks.append(chord(
+                        group(transcription, diarize_audio.si(job.id, defer_assignment=True)),
+                        merge_diarization.si(job.id),
+                    ))
+                else:
+                    tasks.append(transcription)
                 
-                # Step 3: TTS synthesis (optional)
+                # Step 2: TTS synthesis (optional)
                 if job.enable_tts:
-                    tasks.append(synthesize_speech.s(job_id))
+                    tasks.append(synthesize_speech.si(job.id))
                     
-                    # Step 4: Audio timing sync (if TTS enabled and sync requested)
+                    # Step 3: Audio timing sync (if TTS enabled and sync requested)
                     if job.sync_tts_timing:
-                        tasks.append(sync_audio_timing.s(job_id))
+                        tasks.append(sync_audio_timing.si(job.id))
                 
-                # Execute chain
-                if len(tasks) == 1:
-                    # Single task, run directly
-                    result = tasks[0].apply_async()
-                    result.get()  # Wait for completion
-                else:
-                    # Chain multiple tasks
-                    workflow = chain(*tasks)
-                    result = workflow.apply_async()
-                    result.get()  # Wait for completion
-                
-                # Mark as completed
-                await session.refresh(job)
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.utcnow()
-                job.progress = 100.0
-                await session.commit()
-                
-                # Notify via WebSocket
-                await notify_completion(job)
+                workflow = tasks[0] if len(tasks) == 1 else chain(*tasks)
+                workflow.apply_async(
+                    link=finalize_job.si(job.id),
+                    link_error=on_pipeline_error.s(job.id),
+                )
                 
-                return {"status": "completed", "job_id": job_id}
+                return {"status": "dispatched", "job_id": job.id}
                 
             except Exception as e:
-                await session.refresh(job)
-                job.status = JobStatus.FAILED
-                job.error_message = str(e)
-                job.completed_at = datetime.utcnow()
-                await session.commit()
-                
-                await notify_failure(job, str(e))
-                
+                await fail_job(session, job.id, str(e))
                 raise
     
     # Run async function in sync context
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(run())
-    finally:
-        loop.close()
+    return run_async(run())
+
+
+@celery_app.task(bind=True, name="workers.tasks.merge_diarization")
+def merge_diarization(self, job_id: str):
+    """
+    Join step of parallel transcription and diarization: assign the saved
+    speaker turns to the transcript's segments.
+    """
+    from services.database import async_session_maker
+    from models.database import Job
+    from schemas.job import JobStatus
+    
+    from .diarization_worker import apply_diarization, load_diarization, update_progress
+    
+    async def run():
+        async with async_session_maker() as session:
+            result = await session.execute(select(Job).where(Job.id == job_id))
+            job = result.scalar_one_or_none()
+            
+            if not job:
+                return {"error": "Job not found"}
+            
+            job.status = JobStatus.DIARIZING
+            job.current_stage = "diarizing"
+            await update_progress(session, job, 96, "Assigning speakers to segments...")
+            
+            turns, embeddings = load_diarization(job_id)
+            speakers = await apply_diarization(session, job_id, turns, embeddings)
+            await update_progress(session, job, 98, f"Identified {speakers} speakers")
+            
+            return {"status": "diarized", "job_id": job_id, "speakers": speakers}
+    
+    return run_async(run())
+
+
+@celery_app.task(bind=True, name="workers.tasks.finalize_job")
+def finalize_job(self, job_id: str):
+    """Success callback of a job pipeline: mark the job completed."""
+    from services.database import async_session_maker
+    from models.database import Job
+    from schemas.job import JobStatus
+    
+    async def run():
+        async with async_session_maker() as session:
+            result = await session.execute(select(Job).where(Job.id == job_id))
+            job = result.scalar_one_or_none()
+            
+            if not job:
+                release_slot(job_id)
+                return {"error": "Job not found"}
+            
+            job.status = JobStatus.COMPLETED
+            job.completed_at = datetime.utcnow()
+            job.progress = 100.0
+            await session.commit()
+            
+            await update_batch(session, job)
+            release_slot(job_id)
+            
+            # Notify via WebSocket
+            await notify_completion(job)
+            
+            return {"status": "completed", "job_id": job_id}
+    
+    return run_async(run())
+
+
+@celery_app.task(name="workers.tasks.on_pipeline_error")
+def on_pipeline_error(request, exc, traceback, job_id: str):
+    """
+    Error callback of a job pipeline.
+    
+    Celery runs errbacks inline in the worker whose task failed, so this
+    only queues mark_job_failed and leaves the bookkeeping to that task.
+    """
+    mark_job_failed.delay(job_id, str(exc))
+
+
+@celery_app.task(bind=True, name="workers.tasks.mark_job_failed")
+def mark_job_failed(self, job_id: str, error: str):
+    """Record a pipeline failure on the job and notify clients."""
+    from services.database import async_session_maker
+    
+    async def run():
+        async with async_session_maker() as session:
+            await fail_job(session, job_id, error)
+            return {"status": "failed", "job_id": job_id}
+    
+    return run_async(run())
+
+
+async def fail_job(session, job_id: str, error: str):
+    """Mark a job failed, update its batch and notify clients."""
+    from models.database import Job
+    from schemas.job import JobStatus
+    
+    result = await session.execute(
+        select(Job).where(Job.id == job_id).execution_options(populate_existing=True)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        release_slot(job_id)
+        return
+    
+    job.status = JobStatus.FAILED
+    job.error_message = error
+    job.completed_at = datetime.utcnow()
+    await session.commit()
+    
+    await update_batch(session, job)
+    release_slot(job_id)
+    await notify_failure(job, error)
+
+
+def release_slot(job_id: str):
+    """A job's pipeline has ended: issue a slot for the next queued job."""
+    process_job.delay(job_id)
+
+
+async def update_batch(session, job):
+    """Update batch progress if the job is part of a batch."""
+    if job.batch_id:
+        from api.batches import update_batch_progress
+        await update_batch_progress(session, job.batch_id)
+
+
+async def transcription_step(session, job):
+    """
+    Signature for the transcription stage of a job.
+    
+    Long recordings go to transcribe_chunked, which splits them into
+    overlapping chunks transcribed in parallel by all STT workers and merges
+    the result into one transcript. Shorter ones run as a single
+    transcribe_audio task, sent straight to an idle worker that already has
+    the job's model loaded if there is one. Only the container is probed
+    here; decoding happens on the STT workers.
+    """
+    from pathlib import Path
+    
+    from services.chunking import should_chunk
+    from services.media import probe_duration
+    from services.worker_registry import find_warm_queue
+    
+    from .stt_worker import get_stt_model
+    
+    if should_chunk(await probe_duration(Path(job.original_path))):
+        return transcribe_chunked.si(job.id)
+    
+    signature = transcribe_audio.si(job.id)
+    model = await get_stt_model(session, job)
+    queue = find_warm_queue(model.model_id)
+    if queue:
+        signature.set(queue=queue)
+    return signature
 
 
 async def notify_completion(job):
-    """Notify WebSocket clients of job completion."""
-    from api.queue import manager
+    """Notify WebSocket clients (via the event bus) of job completion."""
+    from services.events import publish_event
     
-    await manager.broadcast({
+    await publish_event({
         "type": "job_completed",
         "job": {
             "id": job.id,
@@ -118,10 +268,10 @@ async def notify_completion(job):
 
 
 async def notify_failure(job, error: str):
-    """Notify WebSocket clients of job failure."""
-    from api.queue import manager
+    """Notify WebSocket clients (via the event bus) of job failure."""
+    from services.events import publish_event
     
-    await manager.broadcast({
+    await publish_event({
         "type": "job_failed",
         "job": {
             "id": job.id,
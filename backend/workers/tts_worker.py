@@ -1,13 +1,14 @@
 """Text-to-Speech worker with pluggable engine support."""
 
-import asyncio
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from sqlalchemy import select
 
 from .celery_app import celery_app
+from .runtime import run_async
 from config import settings
 from schemas.model import ModelEngine
+from services.inference import run_inference
 
 
 @celery_app.task(bind=True, name="workers.tts_worker.synthesize_speech")
@@ -162,12 +163,7 @@ def synthesize_speech(self, job_id: str, prev_result: Any = None):
                 "duration": duration,
             }
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(run())
-    finally:
-        loop.close()
+    return run_async(run())
 
 
 async def synthesize_coqui_xtts(
@@ -178,33 +174,32 @@ async def synthesize_coqui_xtts(
     device: str,
 ) -> List[Dict]:
     """Synthesize using Coqui XTTS v2."""
-    from TTS.api import TTS
-    import torch
-    
-    tts = TTS(model_id)
-    if device == "cuda" and torch.cuda.is_available():
-        tts = tts.to("cuda")
-    
-    audio_segments = []
+    from services.model_manager import get_coqui_tts, model_lease
     
-    for i, seg in enumerate(segments):
-        output_path = output_dir / f"segment_{i:04d}.wav"
-        
-        # XTTS supports multiple languages
-        lang = language[:2] if language else "en"
+    with model_lease():
+        tts = await run_inference(get_coqui_tts, model_id, device, "coqui-xtts")
         
-        tts.tts_to_file(
-            text=seg.text,
-            file_path=str(output_path),
-            language=lang,
-        )
+        audio_segments = []
         
-        audio_segments.append({
-            "path": str(output_path),
-            "original_start": seg.start_time,
-            "original_end": seg.end_time,
-            "text": seg.text,
-        })
+        for i, seg in enumerate(segments):
+            output_path = output_dir / f"segment_{i:04d}.wav"
+            
+            # XTTS supports multiple languages
+            lang = language[:2] if language else "en"
+            
+            await run_inference(
+                tts.tts_to_file,
+                text=seg.text,
+                file_path=str(output_path),
+                language=lang,
+            )
+            
+            audio_segments.append({
+                "path": str(output_path),
+                "original_start": seg.start_time,
+                "original_end": seg.end_time,
+                "text": seg.text,
+            })
     
     return audio_segments
 
@@ -215,21 +210,23 @@ async def synthesize_coqui_vits(
     output_dir: Path,
 ) -> List[Dict]:
     """Synthesize using Coqui VITS."""
-    from TTS.api import TTS
-    
-    tts = TTS(model_id)
-    audio_segments = []
+    from services.model_manager import get_coqui_tts, model_lease
     
-    for i, seg in enumerate(segments):
-        output_path = output_dir / f"segment_{i:04d}.wav"
-        tts.tts_to_file(text=seg.text, file_path=str(output_path))
+    # VITS runs on CPU, as before
+    with model_lease():
+        tts = await run_inference(get_coqui_tts, model_id, "cpu", "coqui-vits")
+        audio_segments = []
         
-        audio_segments.append({
-            "path": str(output_path),
-            "original_start": seg.start_time,
-            "original_end": seg.end_time,
-            "text": seg.text,
-        })
+        for i, seg in enumerate(segments):
+            output_path = output_dir / f"segment_{i:04d}.wav"
+            await run_inference(tts.tts_to_file, text=seg.text, file_path=str(output_path))
+            
+            audio_segments.append({
+                "path": str(output_path),
+                "original_start": seg.start_time,
+                "original_end": seg.end_time,
+                "text": seg.text,
+            })
     
     return audio_segments
 
@@ -240,7 +237,7 @@ async def synthesize_piper(
     output_dir: Path,
 ) -> List[Dict]:
     """Synthesize using Piper TTS."""
-    import subprocess
+    from services.media import MediaCommandError, run_command
     
     audio_segments = []
     
@@ -248,15 +245,13 @@ async def synthesize_piper(
         output_path = output_dir / f"segment_{i:04d}.wav"
         
         # Piper uses command line
-        process = subprocess.run(
-            ["piper", "--model", model_id, "--output_file", str(output_path)],
-            input=seg.text,
-            capture_output=True,
-            text=True,
-        )
-        
-        if process.returncode != 0:
-            raise RuntimeError(f"Piper failed: {process.stderr}")
+        try:
+            await run_command(
+                ["piper", "--model", model_id, "--output_file", str(output_path)],
+                input_data=seg.text.encode(),
+            )
+        except MediaCommandError as e:
+            raise RuntimeError(f"Piper failed: {e.stderr}")
         
         audio_segments.append({
             "path": str(output_path),
@@ -291,13 +286,13 @@ async def synthesize_mars5(
         text = seg.text
         
         # Generate using AR model
-        ar_output = ar_generate(text)
+        ar_output = await run_inference(ar_generate, text)
         # Refine with NAR model
-        wav = nar_generate(ar_output)
+        wav = await run_inference(nar_generate, ar_output)
         
         # Save
         import soundfile as sf
-        sf.write(str(output_path), wav, 24000)
+        await run_inference(sf.write, str(output_path), wav, 24000)
         
         audio_segments.append({
             "path": str(output_path),
@@ -317,14 +312,14 @@ async def synthesize_bark(
     from bark import SAMPLE_RATE, generate_audio, preload_models
     from scipy.io.wavfile import write as write_wav
     
-    preload_models()
+    await run_inference(preload_models)
     
     audio_segments = []
     
     for i, seg in enumerate(segments):
         output_path = output_dir / f"segment_{i:04d}.wav"
         
-        audio_array = generate_audio(seg.text)
+        audio_array = await run_inference(generate_audio, seg.text)
         write_wav(str(output_path), SAMPLE_RATE, audio_array)
         
         audio_segments.append({
@@ -342,34 +337,35 @@ async def synthesize_tortoise(
     output_dir: Path,
 ) -> List[Dict]:
     """Synthesize using Tortoise TTS."""
-    from tortoise.api import TextToSpeech
-    from tortoise.utils.audio import load_audio
     import torchaudio
     
-    tts = TextToSpeech()
-    
-    audio_segments = []
+    from services.model_manager import get_tortoise_tts, model_lease
     
-    for i, seg in enumerate(segments):
-        output_path = output_dir / f"segment_{i:04d}.wav"
+    with model_lease():
+        tts = await run_inference(get_tortoise_tts)
         
-        # Tortoise is slow but high quality
-        gen = tts.tts(seg.text, voice="random")
-        torchaudio.save(str(output_path), gen.squeeze(0).cpu(), 24000)
+        audio_segments = []
         
-        audio_segments.append({
-            "path": str(output_path),
-            "original_start": seg.start_time,
-            "original_end": seg.end_time,
-            "text": seg.text,
-        })
+        for i, seg in enumerate(segments):
+            output_path = output_dir / f"segment_{i:04d}.wav"
+            
+            # Tortoise is slow but high quality
+            gen = await run_inference(tts.tts, seg.text, voice="random")
+            torchaudio.save(str(output_path), gen.squeeze(0).cpu(), 24000)
+            
+            audio_segments.append({
+                "path": str(output_path),
+                "original_start": seg.start_time,
+                "original_end": seg.end_time,
+                "text": seg.text,
+            })
     
     return audio_segments
 
 
 async def combine_audio_segments(segments: List[Dict], output_path: Path):
     """Combine multiple audio segments into one file."""
-    import subprocess
+    from services.media import run_ffmpeg
     
     # Create concat file for ffmpeg
     concat_path = output_path.parent / "concat.txt"
@@ -378,15 +374,16 @@ async def combine_audio_segments(segments: List[Dict], output_path: Path):
             f.write(f"file '{seg['path']}'\n")
     
     # Concatenate using ffmpeg
-    subprocess.run([
-        "ffmpeg", "-f", "concat", "-safe", "0",
-        "-i", str(concat_path),
-        "-acodec", "pcm_s16le",
-        str(output_path), "-y",
-    ], check=True, capture_output=True)
-    
-    # Cleanup
-    concat_path.unlink()
+    try:
+        await run_ffmpeg([
+            "-f", "concat", "-safe", "0",
+            "-i", str(concat_path),
+            "-acodec", "pcm_s16le",
+            str(output_path), "-y",
+        ])
+    finally:
+        # Cleanup
+        concat_path.unlink(missing_ok=True)
 
 
 async def update_progress(session, job, progress: float, message: str = ""):
@@ -396,10 +393,5 @@ async def update_progress(session, job, progress: float, message: str = ""):
         job.current_stage = message
     await session.commit()
     
-    from api.queue import manager
-    await manager.broadcast({
-        "type": "progress",
-        "job_id": job.id,
-        "progress": progress,
-        "message": message,
-    })
+    from services.events import publish_job_progress
+    await publish_job_progress(job.id, progress, "generating_tts", message)
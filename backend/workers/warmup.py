@@ -0,0 +1,220 @@
+"""
+Model warm-up at worker startup.
+
+When a worker process starts, it loads the models it is expected to serve
+and runs a short dummy inference on each, so CUDA/CTranslate2 kernels are
+compiled before the first real job instead of during it. Models warmed:
+
+- ``Model.is_default`` rows of the types in WARMUP_MODEL_TYPES
+  (e.g. "whisper" on the STT worker, "diarization" on the diarization one)
+- any model whose model_id is listed in WARMUP_MODELS
+
+Warm-up runs in a background thread (Celery kills processes whose init
+takes too long). The worker's registry record stays ``ready: false`` until
+every model is warm.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+
+from config import settings
+from schemas.model import ModelEngine, ModelType
+
+logger = logging.getLogger(__name__)
+
+# One second of silence at 16 kHz
+DUMMY_AUDIO = np.zeros(16000, dtype=np.float32)
+
+_ready = threading.Event()
+_warm_models: List[str] = []
+
+
+def _csv(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def is_ready() -> bool:
+    """Whether this process has finished warming up."""
+    return _ready.is_set()
+
+
+def warm_models() -> List[str]:
+    """model_ids warmed in this process."""
+    return list(_warm_models)
+
+
+async def load_warmup_models() -> List[Dict]:
+    """Model rows to warm, as plain dicts (safe to use from another thread)."""
+    from sqlalchemy import or_, select
+
+    from models.database import Model
+    from services.database import async_session_maker
+
+    types = [ModelType(t) for t in _csv(settings.warmup_model_types)]
+    allowlist = _csv(settings.warmup_models)
+    if not types and not allowlist:
+        return []
+
+    conditions = []
+    if types:
+        conditions.append(Model.is_default.is_(True) & Model.model_type.in_(types))
+    if allowlist:
+        conditions.append(Model.model_id.in_(allowlist))
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Model).where(Model.is_downloaded.is_(True), or_(*conditions))
+        )
+        return [
+            {
+                "model_id": m.model_id,
+                "engine": m.engine,
+                "device": m.device or settings.device,
+                "compute_type": m.compute_type or settings.compute_type,
+                "is_default": bool(m.is_default),
+            }
+            for m in result.scalars().all()
+        ]
+
+
+def _warm_faster_whisper(m: Dict):
+    if settings.model_server_socket:
+        # Decoding happens in the model server: warm its copy, not a local one
+        from services.model_server import remote_stream
+
+        list(remote_stream("warm_faster_whisper", m))
+        return
+
+    _load_faster_whisper(m)
+
+
+def _load_faster_whisper(m: Dict):
+    from services.model_manager import get_whisper_model
+
+    model = get_whisper_model(m["model_id"], m["device"], m["compute_type"], pinned=m["is_default"])
+    segments, _ = model.transcribe(DUMMY_AUDIO, beam_size=1)
+    list(segments)
+
+
+def stream_warm_faster_whisper(m: Dict) -> Iterator[str]:
+    """Model server operation: load and exercise faster-whisper there."""
+    _load_faster_whisper(m)
+    yield m["model_id"]
+
+
+def _warm_whisperx(m: Dict):
+    from services.model_manager import get_model_manager, get_whisperx_model
+
+    model = get_whisperx_model(m["model_id"], m["device"])
+    if m["is_default"]:
+        get_model_manager().pin(f"whisperx:{m['model_id']}:{m['device']}")
+    model.transcribe(DUMMY_AUDIO)
+
+
+def _warm_openai_whisper(m: Dict):
+    from services.model_manager import get_openai_whisper_model
+
+    get_openai_whisper_model(m["model_id"]).transcribe(DUMMY_AUDIO)
+
+
+def _warm_hf_whisper(m: Dict):
+    from services.model_manager import get_hf_asr_pipeline
+
+    get_hf_asr_pipeline(m["model_id"])({"raw": DUMMY_AUDIO, "sampling_rate": 16000})
+
+
+def _warm_pyannote(m: Dict):
+    import torch
+
+    from services.model_manager import get_model_manager, get_pyannote_pipeline
+
+    pipeline = get_pyannote_pipeline(m["model_id"], m["device"], settings.hf_token)
+    if m["is_default"]:
+        get_model_manager().pin(f"pyannote:{m['model_id']}:{m['device']}")
+    pipeline({"waveform": torch.zeros(1, 2 * 16000), "sample_rate": 16000})
+
+
+def _warm_speechbrain(m: Dict):
+    from services.model_manager import get_speechbrain_encoder
+    from services.speaker_clustering import extract_embeddings
+
+    encoder = get_speechbrain_encoder(m["model_id"], m["device"])
+    extract_embeddings(encoder, DUMMY_AUDIO, np.array([[0.0, 1.0]]), 16000, 1)
+
+
+def _warm_coqui(m: Dict):
+    from services.model_manager import get_coqui_tts
+
+    engine = m["engine"].value if hasattr(m["engine"], "value") else m["engine"]
+    # Same device choice as the synthesize_* adapters
+    device = m["device"] if m["engine"] == ModelEngine.COQUI_XTTS else "cpu"
+    get_coqui_tts(m["model_id"], device, engine)
+
+
+WARMERS: Dict[ModelEngine, Callable[[Dict], None]] = {
+    ModelEngine.FASTER_WHISPER: _warm_faster_whisper,
+    ModelEngine.WHISPERX: _warm_whisperx,
+    ModelEngine.OPENAI_WHISPER: _warm_openai_whisper,
+    ModelEngine.HUGGINGFACE_WHISPER: _warm_hf_whisper,
+    ModelEngine.PYANNOTE: _warm_pyannote,
+    ModelEngine.SPEECHBRAIN: _warm_speechbrain,
+    ModelEngine.COQUI_XTTS: _warm_coqui,
+    ModelEngine.COQUI_VITS: _warm_coqui,
+}
+
+
+def warm_up(models: List[Dict]):
+    """Load and exercise each model; failures are logged, not fatal."""
+    from services.model_manager import model_lease
+
+    from .heartbeat import publish_state
+
+    for m in models:
+        warmer = WARMERS.get(m["engine"])
+        if warmer is None:
+            logger.info(f"No warm-up for {m['engine']} model {m['model_id']}")
+            continue
+
+        start = time.time()
+        try:
+            with model_lease():
+                warmer(m)
+        except Exception as e:
+            logger.warning(f"Warm-up of {m['model_id']} failed: {e}")
+            continue
+
+        _warm_models.append(m["model_id"])
+        logger.info(f"Warmed up {m['model_id']} in {time.time() - start:.1f}s")
+        publish_state()
+
+    _ready.set()
+    publish_state()
+
+
+def start_warmup():
+    """
+    Begin warming up this worker process.
+
+    Called from worker_process_init once the process's loop exists; the
+    model list is read there, the loading happens in a daemon thread.
+    """
+    from .heartbeat import publish_state
+    from .runtime import run_async
+
+    try:
+        models = run_async(load_warmup_models())
+    except Exception as e:
+        logger.warning(f"Could not read models to warm up: {e}")
+        models = []
+
+    if not models:
+        _ready.set()
+        publish_state()
+        return
+
+    publish_state()
+    threading.Thread(target=warm_up, args=(models,), name="model-warmup", daemon=True).start()
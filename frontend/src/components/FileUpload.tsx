@@ -3,7 +3,7 @@ import { useDropzone } from 'react-dropzone'
 import { Upload, FileAudio, FileVideo, X, Loader2, CheckCircle2, AlertCircle, Play } from 'lucide-react'
 import { useMutation } from '@tanstack/react-query'
 import toast from 'react-hot-toast'
-import { api } from '../lib/api'
+import { api, RESUMABLE_UPLOAD_THRESHOLD } from '../lib/api'
 import type { TranscriptionOptions } from '../pages/Dashboard'
 
 interface FileUploadProps {
@@ -26,26 +26,39 @@ export default function FileUpload({ options, onUploadComplete }: FileUploadProp
   const [batchName, setBatchName] = useState('')
   
   const uploadMutation = useMutation({
-    mutationFn: async (file: File) => {
-      const formData = new FormData()
-      formData.append('file', file)
-      formData.append('language', options.language)
-      formData.append('enable_diarization', String(options.enableDiarization))
-      formData.append('enable_tts', String(options.enableTts))
-      formData.append('sync_tts_timing', String(options.syncTtsTiming))
-      formData.append('output_formats', options.outputFormats.join(','))
-      formData.append('priority', String(options.priority))
+    mutationFn: async (uploadFile: UploadFile) => {
+      const fields: Record<string, string> = {
+        language: options.language,
+        enable_diarization: String(options.enableDiarization),
+        enable_tts: String(options.enableTts),
+        sync_tts_timing: String(options.syncTtsTiming),
+        output_formats: options.outputFormats.join(','),
+        priority: String(options.priority),
+      }
       
       if (options.modelId) {
-        formData.append('model_id', options.modelId)
+        fields.model_id = options.modelId
       }
       if (options.diarizationModelId) {
-        formData.append('diarization_model_id', options.diarizationModelId)
+        fields.diarization_model_id = options.diarizationModelId
       }
       if (options.ttsModelId) {
-        formData.append('tts_model_id', options.ttsModelId)
+        fields.tts_model_id = options.ttsModelId
       }
       
+      // Large recordings go through the resumable chunked upload API
+      if (uploadFile.file.size > RESUMABLE_UPLOAD_THRESHOLD) {
+        return api.uploadResumable(uploadFile.file, fields, (progress) => {
+          setFiles(prev => prev.map(f =>
+            f.id === uploadFile.id ? { ...f, progress } : f
+          ))
+        })
+      }
+      
+      const formData = new FormData()
+      formData.append('file', uploadFile.file)
+      Object.entries(fields).forEach(([key, value]) => formData.append(key, value))
+      
       return api.createJob(formData)
     },
   })
@@ -107,7 +120,7 @@ export default function FileUpload({ options, onUploadComplete }: FileUploadProp
       ))
       
       try {
-        await uploadMutation.mutateAsync(uploadFile.file)
+        await uploadMutation.mutateAsync(uploadFile)
         
         // Update status to complete
         setFiles(prev => prev.map(f =>
@@ -311,7 +324,11 @@ export default function FileUpload({ options, onUploadComplete }: FileUploadProp
                 {/* Progress bar for uploading */}
                 {f.status === 'uploading' && (
                   <div className="progress mt-2">
-                    <div className="progress-bar animate-pulse" style={{ width: '60%' }} />
+                    {f.progress > 0 ? (
+                      <div className="progress-bar" style={{ width: `${f.progress}%` }} />
+                    ) : (
+                      <div className="progress-bar animate-pulse" style={{ width: '60%' }} />
+                    )}
                   </div>
                 )}
               </div>
@@ -115,6 +115,11 @@ export interface TranscriptResponse {
   speakers?: string[]
 }
 
+// Files above this size use the resumable chunked upload API
+export const RESUMABLE_UPLOAD_THRESHOLD = 100 * 1024 * 1024
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+const MAX_CHUNK_RETRIES = 5
+
 // API functions
 export const apiClient = {
   // Jobs
@@ -126,6 +131,56 @@ export const apiClient = {
     return response.data
   },
 
+  // Resumable upload: survives network hiccups by resuming from the server's offset
+  uploadResumable: async (
+    file: File,
+    fields: Record<string, string>,
+    onProgress?: (percent: number) => void,
+  ): Promise<Job> => {
+    const { data } = await api.post('/uploads', {
+      filename: file.name,
+      size: file.size,
+      content_type: file.type || null,
+    })
+    const uploadId: string = data.id
+
+    let offset = 0
+    let retries = 0
+    while (offset < file.size) {
+      const chunk = file.slice(offset, offset + UPLOAD_CHUNK_SIZE)
+      try {
+        const response = await api.patch(`/uploads/${uploadId}`, chunk, {
+          headers: {
+            'Content-Type': 'application/offset+octet-stream',
+            'Upload-Offset': String(offset),
+          },
+          timeout: 120000,
+        })
+        offset = Number(response.headers['upload-offset'] ?? offset + chunk.size)
+        retries = 0
+        onProgress?.(Math.round((offset / file.size) * 100))
+      } catch (error) {
+        if (++retries > MAX_CHUNK_RETRIES) throw error
+        // Back off, then ask the server how much it actually received
+        await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** retries))
+        try {
+          const head = await api.head(`/uploads/${uploadId}`)
+          offset = Number(head.headers['upload-offset'])
+        } catch {
+          // Server still unreachable - retry from the same offset
+        }
+      }
+    }
+
+    const formData = new FormData()
+    Object.entries(fields).forEach(([key, value]) => formData.append(key, value))
+    const response = await api.post(`/uploads/${uploadId}/finalize`, formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      timeout: 120000,
+    })
+    return response.data
+  },
+
   getJobs: async (status?: string): Promise<Job[]> => {
     const params = status ? { status } : {}
     const response = await api.get('/jobs', { params })